@@ -33,8 +33,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'inventory.middleware.RequestTimingMiddleware',  # Server-Timing header + per-request log line
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files on Render
+    'inventory.middleware.StaticFilesMiddleware',  # WhiteNoise static files, async-capable for ASGI
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -62,14 +63,17 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'bol_management.wsgi.application'
+ASGI_APPLICATION = 'bol_management.asgi.application'
 
 # Database
-# Use PostgreSQL on Render, SQLite for local development
+# Use PostgreSQL on Render, SQLite for local development.
+# Under ASGI each request gets its own connection, so set DB_CONN_MAX_AGE=0
+# there (persistent connections would pile up) and pool with PgBouncer instead
 if 'DATABASE_URL' in os.environ:
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600,
+            conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
             conn_health_checks=True,
         )
     }
@@ -81,6 +85,55 @@ else:
         }
     }
 
+# Cache
+# Local memory by default; set CACHE_BACKEND/CACHE_LOCATION to share the cache
+# between workers (e.g. django.core.cache.backends.filebased.FileBasedCache
+# with a directory, or django.core.cache.backends.db.DatabaseCache with a table
+# created by `manage.py createcachetable`).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'bol-management'),
+    }
+}
+
+# Master data (items, sizes, suppliers, customers, carriers) cache
+REFERENCE_CACHE_ALIAS = 'default'
+REFERENCE_CACHE_TIMEOUT = int(os.environ.get('REFERENCE_CACHE_TIMEOUT', 300))
+
+# Per-process barcode -> batch index behind /api/batches/scan/ (see inventory.barcodes).
+# Each entry holds about 1.5 KB, so a full index costs ~75 MB per worker; only the
+# newest BARCODE_WARM_SIZE batches (~3 MB) are preloaded, the rest fill in as scanned
+BARCODE_CACHE_SIZE = int(os.environ.get('BARCODE_CACHE_SIZE', 50000))
+BARCODE_CACHE_TTL = int(os.environ.get('BARCODE_CACHE_TTL', 300))
+BARCODE_WARM_SIZE = int(os.environ.get('BARCODE_WARM_SIZE', 2000))
+
+# Dashboard counters on the main menu and reports page (0 disables caching)
+DASHBOARD_STATS_TIMEOUT = int(os.environ.get('DASHBOARD_STATS_TIMEOUT', 30))
+
+# Aging/valuation reports, cached per day until stock changes (inventory.reports)
+REPORT_CACHE_TIMEOUT = int(os.environ.get('REPORT_CACHE_TIMEOUT', 86400))
+
+# BOL PDFs (inventory.documents): cached pages per BOL, and a process pool
+# for runs of at least BOL_RENDER_POOL_MIN uncached BOLs. BOL_RENDER_WORKERS
+# processes (0 = one per CPU) are shared among the WEB_CONCURRENCY web worker
+# processes, and a pool left idle for BOL_RENDER_POOL_IDLE seconds is shut down
+BOL_PDF_CACHE_TIMEOUT = int(os.environ.get('BOL_PDF_CACHE_TIMEOUT', 604800))
+BOL_RENDER_WORKERS = int(os.environ.get('BOL_RENDER_WORKERS', 0))
+BOL_RENDER_POOL_MIN = int(os.environ.get('BOL_RENDER_POOL_MIN', 50))
+BOL_RENDER_POOL_IDLE = int(os.environ.get('BOL_RENDER_POOL_IDLE', 60))
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Per-request instrumentation (inventory.middleware.RequestTimingMiddleware):
+# requests over any threshold are logged at WARNING on inventory.requests
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 50))
+SLOW_REQUEST_DUPLICATES = int(os.environ.get('SLOW_REQUEST_DUPLICATES', 10))
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'True').lower() == 'true'
+
+# Bearer token required by /metrics; without one it is only served when DEBUG is on
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -143,6 +196,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        # One JSON line per request; set REQUEST_LOG_LEVEL=WARNING to keep only slow ones
+        'inventory.requests': {
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'INFO'),
+        },
     },
 }
 
@@ -153,7 +210,8 @@ if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
     SECURE_HSTS_SECONDS = 31536000
-    SECURE_REDIRECT_EXEMPT = []
-    SECURE_SSL_REDIRECT = True
+    # Probes call this over plain HTTP inside the platform network
+    SECURE_REDIRECT_EXEMPT = [r'^health/live/$']
+    SECURE_SSL_REDIRECT = os.environ.get('SECURE_SSL_REDIRECT', 'True').lower() == 'true'
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
\ No newline at end of file
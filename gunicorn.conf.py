@@ -0,0 +1,176 @@
+"""
+Gunicorn configuration for BOL Management System.
+
+Gunicorn reads this file from the working directory (or ``-c gunicorn.conf.py``).
+Every setting can be overridden with an environment variable:
+
+* ``WEB_CONCURRENCY`` worker processes (default 2 x CPUs + 1, where CPUs
+  honours the container's cgroup quota) and ``GUNICORN_THREADS`` threads per
+  worker (default 4; more than one selects the threaded ``gthread`` worker);
+* the app is loaded once in the master and forked (``preload_app``), so
+  workers share its memory copy-on-write and a recycled worker starts in
+  milliseconds; ``GUNICORN_PRELOAD=False`` turns that off;
+* each worker is replaced after ``GUNICORN_MAX_REQUESTS`` requests, plus a
+  random ``GUNICORN_MAX_REQUESTS_JITTER`` so they do not all restart at once,
+  and (when ``GUNICORN_MAX_WORKER_RSS_MB`` is set) as soon as it outgrows it;
+* new workers fill the master-data cache and preload the newest
+  ``BARCODE_WARM_SIZE`` batches (default 2000) into the barcode index
+  before serving. An index entry takes about 1.5 KB of the worker's
+  private memory, so 2000 cost ~3 MB per worker, where a full
+  ``BARCODE_CACHE_SIZE`` index (50000) would cost ~75 MB;
+* worker memory (RSS, PSS and private MB) is logged when a worker starts,
+  every ``GUNICORN_MEMORY_LOG_EVERY`` requests and when it exits.
+
+The deploy configs run ``gunicorn bol_management.asgi:application`` with
+``GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker`` (ASGI). Uvicorn workers do
+not call the per-request or exit hooks, so their memory is only logged at
+start and the RSS limit does not apply.
+"""
+
+import gc
+import math
+import os
+import time
+
+
+def _cpu_count():
+    """CPUs this container may use: its cgroup quota if any, else the CPUs it can run on"""
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+            if quota > 0:
+                return max(1, math.ceil(quota / period))
+        except (OSError, ValueError):
+            pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == 'true'
+
+
+# Workers and threads
+workers = int(os.environ.get('WEB_CONCURRENCY', 0)) or _cpu_count() * 2 + 1
+# Tell the app how many workers share the host (BOL render pool size)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+# Load Django once in the master and share it with the workers
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+
+# Recycle workers so slow leaks and fragmentation cannot build up
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+# Checked every GUNICORN_MEMORY_LOG_EVERY requests
+max_worker_rss_mb = int(os.environ.get('GUNICORN_MAX_WORKER_RSS_MB', 0))
+memory_log_every = int(os.environ.get('GUNICORN_MEMORY_LOG_EVERY', 500))
+
+# Keep idle client connections open longer than the platform proxy does,
+# so the proxy never reuses a connection gunicorn has just closed
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 65))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Warm each new worker's caches before it takes requests
+warm_caches = _env_bool('GUNICORN_WARM_CACHES', True)
+
+# Heartbeat files in memory: a slow disk must not make workers look hung
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def memory_usage():
+    """
+    ``(rss, pss, private)`` MB of this process, or None off Linux. PSS
+    splits pages shared with the master and other workers between them, so
+    the workers' PSS adds up to their real footprint; private memory is
+    what this worker alone holds.
+    """
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if value.strip().endswith('kB'):
+                    fields[name] = int(value.split()[0])
+    except (OSError, ValueError):
+        return None
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return fields.get('Rss', 0) / 1024, fields.get('Pss', 0) / 1024, private / 1024
+
+
+def _memory_text():
+    usage = memory_usage()
+    if usage is None:
+        return 'memory n/a'
+    return 'rss {:.0f} MB, pss {:.0f} MB, private {:.0f} MB'.format(*usage)
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from django.db import connections
+
+    # Workers must not inherit a connection the master opened while loading the app
+    connections.close_all()
+    # Move the loaded app out of the garbage collector's reach: collections
+    # in a worker would otherwise write to its objects and un-share their pages
+    gc.freeze()
+    server.log.info(f'App preloaded in the master ({_memory_text()})')
+
+
+def post_fork(server, worker):
+    worker.requests_served = 0
+    if not (preload_app and warm_caches):
+        return
+    from django.db import connections
+    from inventory import barcodes, cache
+
+    started = time.perf_counter()
+    try:
+        cache.warm()
+        batches = barcodes.warm()
+    except Exception as e:
+        server.log.error(f'Worker {worker.pid} could not warm its caches: {e}')
+    else:
+        server.log.info(
+            f'Worker {worker.pid} warmed master data and {batches} barcodes in '
+            f'{(time.perf_counter() - started) * 1000:.0f} ms ({_memory_text()})'
+        )
+    finally:
+        # Requests run on other threads with their own connections
+        connections.close_all()
+
+
+def post_request(worker, req, environ, resp):
+    worker.requests_served = getattr(worker, 'requests_served', 0) + 1
+    if not memory_log_every or worker.requests_served % memory_log_every:
+        return
+    usage = memory_usage()
+    if usage is None:
+        return
+    worker.log.info(f'Worker {worker.pid} served {worker.requests_served} requests ({_memory_text()})')
+    if max_worker_rss_mb and usage[0] > max_worker_rss_mb:
+        worker.log.warning(
+            f'Worker {worker.pid} is over GUNICORN_MAX_WORKER_RSS_MB ({usage[0]:.0f} > {max_worker_rss_mb} MB); '
+            f'restarting it'
+        )
+        worker.alive = False
+
+
+def worker_exit(server, worker):
+    server.log.info(
+        f'Worker {worker.pid} exiting after {getattr(worker, "requests_served", 0)} requests ({_memory_text()})'
+    )
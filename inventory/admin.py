@@ -1,10 +1,24 @@
 from django.contrib import admin
 from .models import (
     Item, Size, Supplier, Customer, Carrier, Truck, 
-    Location, Batch, BOL, BOLItem
+    Location, Batch, BOL, BOLItem, InventorySummary, InventoryMovement, InventorySnapshot
 )
 
 
+class RelatedLabelsMixin:
+    """
+    Join the rows that foreign-key <select> option labels need (see the
+    models' __str__), so rendering a change form does not query per option.
+    """
+    label_select_related = {}
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        related = self.label_select_related.get(db_field.name)
+        if related and 'queryset' not in kwargs:
+            kwargs['queryset'] = db_field.related_model._default_manager.select_related(*related)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
     list_display = ['item_code', 'item_name', 'standard_bag_weight', 'is_active', 'created_at']
@@ -48,6 +62,7 @@ class CarrierAdmin(admin.ModelAdmin):
 @admin.register(Truck)
 class TruckAdmin(admin.ModelAdmin):
     list_display = ['truck_number', 'carrier', 'trailer_number', 'is_active', 'created_at']
+    list_select_related = ['carrier']
     list_filter = ['is_active', 'carrier', 'created_at']
     search_fields = ['truck_number', 'trailer_number', 'carrier__carrier_name']
     readonly_fields = ['id', 'created_at', 'updated_at']
@@ -56,6 +71,7 @@ class TruckAdmin(admin.ModelAdmin):
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
     list_display = ['location_name', 'customer', 'location_city', 'location_state', 'is_active']
+    list_select_related = ['customer']
     list_filter = ['is_active', 'customer', 'location_state', 'created_at']
     search_fields = ['location_name', 'customer__customer_name', 'location_city']
     readonly_fields = ['id', 'created_at', 'updated_at']
@@ -64,21 +80,28 @@ class LocationAdmin(admin.ModelAdmin):
 @admin.register(Batch)
 class BatchAdmin(admin.ModelAdmin):
     list_display = ['barcode', 'item', 'size', 'supplier', 'current_quantity', 'status', 'receipt_date']
+    list_select_related = ['item', 'size', 'supplier']
     list_filter = ['status', 'item', 'size', 'supplier', 'receipt_date', 'created_at']
     search_fields = ['barcode', 'lot_number', 'barge', 'item__item_code', 'supplier__supplier_name']
     readonly_fields = ['id', 'created_at', 'updated_at', 'total_weight_mt', 'is_depleted']
     date_hierarchy = 'receipt_date'
 
 
-class BOLItemInline(admin.TabularInline):
+class BOLItemInline(RelatedLabelsMixin, admin.TabularInline):
     model = BOLItem
     extra = 1
     readonly_fields = ['weight_mt']
+    label_select_related = {'batch': ('item', 'size')}
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('batch__item', 'batch__size').with_weight()
 
 
 @admin.register(BOL)
-class BOLAdmin(admin.ModelAdmin):
+class BOLAdmin(RelatedLabelsMixin, admin.ModelAdmin):
     list_display = ['bol_number', 'supplier', 'customer', 'ship_date', 'total_bags', 'total_weight_mt']
+    list_select_related = ['supplier', 'customer']
+    label_select_related = {'location': ('customer',), 'truck': ('carrier',)}
     list_filter = ['supplier', 'customer', 'ship_date', 'created_at']
     search_fields = ['bol_number', 'supplier__supplier_name', 'customer__customer_name']
     readonly_fields = ['id', 'created_at', 'updated_at']
@@ -87,8 +110,58 @@ class BOLAdmin(admin.ModelAdmin):
 
 
 @admin.register(BOLItem)
-class BOLItemAdmin(admin.ModelAdmin):
+class BOLItemAdmin(RelatedLabelsMixin, admin.ModelAdmin):
     list_display = ['bol', 'batch', 'quantity_shipped', 'weight_mt']
+    list_select_related = ['bol__customer', 'batch__item', 'batch__size']
+    label_select_related = {'bol': ('customer',), 'batch': ('item', 'size')}
     list_filter = ['bol__ship_date', 'batch__item', 'batch__supplier']
     search_fields = ['bol__bol_number', 'batch__barcode']
-    readonly_fields = ['weight_mt']
\ No newline at end of file
+    readonly_fields = ['weight_mt']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_weight()
+
+
+@admin.register(InventorySummary)
+class InventorySummaryAdmin(admin.ModelAdmin):
+    list_display = ['item', 'size', 'supplier', 'batches', 'bags', 'weight_mt', 'updated_at']
+    list_filter = ['item', 'size', 'supplier']
+    list_select_related = ['item', 'size', 'supplier']
+    readonly_fields = ['id', 'item', 'size', 'supplier', 'batches', 'bags', 'weight_mt', 'created_at', 'updated_at']
+
+    def has_add_permission(self, request):
+        # Rows are maintained from batch changes; use rebuild_inventory_summary to fix drift
+        return False
+
+
+@admin.register(InventoryMovement)
+class InventoryMovementAdmin(admin.ModelAdmin):
+    list_display = ['effective_date', 'kind', 'item', 'size', 'batch', 'quantity', 'bol', 'note', 'created_at']
+    list_filter = ['kind', 'effective_date']
+    list_select_related = ['item', 'size', 'batch__item', 'batch__size', 'bol__customer']
+    search_fields = ['batch__barcode', 'bol__bol_number']
+    date_hierarchy = 'effective_date'
+    show_full_result_count = False
+
+    # The ledger is append-only: rows are written by batch saves, imports and
+    # shipments, and outlive their batch (only its item, size or supplier
+    # takes them along)
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(InventorySnapshot)
+class InventorySnapshotAdmin(admin.ModelAdmin):
+    list_display = ['snapshot_date', 'item', 'size', 'supplier', 'bags']
+    list_filter = ['snapshot_date', 'item', 'size', 'supplier']
+    list_select_related = ['item', 'size', 'supplier']
+
+    # Snapshots are taken by the snapshot_inventory command
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,230 @@
+"""
+In-memory barcode index for dock scanning.
+
+``lookup`` resolves scanned barcodes to batch summaries from a bounded,
+per-process LRU map, so a repeat scan costs a dict lookup and no query.
+Misses are fetched together in one ``barcode IN (...)`` query and added to
+the map; ``warm`` preloads the newest on-hand batches in one query, a
+bounded number of them since every entry costs each process memory.
+
+Entries are dropped when a batch is saved or deleted (``inventory.signals``)
+and when ``ship_bol`` changes its quantity, and every entry of an item,
+size or supplier when it is saved (its code, label or name may have
+changed). A fetch that was already running when its batch was dropped does
+not put the stale row back. Other worker processes only see those changes
+once their own entry expires, after ``BARCODE_CACHE_TTL`` seconds.
+``BARCODE_CACHE_SIZE`` bounds the number of entries per process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import metrics
+from .models import Batch, Item, Size, Supplier
+from .search import BatchSearch
+
+FIELDS = (
+    'id', 'barcode', 'item_id', 'size_id', 'supplier_id', 'item__item_code',
+    'size__size_label', 'supplier__supplier_name', 'lot_number', 'barge',
+    'current_quantity', 'receipt_date', 'status',
+)
+STATUS_LABELS = dict(Batch.STATUS_CHOICES)
+# Related rows whose names are in the summaries, by their summary key
+RELATED_KEYS = {Item: 'itemId', Size: 'sizeId', Supplier: 'supplierId'}
+
+
+def summarize(row):
+    """The scan payload for one ``Batch.objects.values(*FIELDS)`` row"""
+    return {
+        'batchId': str(row['id']),
+        'barcode': row['barcode'],
+        'itemId': str(row['item_id']),
+        'sizeId': str(row['size_id']),
+        'supplierId': str(row['supplier_id']),
+        'itemCode': row['item__item_code'],
+        'sizeLabel': row['size__size_label'],
+        'supplier': row['supplier__supplier_name'],
+        'lotNo': row['lot_number'] or '',
+        'barge': row['barge'] or '',
+        'currentQuantity': row['current_quantity'],
+        'receiptDate': row['receipt_date'].strftime('%Y-%m-%d'),
+        'status': STATUS_LABELS.get(row['status'], row['status']),
+        'shippable': row['status'] == 'ACTIVE' and row['current_quantity'] > 0,
+    }
+
+
+class BarcodeIndex:
+    """Thread-safe LRU map of barcode -> (expiry, summary)"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # batch id -> barcode, to drop a batch whose barcode has since changed
+        self._barcodes = {}
+        self._lock = threading.Lock()
+        self.warmed = False
+        # Bumped by every discard; while fetches run, batch id -> generation
+        # it was discarded at, and the generation of the last wholesale drop
+        self._generation = 0
+        self._fetches = 0
+        self._discarded = {}
+        self._dropped = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, barcode):
+        with self._lock:
+            entry = self._entries.get(barcode)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(barcode)
+                return None
+            self._entries.move_to_end(barcode)
+            return entry[1]
+
+    @contextmanager
+    def fetching(self):
+        """
+        Wrap a database fetch whose rows go to ``put``: yields the generation
+        to pass it, so rows discarded while the fetch ran are not cached
+        """
+        with self._lock:
+            self._fetches += 1
+            started = self._generation
+        try:
+            yield started
+        finally:
+            with self._lock:
+                self._fetches -= 1
+                if not self._fetches:
+                    self._discarded.clear()
+
+    def put(self, summaries, since=None):
+        """Cache ``summaries``, except those discarded after generation ``since``"""
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            if since is not None and self._dropped > since:
+                return
+            for summary in summaries:
+                if since is not None and self._discarded.get(summary['batchId'], since) > since:
+                    continue
+                self._entries[summary['barcode']] = (expires, summary)
+                self._entries.move_to_end(summary['barcode'])
+                self._barcodes[summary['batchId']] = summary['barcode']
+            while len(self._entries) > self.maxsize:
+                _, (_, summary) = self._entries.popitem(last=False)
+                self._barcodes.pop(summary['batchId'], None)
+
+    def _remove(self, barcode):
+        _, summary = self._entries.pop(barcode)
+        self._barcodes.pop(summary['batchId'], None)
+
+    def discard(self, batch_ids):
+        """Drop the entries of these batches, whatever their barcode is now"""
+        with self._lock:
+            self._generation += 1
+            for batch_id in batch_ids:
+                if self._fetches:
+                    self._discarded[str(batch_id)] = self._generation
+                barcode = self._barcodes.get(str(batch_id))
+                if barcode is not None:
+                    self._remove(barcode)
+
+    def discard_related(self, key, values):
+        """Drop every entry whose summary has ``key`` (e.g. ``itemId``) in ``values``"""
+        values = {str(value) for value in values}
+        with self._lock:
+            self._generation += 1
+            # Rows being fetched may carry the old name too
+            self._dropped = self._generation
+            for barcode in [b for b, (_, summary) in self._entries.items() if summary[key] in values]:
+                self._remove(barcode)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._dropped = self._generation
+            self._entries.clear()
+            self._barcodes.clear()
+            self.warmed = False
+
+
+index = BarcodeIndex(
+    getattr(settings, 'BARCODE_CACHE_SIZE', 50000),
+    getattr(settings, 'BARCODE_CACHE_TTL', 300),
+)
+
+
+def _fetch(queryset):
+    return [summarize(row) for row in queryset.values(*FIELDS)]
+
+
+def warm(limit=None):
+    """
+    Preload the newest on-hand batches in one query: ``limit`` of them,
+    by default ``BARCODE_WARM_SIZE`` (never more than the index holds)
+    """
+    limit = min(limit or getattr(settings, 'BARCODE_WARM_SIZE', 2000), index.maxsize)
+    queryset = (
+        Batch.objects.filter(status__in=Batch.ON_HAND_STATUSES)
+        .order_by('-receipt_date', 'barcode')[:limit]
+    )
+    with index.fetching() as generation:
+        summaries = _fetch(queryset)
+        # Oldest first, so the newest batches end up most recently used
+        index.put(reversed(summaries), generation)
+    index.warmed = True
+    return len(summaries)
+
+
+def lookup(barcodes):
+    """
+    Resolve barcodes to ``{barcode: summary}``; unknown barcodes are
+    left out. Costs at most one query, and none when every barcode is cached.
+    """
+    if not index.warmed:
+        warm()
+    found = {}
+    missing = []
+    for barcode in barcodes:
+        summary = index.get(barcode)
+        metrics.record_cache('barcode', summary is not None)
+        if summary is None:
+            missing.append(barcode)
+        else:
+            found[barcode] = summary
+    if missing:
+        with index.fetching() as generation:
+            fetched = _fetch(Batch.objects.filter(barcode__in=missing).order_by())
+            index.put(fetched, generation)
+        found.update((summary['barcode'], summary) for summary in fetched)
+    return found
+
+
+def lookup_prefix(prefix, limit=20):
+    """
+    Batches whose barcode starts with ``prefix`` (for labels whose end is
+    unreadable), newest first, from one range scan of the barcode index.
+    """
+    queryset = BatchSearch({'barcode': prefix}).apply(Batch.objects.all())
+    with index.fetching() as generation:
+        summaries = _fetch(queryset.order_by('-receipt_date', 'barcode')[:limit])
+        index.put(summaries, generation)
+    return summaries
+
+
+def discard(batch_ids):
+    """Forget cached batches (call once their change is committed)"""
+    index.discard(batch_ids)
+
+
+def discard_related(model, pks):
+    """Forget the cached batches of these items, sizes or suppliers (call once their change is committed)"""
+    index.discard_related(RELATED_KEYS[model], pks)
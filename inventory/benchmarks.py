@@ -0,0 +1,230 @@
+"""
+End-to-end HTTP benchmarks.
+
+Each scenario drives one page, API endpoint or the BOL shipping path
+through the Django test client (the full middleware stack, no network)
+and records latency percentiles, queries per request and response size.
+Reports are plain JSON so two runs can be diffed with ``compare``.
+"""
+
+import logging
+import math
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import resolve, reverse
+
+from .models import BOL, Batch, Carrier, Customer, Item, Location, Supplier, Truck
+from .shipping import ship_bol
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts executed statements"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Scenario:
+    """A named request (``path``) or Python callable (``call``) to time"""
+
+    def __init__(self, name, path=None, call=None, headers=None):
+        self.name = name
+        self.path = path
+        self.call = call
+        self.headers = headers or {}
+
+    def run(self, client):
+        """Run once and return the number of response bytes"""
+        if self.call is not None:
+            self.call()
+            return 0
+        response = client.get(self.path, secure=True, **self.headers)
+        if response.status_code != 200:
+            raise RuntimeError(f'{self.path} returned {response.status_code}')
+        if response.streaming:
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _ship_sample(batch_ids, supplier_id, customer_id):
+    """Ship two bags from each sample batch, then roll the BOL back"""
+    with transaction.atomic():
+        ship_bol(
+            {'supplier_id': supplier_id, 'customer_id': customer_id},
+            [{'batch': batch_id, 'quantity': 2} for batch_id in batch_ids],
+        )
+        transaction.set_rollback(True)
+
+
+def _has_template(path):
+    """Whether the template of the view behind ``path`` exists"""
+    template_name = getattr(resolve(path).func.view_class, 'template_name', None)
+    if template_name is None:
+        return True
+    try:
+        get_template(template_name)
+    except TemplateDoesNotExist:
+        return False
+    return True
+
+
+def default_scenarios():
+    """
+    List, detail, form, API and shipping scenarios built from the current
+    data. Pages whose template does not exist yet are left out.
+    """
+    pages = [('main_menu', reverse('inventory:main_menu')), ('reports', reverse('inventory:reports'))]
+    for name in ('item', 'size', 'supplier', 'customer', 'carrier', 'truck', 'location', 'batch'):
+        pages.append((f'{name}_list', reverse(f'inventory:{name}_list')))
+        pages.append((f'{name}_create', reverse(f'inventory:{name}_create')))
+    for model in (Item, Supplier, Customer, Carrier, Truck, Location, Batch):
+        pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+        if pk is not None:
+            name = model._meta.model_name
+            pages.append((f'{name}_detail', reverse(f'inventory:{name}_detail', args=[pk])))
+
+    scenarios = [Scenario(name, path) for name, path in pages if _has_template(path)]
+    scenarios.append(Scenario('health', reverse('inventory:health_check')))
+    for name in ('items', 'sizes', 'suppliers', 'customers', 'carriers', 'trucks', 'locations', 'batches'):
+        scenarios.append(Scenario(f'api_{name}', reverse(f'inventory:api_{name}')))
+    scenarios.append(Scenario('api_batches_active', reverse('inventory:api_batches') + '?status=ACTIVE'))
+    scenarios.append(Scenario(
+        'api_batches_stream',
+        reverse('inventory:api_batches') + '?status=ACTIVE&stream=ndjson',
+    ))
+
+    barcode = Batch.objects.order_by('pk').values_list('barcode', flat=True).first()
+    if barcode is not None:
+        scenarios.append(Scenario('api_batch_scan', reverse('inventory:api_batch_scan', args=[barcode])))
+
+    ship_date = BOL.objects.order_by('-ship_date').values_list('ship_date', flat=True).first()
+    if ship_date is not None:
+        scenarios.append(Scenario(
+            'api_bols_pdf',
+            reverse('inventory:api_bols_pdf') + f'?ship_date={ship_date.isoformat()}',
+        ))
+
+    batch_ids = list(
+        Batch.objects.filter(status='ACTIVE', current_quantity__gte=2)
+        .order_by('pk').values_list('pk', flat=True)[:10]
+    )
+    bol = BOL.objects.order_by('pk').values('supplier_id', 'customer_id').first()
+    if batch_ids and bol:
+        scenarios.append(Scenario(
+            'ship_bol_10_lines',
+            call=lambda: _ship_sample(batch_ids, bol['supplier_id'], bol['customer_id']),
+        ))
+    return scenarios
+
+
+def measure(scenario, client, iterations, warmup):
+    """Time ``scenario`` and return its latency/query/size statistics"""
+    cache.clear()
+    for _ in range(warmup):
+        scenario.run(client)
+
+    timings = []
+    queries = []
+    sizes = []
+    for _ in range(iterations):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            sizes.append(scenario.run(client))
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+
+    return {
+        'path': scenario.path,
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': max(queries),
+        'bytes': max(sizes),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(iterations=30, warmup=3, only=None, progress=None):
+    """Run every scenario (or those whose name contains ``only``) and return the report"""
+    client = Client()
+    results = {}
+    # Keep the per-request log lines of RequestTimingMiddleware out of the report output
+    request_logger = logging.getLogger('inventory.requests')
+    level = request_logger.level
+    request_logger.setLevel(logging.ERROR)
+    try:
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for scenario in default_scenarios():
+                if only and only not in scenario.name:
+                    continue
+                results[scenario.name] = measure(scenario, client, iterations, warmup)
+                if progress:
+                    progress(scenario.name, results[scenario.name])
+    finally:
+        request_logger.setLevel(level)
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'revision': _git_revision(),
+        'database': connection.vendor,
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'rows': {
+            'batches': Batch.objects.count(),
+            'bols': BOL.objects.count(),
+            'customers': Customer.objects.count(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    Return ``(scenario, metric, before, after)`` for every regression.
+
+    p95 latency and response bytes regress when they grow by more than
+    ``threshold`` (a fraction); queries per request regress on any increase.
+    """
+    regressions = []
+    for name, after in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        for metric in ('p95_ms', 'bytes'):
+            if after[metric] > before[metric] * (1 + threshold):
+                regressions.append((name, metric, before[metric], after[metric]))
+        if after['queries'] > before['queries']:
+            regressions.append((name, 'queries', before['queries'], after['queries']))
+    return regressions
@@ -0,0 +1,350 @@
+"""
+Bulk create/update/delete of master data.
+
+``apply`` takes a list of JSON records for one resource (items, sizes,
+suppliers, customers, carriers, trucks or locations), validates all of them
+up front with a fixed number of queries (field validation in Python, one
+query per uniqueness rule and per foreign key), and only if every record
+is valid applies them with ``bulk_create``, ``bulk_update`` or a single
+``DELETE ... WHERE id IN`` inside one transaction. It always returns one
+result per record, in request order.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from . import barcodes, cache
+from .models import Carrier, Customer, InventorySummary, Item, Location, Size, Supplier, Truck
+
+
+class Resource:
+    """How the JSON records of one API resource map onto a model"""
+
+    def __init__(self, model, id_key, fields, create_only=()):
+        self.model = model
+        self.id_key = id_key
+        # {JSON key: model attribute}
+        self.fields = fields
+        self.create_only = set(create_only)
+
+    @cached_property
+    def foreign_keys(self):
+        """``{attname: related model}`` for the FK columns records may set"""
+        relations = {}
+        for attribute in self.fields.values():
+            field = self.model._meta.get_field(attribute.removesuffix('_id'))
+            if field.many_to_one:
+                relations[attribute] = field.related_model
+        return relations
+
+    @cached_property
+    def unique_rules(self):
+        """Tuples of attnames that must be unique together, single fields included"""
+        attributes = set(self.fields.values())
+        rules = []
+        for field in self.model._meta.concrete_fields:
+            if field.unique and not field.primary_key and field.attname in attributes:
+                rules.append((field.attname,))
+        for fields in self.model._meta.unique_together:
+            rules.append(tuple(self.model._meta.get_field(name).attname for name in fields))
+        return rules
+
+
+RESOURCES = {
+    'items': Resource(Item, 'itemId', {
+        'itemCode': 'item_code',
+        'itemName': 'item_name',
+        'standardBagWeight': 'standard_bag_weight',
+        'active': 'is_active',
+    }),
+    'sizes': Resource(Size, 'sizeId', {
+        'sizeLabel': 'size_label',
+        'active': 'is_active',
+    }),
+    'suppliers': Resource(Supplier, 'supplierId', {
+        'supplierName': 'supplier_name',
+        'bolPrefix': 'bol_prefix',
+        'nextBolNo': 'next_bol_no',
+        'contactName': 'contact_name',
+        'contactPhone': 'contact_phone',
+        'contactEmail': 'contact_email',
+        'notes': 'notes',
+        'active': 'is_active',
+    }, create_only=('nextBolNo',)),  # later numbers come from the BOL allocator
+    'customers': Resource(Customer, 'customerId', {
+        'customerName': 'customer_name',
+        'customerCode': 'customer_code',
+        'customerAddress': 'customer_address',
+        'customerCity': 'customer_city',
+        'customerState': 'customer_state',
+        'customerZip': 'customer_zip',
+        'contactName': 'contact_name',
+        'contactPhone': 'contact_phone',
+        'contactEmail': 'contact_email',
+        'notes': 'notes',
+        'active': 'is_active',
+    }),
+    'carriers': Resource(Carrier, 'carrierId', {
+        'carrierName': 'carrier_name',
+        'carrierCode': 'carrier_code',
+        'contactName': 'contact_name',
+        'contactPhone': 'contact_phone',
+        'contactEmail': 'contact_email',
+        'notes': 'notes',
+        'active': 'is_active',
+    }),
+    'trucks': Resource(Truck, 'truckId', {
+        'carrierId': 'carrier_id',
+        'truckNo': 'truck_number',
+        'trailerNo': 'trailer_number',
+        'active': 'is_active',
+    }),
+    'locations': Resource(Location, 'locationId', {
+        'customerId': 'customer_id',
+        'locationName': 'location_name',
+        'locationAddress': 'location_address',
+        'locationCity': 'location_city',
+        'locationState': 'location_state',
+        'locationZip': 'location_zip',
+        'active': 'is_active',
+    }),
+}
+
+
+class BulkResult:
+    """
+    Per-record outcomes; ``ok`` is False when anything failed and nothing was saved.
+    Records that passed validation in a failed request are marked ``valid``.
+    """
+
+    def __init__(self, count):
+        self.results = [{'index': index, 'status': None} for index in range(count)]
+
+    def error(self, index, message):
+        result = self.results[index]
+        result['status'] = 'error'
+        result.setdefault('errors', []).append(message)
+
+    @property
+    def errors(self):
+        return [result for result in self.results if result['status'] == 'error']
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _parse_id(model, value):
+    return model._meta.pk.to_python(value)
+
+
+def _validate_ids(resource, records, result, required):
+    """Return ``{index: pk}`` for records that carry a valid id"""
+    ids = {}
+    seen = {}
+    for index, record in enumerate(records):
+        value = record.get(resource.id_key)
+        if value in (None, ''):
+            if required:
+                result.error(index, f'{resource.id_key} is required')
+            continue
+        try:
+            pk = _parse_id(resource.model, value)
+        except ValidationError:
+            result.error(index, f'{resource.id_key} is not a valid id')
+            continue
+        if pk in seen:
+            result.error(index, f'{resource.id_key} repeats record {seen[pk]}')
+            continue
+        seen[pk] = index
+        ids[index] = pk
+    return ids
+
+
+def _assign(resource, obj, record, index, result, creating):
+    """Copy a record's values onto ``obj``; return the attributes it set"""
+    assigned = []
+    for key, value in record.items():
+        if key == resource.id_key:
+            continue
+        attribute = resource.fields.get(key)
+        if attribute is None:
+            result.error(index, f'Unknown field {key}')
+            continue
+        if not creating and key in resource.create_only:
+            result.error(index, f'{key} can only be set when creating')
+            continue
+        if attribute in resource.foreign_keys and value not in (None, ''):
+            try:
+                value = _parse_id(resource.foreign_keys[attribute], value)
+            except ValidationError:
+                result.error(index, f'{key} is not a valid id')
+                continue
+        setattr(obj, attribute, value)
+        assigned.append(attribute)
+    return assigned
+
+
+def _clean(resource, obj, index, result, fields=None):
+    """Field validation without queries; FK existence is checked separately"""
+    exclude = [
+        field.name for field in resource.model._meta.concrete_fields
+        if field.many_to_one or (fields is not None and field.attname not in fields)
+    ]
+    try:
+        obj.clean_fields(exclude=exclude)
+    except ValidationError as e:
+        for field, messages in e.message_dict.items():
+            for message in messages:
+                result.error(index, f'{field}: {message}')
+
+
+def _check_foreign_keys(resource, objects, result):
+    """One query per related model to make sure referenced rows exist"""
+    for attribute, related in resource.foreign_keys.items():
+        wanted = {getattr(obj, attribute) for obj in objects.values()} - {None}
+        existing = set(related.objects.filter(pk__in=wanted).values_list('pk', flat=True))
+        for index, obj in objects.items():
+            value = getattr(obj, attribute)
+            if value is None:
+                field = resource.model._meta.get_field(attribute.removesuffix('_id'))
+                if not field.null:
+                    result.error(index, f'{attribute} is required')
+            elif value not in existing:
+                result.error(index, f'{related._meta.verbose_name} {value} does not exist')
+
+
+def _check_unique(resource, objects, result):
+    """One query per uniqueness rule, plus clashes between records in the request"""
+    model = resource.model
+    for rule in resource.unique_rules:
+        keys = {}
+        for index, obj in objects.items():
+            key = tuple(getattr(obj, attribute) for attribute in rule)
+            if None in key:
+                continue
+            if key in keys:
+                result.error(index, f"{', '.join(rule)} repeats record {keys[key]}")
+            else:
+                keys[key] = index
+        if not keys:
+            continue
+        candidates = model.objects.filter(**{
+            f'{attribute}__in': {key[position] for key in keys}
+            for position, attribute in enumerate(rule)
+        }).values_list('pk', *rule)
+        for pk, *values in candidates:
+            index = keys.get(tuple(values))
+            if index is not None and objects[index].pk != pk:
+                label = ', '.join(f'{attribute}={value}' for attribute, value in zip(rule, values))
+                result.error(index, f'{model._meta.verbose_name} with {label} already exists')
+
+
+def _create(resource, records, result):
+    objects = {}
+    ids = _validate_ids(resource, records, result, required=False)
+    for index, record in enumerate(records):
+        obj = resource.model()
+        if index in ids:
+            obj.pk = ids[index]
+        _assign(resource, obj, record, index, result, creating=True)
+        _clean(resource, obj, index, result)
+        objects[index] = obj
+    if ids:
+        taken = set(resource.model.objects.filter(pk__in=ids.values()).values_list('pk', flat=True))
+        for index, pk in ids.items():
+            if pk in taken:
+                result.error(index, f'{resource.id_key} {pk} already exists')
+    _check_foreign_keys(resource, objects, result)
+    _check_unique(resource, objects, result)
+    if not result.ok:
+        return
+
+    resource.model.objects.bulk_create(objects.values())
+    for index, obj in objects.items():
+        result.results[index].update(status='created', id=str(obj.pk))
+
+
+def _update(resource, records, result):
+    model = resource.model
+    ids = _validate_ids(resource, records, result, required=True)
+    # Lock the rows being changed so a concurrent save cannot be overwritten
+    current = model.objects.select_for_update().order_by('pk').in_bulk(list(ids.values()))
+    objects = {}
+    changed = set()
+    reweigh = []
+    for index, pk in ids.items():
+        obj = current.get(pk)
+        if obj is None:
+            result.error(index, f'{model._meta.verbose_name} {pk} not found')
+            continue
+        old_weight = getattr(obj, 'standard_bag_weight', None)
+        assigned = _assign(resource, obj, records[index], index, result, creating=False)
+        _clean(resource, obj, index, result, fields=assigned)
+        changed.update(assigned)
+        objects[index] = obj
+        if 'standard_bag_weight' in assigned and obj.standard_bag_weight != old_weight:
+            reweigh.append(pk)
+    _check_foreign_keys(resource, objects, result)
+    _check_unique(resource, objects, result)
+    if not result.ok:
+        return
+
+    if changed:
+        now = timezone.now()
+        for obj in objects.values():
+            obj.updated_at = now
+        model.objects.bulk_update(objects.values(), sorted(changed | {'updated_at'}), batch_size=500)
+    if reweigh:
+        # bulk_update skips the post_save signal that keeps summary weights in step
+        InventorySummary.objects.reweigh(reweigh)
+    if changed and model in barcodes.RELATED_KEYS:
+        # ... and the one that drops renamed rows from the barcode index
+        pks = [obj.pk for obj in objects.values()]
+        transaction.on_commit(lambda: barcodes.discard_related(model, pks))
+    for index, obj in objects.items():
+        result.results[index].update(status='updated', id=str(obj.pk))
+
+
+def _delete(resource, records, result):
+    model = resource.model
+    ids = _validate_ids(resource, records, result, required=True)
+    existing = set(model.objects.filter(pk__in=ids.values()).values_list('pk', flat=True))
+    for index, pk in ids.items():
+        if pk not in existing:
+            result.error(index, f'{model._meta.verbose_name} {pk} not found')
+    if not result.ok:
+        return
+
+    model.objects.filter(pk__in=ids.values()).delete()
+    for index, pk in ids.items():
+        result.results[index].update(status='deleted', id=str(pk))
+
+
+def apply(resource_name, operation, records):
+    """
+    Validate and apply ``operation`` ('create', 'update' or 'delete') to a
+    list of JSON records, all or nothing, and return a ``BulkResult``.
+    """
+    resource = RESOURCES[resource_name]
+    result = BulkResult(len(records))
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            result.error(index, 'Record must be an object')
+    if not result.ok:
+        return result
+
+    handler = {'create': _create, 'update': _update, 'delete': _delete}[operation]
+    with transaction.atomic():
+        handler(resource, records, result)
+        if not result.ok:
+            transaction.set_rollback(True)
+            for record_result in result.results:
+                if record_result['status'] is None:
+                    record_result['status'] = 'valid'
+        elif operation != 'delete':
+            # bulk_create/bulk_update send no signals; deletes do
+            transaction.on_commit(lambda: cache.invalidate(resource.model))
+    return result
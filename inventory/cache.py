@@ -0,0 +1,115 @@
+"""
+Reference-data cache.
+
+The small master tables that feed dropdowns (items, sizes, suppliers,
+customers, carriers) are cached as lists of active instances under
+versioned keys. Saving or deleting a row bumps the table's version (see
+``inventory.signals``), so readers rebuild on their next access and the old
+entry simply expires.
+
+The cache alias and timeout come from ``REFERENCE_CACHE_ALIAS`` and
+``REFERENCE_CACHE_TIMEOUT``. With the default local-memory backend each
+worker invalidates only its own copy, so other workers may serve stale data
+for up to the timeout; point the alias at a shared (file/database) cache to
+invalidate everywhere at once.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .models import Carrier, Customer, Item, Size, Supplier
+
+REFERENCE_MODELS = (Item, Size, Supplier, Customer, Carrier)
+
+KEY_PREFIX = 'refdata'
+
+
+def _cache():
+    return caches[getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'REFERENCE_CACHE_TIMEOUT', 300)
+
+
+def _version_key(model):
+    return f"{KEY_PREFIX}:{model._meta.label_lower}:version"
+
+
+def get_version(model):
+    """Return the current cache version for a reference table"""
+    cache = _cache()
+    version = cache.get(_version_key(model))
+    if version is None:
+        cache.add(_version_key(model), 1, None)
+        version = cache.get(_version_key(model), 1)
+    return version
+
+
+def invalidate(model):
+    """Bump a table's version so cached copies are no longer read"""
+    if model not in REFERENCE_MODELS:
+        return
+    cache = _cache()
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        # Version key evicted: restart from a value that cannot collide with
+        # an older version still sitting in the cache
+        cache.set(_version_key(model), time.time_ns(), None)
+
+
+def get_active(model, row_count=None, last_modified=None):
+    """
+    Return the active rows of a reference table, from cache when possible.
+
+    Callers that already know the table's current ``row_count`` and newest
+    ``last_modified`` (e.g. from a conditional GET validator) can pass them
+    to reject a copy another worker has not invalidated yet.
+    """
+    cache = _cache()
+    key = f"{KEY_PREFIX}:{model._meta.label_lower}:{get_version(model)}"
+    rows = cache.get(key)
+    if rows is not None and _is_stale(rows, row_count, last_modified):
+        invalidate(model)
+        key = f"{KEY_PREFIX}:{model._meta.label_lower}:{get_version(model)}"
+        rows = None
+    metrics.record_cache('refdata', rows is not None)
+    if rows is None:
+        rows = list(model.objects.filter(is_active=True))
+        cache.set(key, rows, _timeout())
+    return rows
+
+
+def _is_stale(rows, row_count, last_modified):
+    if row_count is not None and len(rows) != row_count:
+        return True
+    if last_modified is not None:
+        return not rows or max(obj.updated_at for obj in rows) < last_modified
+    return False
+
+
+def get_choices(model, empty_label=None):
+    """Return ``(pk, label)`` choices for a ModelChoiceField built from the cache"""
+    choices = [(str(obj.pk), str(obj)) for obj in get_active(model)]
+    if empty_label is not None:
+        choices.insert(0, ('', empty_label))
+    return choices
+
+
+def use_cached_choices(field, model):
+    """
+    Point a ModelChoiceField at the active rows of ``model`` and render its
+    options from the cache; the queryset is only hit to validate a submission.
+    """
+    field.queryset = model.objects.filter(is_active=True)
+    field.choices = get_choices(model, field.empty_label)
+
+
+def warm():
+    """Populate the cache for every reference table"""
+    for model in REFERENCE_MODELS:
+        get_active(model)
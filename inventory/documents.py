@@ -0,0 +1,209 @@
+"""
+Bill of Lading PDF rendering.
+
+``render`` builds the PDF pages for any number of BOLs:
+
+* the BOLs and their supplier, customer, location and truck come from one
+  query; the line items with their batches, items and sizes from one more,
+  made only for BOLs that are not cached;
+* rendered pages are cached per BOL under a key built from the BOL's
+  ``updated_at`` and its newest line item's, so an edited BOL is rendered
+  again and an unchanged one never is;
+* when at least ``BOL_RENDER_POOL_MIN`` BOLs miss the cache they are laid
+  out in a ``ProcessPoolExecutor`` (see ``inventory.pdf``), otherwise in
+  the request's own process. A BOL takes well under a millisecond to lay
+  out, so smaller runs would spend more on sending work to the pool than
+  they save. Each web worker process gets its share of
+  ``BOL_RENDER_WORKERS`` (``WEB_CONCURRENCY`` of them share it) and skips
+  the pool when that share is a single process; an idle pool is shut down
+  after ``BOL_RENDER_POOL_IDLE`` seconds.
+
+``bol_pdf`` returns one BOL's PDF and ``ship_date_pdf`` every BOL shipped
+on a day merged into one file for printing.
+
+Renamed customers, carriers or locations do not change a BOL's key; its
+cached PDF keeps the old details until it expires after
+``BOL_PDF_CACHE_TIMEOUT`` seconds or the BOL is saved again.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, OuterRef, Prefetch, Subquery, prefetch_related_objects
+
+from . import metrics, pdf
+from .models import BOL, BOLItem
+
+CACHE_PREFIX = 'bolpdf'
+
+_pool = None
+_pool_lock = threading.Lock()
+# Renders using the pool, and the timer that shuts it down once idle
+_pool_users = 0
+_idle_timer = None
+
+
+def _workers():
+    """This web worker's share of the render processes"""
+    total = getattr(settings, 'BOL_RENDER_WORKERS', None) or os.cpu_count() or 1
+    return max(1, total // max(1, getattr(settings, 'WEB_CONCURRENCY', 1)))
+
+
+@contextmanager
+def _executor():
+    global _pool, _pool_users, _idle_timer
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: forking a threaded server process can copy held locks
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context('spawn'))
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+            _idle_timer = None
+        _pool_users += 1
+        pool = _pool
+    try:
+        yield pool
+    finally:
+        with _pool_lock:
+            _pool_users -= 1
+            if not _pool_users and _pool is pool:
+                _idle_timer = threading.Timer(getattr(settings, 'BOL_RENDER_POOL_IDLE', 60), _shutdown_idle)
+                _idle_timer.daemon = True
+                _idle_timer.start()
+
+
+def _shutdown_idle():
+    """Stop the render processes unless a render started meanwhile"""
+    global _pool, _idle_timer
+    with _pool_lock:
+        if _pool_users or _pool is None:
+            return
+        _pool.shutdown(wait=False)
+        _pool = None
+        _idle_timer = None
+
+
+def _discard_executor():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render_documents(documents):
+    """Page streams for each document, in order, using the worker pool for large runs"""
+    workers = _workers()
+    if workers < 2 or len(documents) < getattr(settings, 'BOL_RENDER_POOL_MIN', 50):
+        return [pdf.render_bol(document) for document in documents]
+    chunksize = max(1, len(documents) // (workers * 4))
+    try:
+        with _executor() as pool:
+            return list(pool.map(pdf.render_bol, documents, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); render here and start a fresh pool next time
+        _discard_executor()
+        return [pdf.render_bol(document) for document in documents]
+
+
+def _lines(*values):
+    return [value for value in values if value]
+
+
+def _address(name, street, city, state, zip_code):
+    return _lines(name, street, ' '.join(_lines(f'{city},' if city and state else city, state, zip_code)))
+
+
+def document(bol):
+    """The plain-data input of ``pdf.render_bol`` for a BOL with its items prefetched"""
+    supplier = bol.supplier
+    customer = bol.customer
+    location = bol.location
+    truck = bol.truck
+    return {
+        'bol_number': bol.bol_number,
+        'ship_date': bol.ship_date.isoformat(),
+        'notes': bol.notes,
+        'shipper': _lines(
+            supplier.supplier_name, supplier.contact_name, supplier.contact_phone, supplier.contact_email
+        ),
+        'consignee': _address(
+            customer.customer_name, customer.customer_address, customer.customer_city,
+            customer.customer_state, customer.customer_zip,
+        ),
+        'ship_to': _address(
+            location.location_name, location.location_address, location.location_city,
+            location.location_state, location.location_zip,
+        ) if location else ['Same as consignee'],
+        'carrier': _lines(
+            truck.carrier.carrier_name,
+            f'Truck {truck.truck_number}',
+            f'Trailer {truck.trailer_number}' if truck.trailer_number else '',
+        ) if truck else ['Not assigned'],
+        'items': [
+            (
+                item.batch.barcode, item.batch.item.item_code, item.batch.size.size_label,
+                item.batch.lot_number, item.quantity_shipped, item.weight_mt,
+            )
+            for item in bol.items.all()
+        ],
+    }
+
+
+def _cache_key(bol):
+    stamp = f'{pdf.LAYOUT_VERSION}|{bol.updated_at.isoformat()}|{bol.items_updated}'
+    return f'{CACHE_PREFIX}:{bol.pk}:{hashlib.md5(stamp.encode(), usedforsecurity=False).hexdigest()}'
+
+
+def render(bols):
+    """
+    ``[(bol, page streams)]`` for a BOL queryset, in its order: at most two
+    queries and one cache round-trip, plus rendering of BOLs not cached.
+    """
+    newest_item = (
+        BOLItem.objects.filter(bol=OuterRef('pk')).order_by().values('bol')
+        .annotate(newest=Max('updated_at')).values('newest')
+    )
+    bols = list(
+        bols.select_related('supplier', 'customer', 'location', 'truck__carrier')
+        .annotate(items_updated=Subquery(newest_item))
+    )
+    keys = {bol.pk: _cache_key(bol) for bol in bols}
+    cached = cache.get_many(list(keys.values()))
+    missing = [bol for bol in bols if keys[bol.pk] not in cached]
+    for bol in bols:
+        metrics.record_cache('bol_pdf', keys[bol.pk] in cached)
+
+    if missing:
+        prefetch_related_objects(missing, Prefetch(
+            'items',
+            queryset=BOLItem.objects.select_related('batch__item', 'batch__size').order_by('batch__barcode'),
+        ))
+        rendered = render_documents([document(bol) for bol in missing])
+        fresh = {keys[bol.pk]: pages for bol, pages in zip(missing, rendered)}
+        cache.set_many(fresh, getattr(settings, 'BOL_PDF_CACHE_TIMEOUT', 604800))
+        cached.update(fresh)
+    return [(bol, cached[keys[bol.pk]]) for bol in bols]
+
+
+def bol_pdf(pk):
+    """``(bol, pdf bytes)`` for one BOL; raises ``BOL.DoesNotExist``"""
+    rendered = render(BOL.objects.filter(pk=pk))
+    if not rendered:
+        raise BOL.DoesNotExist(f'No BOL {pk}')
+    bol, pages = rendered[0]
+    return bol, pdf.assemble(pages, title=f'BOL {bol.bol_number}')
+
+
+def ship_date_pdf(ship_date):
+    """``(BOL count, pdf bytes)`` of every BOL shipped on ``ship_date``, in BOL number order"""
+    rendered = render(BOL.objects.filter(ship_date=ship_date).order_by('bol_number'))
+    pages = [page for _, bol_pages in rendered for page in bol_pages]
+    return len(rendered), pdf.assemble(pages, title=f'BOLs shipped {ship_date.isoformat()}')
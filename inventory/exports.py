@@ -0,0 +1,180 @@
+"""
+Constant-memory CSV/XLSX exports of batches, BOLs and BOL line items.
+
+Rows are read with ``values_list(...).iterator()`` (a server-side cursor
+on PostgreSQL), so no model instances are built and only one chunk of
+rows is in memory at a time. ``stream_csv`` is a generator that yields
+encoded CSV as rows arrive, so an HTTP download starts at once.
+``write_xlsx`` appends rows to an openpyxl write-only workbook, which
+spools the sheet XML to a temporary file rather than keeping cells in
+memory. An XLSX can only be sent once it is complete, and sheets are
+split every ``XLSX_MAX_ROWS`` rows to stay under Excel's limit.
+"""
+
+import csv
+import tempfile
+import uuid
+from datetime import date
+
+from .models import BOL, BOLItem, Batch
+from .search import BatchSearch
+
+CHUNK_SIZE = 2000
+# Rows per CSV chunk handed to the response
+CSV_ROWS_PER_CHUNK = 500
+# Excel's sheet limit, less the header row
+XLSX_MAX_ROWS = 1048575
+
+
+def _parse_date(params, name):
+    return date.fromisoformat(params[name]) if params.get(name) else None
+
+
+def _shipment_filters(params, prefix=''):
+    """
+    Filters shared by BOLs and BOL items: shipped_from/shipped_to/customer/supplier.
+    Raises ValueError on malformed values.
+    """
+    filters = {}
+    shipped_from = _parse_date(params, 'shipped_from')
+    shipped_to = _parse_date(params, 'shipped_to')
+    if shipped_from:
+        filters[f'{prefix}ship_date__gte'] = shipped_from
+    if shipped_to:
+        filters[f'{prefix}ship_date__lte'] = shipped_to
+    for param in ('customer', 'supplier'):
+        if params.get(param):
+            filters[f'{prefix}{param}_id'] = uuid.UUID(params[param])
+    return filters
+
+
+def batch_rows(params):
+    return (
+        BatchSearch(params).apply(Batch.objects.all())
+        .order_by('-receipt_date', 'barcode')
+    )
+
+
+def bol_rows(params):
+    return BOL.objects.filter(**_shipment_filters(params)).order_by('ship_date', 'bol_number')
+
+
+def bol_item_rows(params):
+    items = BOLItem.objects.filter(**_shipment_filters(params, 'bol__'))
+    if params.get('item'):
+        items = items.filter(batch__item_id=uuid.UUID(params['item']))
+    return items.with_weight().order_by('bol__ship_date', 'bol__bol_number', 'batch__barcode')
+
+
+class Dataset:
+    """An exportable queryset and its ``(field, column title)`` pairs"""
+
+    def __init__(self, queryset, columns):
+        self.queryset = queryset
+        self.columns = columns
+
+    def headers(self):
+        return [title for _, title in self.columns]
+
+    def rows(self, params):
+        """Tuples of column values, fetched chunk by chunk"""
+        queryset = self.queryset(params).values_list(*(field for field, _ in self.columns))
+        return queryset.iterator(chunk_size=CHUNK_SIZE)
+
+
+DATASETS = {
+    'batches': Dataset(batch_rows, (
+        ('barcode', 'Barcode'),
+        ('item__item_code', 'Item'),
+        ('size__size_label', 'Size'),
+        ('supplier__supplier_name', 'Supplier'),
+        ('lot_number', 'Lot'),
+        ('barge', 'Barge'),
+        ('receipt_date', 'Receipt date'),
+        ('starting_quantity', 'Starting bags'),
+        ('current_quantity', 'Current bags'),
+        ('status', 'Status'),
+        ('notes', 'Notes'),
+    )),
+    'bols': Dataset(bol_rows, (
+        ('bol_number', 'BOL'),
+        ('ship_date', 'Ship date'),
+        ('supplier__supplier_name', 'Supplier'),
+        ('customer__customer_name', 'Customer'),
+        ('location__location_name', 'Location'),
+        ('truck__carrier__carrier_name', 'Carrier'),
+        ('truck__truck_number', 'Truck'),
+        ('total_bags', 'Bags'),
+        ('total_weight_mt', 'Weight (MT)'),
+        ('notes', 'Notes'),
+    )),
+    'bol_items': Dataset(bol_item_rows, (
+        ('bol__bol_number', 'BOL'),
+        ('bol__ship_date', 'Ship date'),
+        ('bol__customer__customer_name', 'Customer'),
+        ('bol__supplier__supplier_name', 'Supplier'),
+        ('batch__barcode', 'Barcode'),
+        ('batch__item__item_code', 'Item'),
+        ('batch__size__size_label', 'Size'),
+        ('batch__lot_number', 'Lot'),
+        ('quantity_shipped', 'Bags'),
+        ('weight', 'Weight (MT)'),
+    )),
+}
+
+
+class _Line:
+    """Minimal file object for csv.writer: returns the line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(dataset, params):
+    """
+    An iterator of CSV bytes, ``CSV_ROWS_PER_CHUNK`` rows at a time. Filters
+    are parsed before it is returned, so bad ones raise ValueError here
+    rather than midway through a response.
+    """
+    rows = dataset.rows(params)
+    writer = csv.writer(_Line())
+
+    def chunks():
+        yield writer.writerow(dataset.headers()).encode()
+        lines = []
+        for row in rows:
+            lines.append(writer.writerow(row))
+            if len(lines) >= CSV_ROWS_PER_CHUNK:
+                yield ''.join(lines).encode()
+                lines = []
+        if lines:
+            yield ''.join(lines).encode()
+
+    return chunks()
+
+
+def write_xlsx(dataset, params, fileobj, title):
+    """Write the dataset into ``fileobj`` as an XLSX workbook; returns the row count"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    count = 0
+    for row in dataset.rows(params):
+        if count % XLSX_MAX_ROWS == 0:
+            sheet = workbook.create_sheet(f'{title} {count // XLSX_MAX_ROWS + 1}' if count else title)
+            sheet.append(dataset.headers())
+        sheet.append(row)
+        count += 1
+    if sheet is None:
+        workbook.create_sheet(title).append(dataset.headers())
+    workbook.save(fileobj)
+    return count
+
+
+def xlsx_file(dataset, params, title):
+    """The dataset as an XLSX in a temporary file, rewound for reading"""
+    fileobj = tempfile.TemporaryFile()
+    write_xlsx(dataset, params, fileobj, title)
+    fileobj.seek(0)
+    return fileobj
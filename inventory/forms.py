@@ -1,4 +1,5 @@
 from django import forms
+from .cache import use_cached_choices
 from .models import (
     Item, Size, Supplier, Customer, Carrier, Truck,
     Location, Batch, BOL, BOLItem
@@ -207,7 +208,7 @@ class TruckForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['carrier'].queryset = Carrier.objects.filter(is_active=True)
+        use_cached_choices(self.fields['carrier'], Carrier)
 
 
 class LocationForm(forms.ModelForm):
@@ -249,7 +250,7 @@ class LocationForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['customer'].queryset = Customer.objects.filter(is_active=True)
+        use_cached_choices(self.fields['customer'], Customer)
 
 
 class BatchForm(forms.ModelForm):
@@ -302,9 +303,9 @@ class BatchForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['item'].queryset = Item.objects.filter(is_active=True)
-        self.fields['size'].queryset = Size.objects.filter(is_active=True)
-        self.fields['supplier'].queryset = Supplier.objects.filter(is_active=True)
+        use_cached_choices(self.fields['item'], Item)
+        use_cached_choices(self.fields['size'], Size)
+        use_cached_choices(self.fields['supplier'], Supplier)
 
 
 class BOLForm(forms.ModelForm):
@@ -344,10 +345,15 @@ class BOLForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['supplier'].queryset = Supplier.objects.filter(is_active=True)
-        self.fields['customer'].queryset = Customer.objects.filter(is_active=True)
-        self.fields['location'].queryset = Location.objects.filter(is_active=True)
-        self.fields['truck'].queryset = Truck.objects.filter(is_active=True)
+        use_cached_choices(self.fields['supplier'], Supplier)
+        use_cached_choices(self.fields['customer'], Customer)
+        # Option labels include the customer/carrier, so join them up front
+        self.fields['location'].queryset = Location.objects.filter(
+            is_active=True
+        ).select_related('customer')
+        self.fields['truck'].queryset = Truck.objects.filter(
+            is_active=True
+        ).select_related('carrier')
 
 
 class BOLItemForm(forms.ModelForm):
@@ -0,0 +1,295 @@
+"""
+Bulk barge receipt import.
+
+Rows are streamed from a CSV or ``.xlsx`` file, validated against
+preloaded item/size/supplier lookups and inserted with ``bulk_create`` in
+chunks, so a barge with thousands of lots costs a handful of queries per
+chunk instead of several per batch.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Batch, InventoryMovement, InventorySummary, Item, Size, Supplier
+
+# Accepted spellings for each column, after lower-casing and replacing
+# spaces/dashes with underscores
+COLUMN_ALIASES = {
+    'item_code': ('item_code', 'item'),
+    'size_label': ('size_label', 'size'),
+    'supplier': ('supplier', 'supplier_code', 'bol_prefix', 'supplier_name'),
+    'lot_number': ('lot_number', 'lot', 'lot_no'),
+    'barge': ('barge',),
+    'starting_quantity': ('starting_quantity', 'quantity', 'bags'),
+    'receipt_date': ('receipt_date', 'date', 'received'),
+    'status': ('status',),
+    'notes': ('notes',),
+    'barcode': ('barcode',),
+}
+REQUIRED_COLUMNS = ('item_code', 'size_label', 'supplier', 'starting_quantity')
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y')
+
+
+class ImportResult:
+    """Rows read, rows created (valid rows on a dry run) and ``(row_number, message)`` errors"""
+
+    def __init__(self):
+        self.created = 0
+        self.rows = 0
+        self.errors = []
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'errors': [{'row': row, 'message': message} for row, message in self.errors],
+        }
+
+
+def _normalize_header(header):
+    lookup = {
+        alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases
+    }
+    names = [
+        lookup.get(str(name or '').strip().lower().replace(' ', '_').replace('-', '_'))
+        for name in header
+    ]
+    missing = [column for column in REQUIRED_COLUMNS if column not in names]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return names
+
+
+def _rows(header, records):
+    """Yield ``(row_number, row)`` for every non-blank record after the header"""
+    names = _normalize_header(header)
+    for row_number, record in enumerate(records, start=2):
+        if not any(value not in (None, '') for value in record):
+            continue
+        yield row_number, {name: value for name, value in zip(names, record) if name}
+
+
+def read_csv(fileobj):
+    """Yield ``(row_number, row)`` from a CSV file object (text or binary)"""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(fileobj)
+    try:
+        header = next(reader, None)
+        if header is None:
+            return
+        yield from _rows(header, reader)
+    except csv.Error as e:
+        raise csv.Error(f'CSV error on line {reader.line_num}: {e}') from e
+
+
+def read_xlsx(fileobj):
+    """Yield ``(row_number, row)`` from the first sheet of an ``.xlsx`` workbook"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        records = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(records, None)
+        if header is None:
+            return
+        yield from _rows(header, records)
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """Pick the reader from the file name"""
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return read_xlsx(fileobj)
+    return read_csv(fileobj)
+
+
+class BatchImporter:
+    """Validate and bulk insert batch rows using preloaded lookups"""
+
+    status_codes = {code for code, _ in Batch.STATUS_CHOICES}
+
+    def __init__(self, batch_size=500, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.items = {
+            code.upper(): (pk, code) for pk, code in Item.objects.values_list('id', 'item_code')
+        }
+        self.sizes = {
+            label.upper(): (pk, label) for pk, label in Size.objects.values_list('id', 'size_label')
+        }
+        self.suppliers = {}
+        for pk, prefix, name in Supplier.objects.values_list('id', 'bol_prefix', 'supplier_name'):
+            self.suppliers[name.upper()] = (pk, prefix)
+            self.suppliers[prefix.upper()] = (pk, prefix)
+        self.seen_barcodes = set()
+
+    @staticmethod
+    def _text(value):
+        return '' if value is None else str(value).strip()
+
+    @staticmethod
+    def _parse_date(value):
+        if value in (None, ''):
+            return timezone.localdate()
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(str(value).strip(), fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid receipt date '{value}'")
+
+    def build(self, row):
+        """Turn one row into an unsaved Batch, raising ValueError on bad data"""
+        text = self._text
+        item_code = text(row.get('item_code'))
+        size_label = text(row.get('size_label'))
+        supplier_key = text(row.get('supplier'))
+
+        item = self.items.get(item_code.upper())
+        if item is None:
+            raise ValueError(f"Unknown item '{item_code}'")
+        item_id, item_code = item
+        size = self.sizes.get(size_label.upper())
+        if size is None:
+            raise ValueError(f"Unknown size '{size_label}'")
+        size_id, size_label = size
+        supplier = self.suppliers.get(supplier_key.upper())
+        if supplier is None:
+            raise ValueError(f"Unknown supplier '{supplier_key}'")
+        supplier_id, bol_prefix = supplier
+
+        try:
+            # Decimal rather than float: '12.0' is fine, '12.7' and 'inf' are not
+            quantity = Decimal(text(row.get('starting_quantity')))
+            if quantity != quantity.to_integral_value():
+                raise ValueError
+            quantity = int(quantity)
+        except (ValueError, ArithmeticError):
+            raise ValueError(f"Invalid quantity '{row.get('starting_quantity')}'")
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1")
+
+        status = text(row.get('status')).upper() or 'ACTIVE'
+        if status not in self.status_codes:
+            raise ValueError(f"Invalid status '{status}'")
+
+        lot_number = text(row.get('lot_number'))
+        barge = text(row.get('barge'))
+        barcode = text(row.get('barcode')) or Batch.build_barcode(
+            barge, lot_number, bol_prefix, item_code, size_label
+        )
+
+        for field, value in (('barcode', barcode), ('lot_number', lot_number), ('barge', barge)):
+            max_length = Batch._meta.get_field(field).max_length
+            if len(value) > max_length:
+                raise ValueError(f"{field} '{value}' is longer than {max_length} characters")
+
+        return Batch(
+            barcode=barcode,
+            item_id=item_id,
+            size_id=size_id,
+            supplier_id=supplier_id,
+            lot_number=lot_number,
+            barge=barge,
+            starting_quantity=quantity,
+            current_quantity=quantity,
+            receipt_date=self._parse_date(row.get('receipt_date')),
+            status=status,
+            notes=text(row.get('notes')),
+        )
+
+    def import_chunk(self, chunk, result):
+        """Validate and insert one chunk of ``(row_number, row)`` pairs"""
+        batches = []
+        for row_number, row in chunk:
+            result.rows += 1
+            try:
+                batch = self.build(row)
+            except ValueError as e:
+                result.errors.append((row_number, str(e)))
+                continue
+            if batch.barcode in self.seen_barcodes:
+                result.errors.append((row_number, f"Duplicate barcode '{batch.barcode}' in file"))
+                continue
+            self.seen_barcodes.add(batch.barcode)
+            batches.append((row_number, batch))
+
+        # One query to reject barcodes that are already in the database
+        existing = set(Batch.objects.filter(
+            barcode__in=[batch.barcode for _, batch in batches]
+        ).values_list('barcode', flat=True))
+        new_batches = self._reject_existing(batches, existing, result)
+        if self.dry_run:
+            result.created += len(new_batches)
+            return
+        while new_batches:
+            try:
+                self._insert([batch for _, batch in new_batches])
+            except IntegrityError as e:
+                # Another import inserted some of these barcodes since the check
+                existing = set(Batch.objects.filter(
+                    barcode__in=[batch.barcode for _, batch in new_batches]
+                ).values_list('barcode', flat=True))
+                if not existing:
+                    result.errors.extend(
+                        (row_number, f"Not imported: {e}") for row_number, _ in new_batches
+                    )
+                    return
+                new_batches = self._reject_existing(new_batches, existing, result)
+            else:
+                result.created += len(new_batches)
+                return
+
+    @staticmethod
+    def _reject_existing(batches, existing, result):
+        """Report the ``(row_number, batch)`` pairs whose barcode is in ``existing``; return the rest"""
+        new_batches = []
+        for row_number, batch in batches:
+            if batch.barcode in existing:
+                result.errors.append((row_number, f"Barcode '{batch.barcode}' already exists"))
+            else:
+                new_batches.append((row_number, batch))
+        return new_batches
+
+    def _insert(self, new_batches):
+        """Insert batches with their summary deltas and receipt movements, all or nothing"""
+        with transaction.atomic():
+            Batch.objects.bulk_create(new_batches, batch_size=self.batch_size)
+            InventorySummary.objects.apply_deltas(InventorySummary.objects.batch_deltas(
+                (None, batch.summary_state()) for batch in new_batches
+            ))
+            InventoryMovement.objects.record([
+                InventoryMovement(
+                    batch=batch, kind=InventoryMovement.RECEIPT,
+                    quantity=batch.current_quantity, effective_date=batch.receipt_date,
+                )
+                for batch in new_batches
+            ])
+
+    def run(self, rows):
+        """Import an iterable of ``(row_number, row)`` pairs chunk by chunk"""
+        result = ImportResult()
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk, result)
+        return result
+
+
+def import_batches(fileobj, filename, batch_size=500, dry_run=False):
+    """Import batches from an uploaded or opened CSV/XLSX file"""
+    return BatchImporter(batch_size=batch_size, dry_run=dry_run).run(read_rows(fileobj, filename))
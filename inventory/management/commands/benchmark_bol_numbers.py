@@ -0,0 +1,106 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from inventory.bol_numbers import BOLNumberAllocator
+from inventory.models import Supplier
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import time
+
+
+def _allocate_many(supplier_id, count, block_size):
+    """Worker body: allocate ``count`` numbers and return them"""
+    allocator = BOLNumberAllocator(block_size=block_size)
+    numbers = []
+    errors = 0
+    try:
+        for _ in range(count):
+            try:
+                numbers.append(allocator.next_number(supplier_id))
+            except Exception:
+                errors += 1
+    finally:
+        connections.close_all()
+    return numbers, errors
+
+
+class Command(BaseCommand):
+    help = 'Stress the BOL number allocator from many threads/processes and check for duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent threads per process')
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes')
+        parser.add_argument('--per-worker', type=int, default=200, help='Numbers allocated by each thread')
+        parser.add_argument('--block-size', type=int, default=1, help='Numbers reserved per round-trip')
+        parser.add_argument(
+            '--supplier',
+            help='BOL prefix of an existing supplier to use (default: a temporary BENCH supplier)',
+        )
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        processes = options['processes']
+        per_worker = options['per_worker']
+        block_size = options['block_size']
+
+        temporary = False
+        if not options['supplier']:
+            # Only a supplier this run created is deleted afterwards
+            supplier, temporary = Supplier.objects.get_or_create(
+                bol_prefix='BENCH',
+                defaults={'supplier_name': 'BOL allocator benchmark', 'is_active': False},
+            )
+        else:
+            try:
+                supplier = Supplier.objects.get(bol_prefix=options['supplier'])
+            except Supplier.DoesNotExist:
+                raise CommandError(f"No supplier with BOL prefix {options['supplier']}")
+
+        workers = threads * processes
+        self.stdout.write(
+            f'Allocating {workers * per_worker} numbers for {supplier.bol_prefix} '
+            f'({processes} process(es) x {threads} thread(s), block size {block_size})...'
+        )
+
+        # Child processes must open their own connections
+        connections.close_all()
+        started = time.perf_counter()
+        try:
+            if processes > 1:
+                with ProcessPoolExecutor(max_workers=processes) as pool:
+                    futures = [
+                        pool.submit(_run_threads, supplier.pk, threads, per_worker, block_size)
+                        for _ in range(processes)
+                    ]
+                    results = [f.result() for f in futures]
+            else:
+                results = [_run_threads(supplier.pk, threads, per_worker, block_size)]
+            elapsed = time.perf_counter() - started
+
+            numbers = [n for result, _ in results for n in result]
+            errors = sum(e for _, e in results)
+            duplicates = len(numbers) - len(set(numbers))
+
+            self.stdout.write(f'Allocated: {len(numbers)}')
+            self.stdout.write(f'Errors: {errors}')
+            self.stdout.write(f'Elapsed: {elapsed:.3f}s')
+            self.stdout.write(f'Throughput: {len(numbers) / elapsed:.1f} numbers/second')
+            if duplicates:
+                raise CommandError(f'{duplicates} duplicate BOL numbers were issued')
+            if errors:
+                raise CommandError(f'{errors} allocation(s) failed')
+            self.stdout.write(self.style.SUCCESS('No duplicate BOL numbers issued'))
+        finally:
+            if temporary:
+                supplier.delete()
+
+
+def _run_threads(supplier_id, threads, per_worker, block_size):
+    """Run ``threads`` allocating workers and merge their results"""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [
+            pool.submit(_allocate_many, supplier_id, per_worker, block_size)
+            for _ in range(threads)
+        ]
+        results = [f.result() for f in futures]
+    numbers = [n for result, _ in results for n in result]
+    errors = sum(e for _, e in results)
+    return numbers, errors
@@ -0,0 +1,169 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from inventory.models import Item, Size, Supplier, Customer, Batch, BOL
+from datetime import date, timedelta
+import random
+import statistics
+import time
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a large batch/BOL table inside a rolled-back transaction and compare '
+        'EXPLAIN plans and latencies of the hot queries without and with the '
+        'composite/partial indexes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batches', type=int, default=1_000_000, help='Batches to seed')
+        parser.add_argument('--bols', type=int, default=100_000, help='BOLs to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the generated data')
+        parser.add_argument('--no-plans', action='store_true', help='Only report latencies')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        self.show_plans = not options['no_plans']
+        self.indexes = [
+            (model, index) for model in (Batch, BOL) for index in model._meta.indexes
+        ]
+        self.stdout.write(f'Database: {connection.vendor}')
+        try:
+            with transaction.atomic():
+                self.seed(options['batches'], options['bols'], options['chunk_size'], options['seed'])
+                queries = self.queries()
+
+                self.drop_indexes()
+                self.analyze()
+                before = self.measure(queries, 'without indexes')
+
+                self.create_indexes()
+                self.analyze()
+                after = self.measure(queries, 'with indexes')
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write('')
+        width = max(len(name) for name in queries)
+        self.stdout.write(f"{'query'.ljust(width)}  {'before ms':>10}  {'after ms':>10}  {'speedup':>8}")
+        for name in queries:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            self.stdout.write(
+                f'{name.ljust(width)}  {before[name]:>10.2f}  {after[name]:>10.2f}  {speedup:>7.1f}x'
+            )
+
+    def seed(self, batch_count, bol_count, chunk_size, seed):
+        """Bulk insert ``batch_count`` batches and ``bol_count`` BOLs with a realistic status mix"""
+        rng = random.Random(seed)
+        items = Item.objects.bulk_create(
+            Item(item_code=f'IDX{i}', item_name=f'Index benchmark {i}') for i in range(20)
+        )
+        sizes = Size.objects.bulk_create(Size(size_label=f'IDX{i}') for i in range(10))
+        suppliers = Supplier.objects.bulk_create(
+            Supplier(supplier_name=f'Index benchmark {i}', bol_prefix=f'IDX{i}') for i in range(10)
+        )
+        customers = Customer.objects.bulk_create(
+            Customer(customer_name=f'Index benchmark {i}') for i in range(200)
+        )
+        # Most batches in a mature warehouse are used up
+        statuses = ['DEPLETED'] * 60 + ['SHIPPED'] * 30 + ['ACTIVE'] * 8 + ['ON_HOLD'] * 2
+        today = date.today()
+        self.customer = customers[0]
+        self.supplier = suppliers[0]
+        self.ship_date = today - timedelta(days=30)
+
+        started = time.perf_counter()
+        for start in range(0, batch_count, chunk_size):
+            batches = []
+            for i in range(start, min(start + chunk_size, batch_count)):
+                status = rng.choice(statuses)
+                quantity = rng.randint(1, 400)
+                batches.append(Batch(
+                    barcode=f'IDX{i:08d}',
+                    item=rng.choice(items),
+                    size=rng.choice(sizes),
+                    supplier=rng.choice(suppliers),
+                    starting_quantity=quantity,
+                    current_quantity=quantity if status in Batch.ON_HAND_STATUSES else 0,
+                    receipt_date=today - timedelta(days=rng.randint(0, 3650)),
+                    status=status,
+                ))
+            Batch.objects.bulk_create(batches)
+        for start in range(0, bol_count, chunk_size):
+            BOL.objects.bulk_create(
+                BOL(
+                    bol_number=f'IDX{i:08d}',
+                    supplier=rng.choice(suppliers),
+                    customer=rng.choice(customers),
+                    ship_date=today - timedelta(days=rng.randint(0, 3650)),
+                )
+                for i in range(start, min(start + chunk_size, bol_count))
+            )
+        self.stdout.write(
+            f'Seeded {batch_count} batches and {bol_count} BOLs in {time.perf_counter() - started:.1f}s'
+        )
+
+    def queries(self):
+        """The hot queries, as unevaluated querysets"""
+        batch_fields = ('id', 'barcode', 'receipt_date', 'status', 'current_quantity')
+        cursor_date = date.today() - timedelta(days=1800)
+        return {
+            'batch list (first page)': Batch.objects.order_by('-receipt_date', 'barcode')
+            .values(*batch_fields)[:100],
+            'batch list (keyset page)': Batch.objects.filter(receipt_date__lt=cursor_date)
+            .order_by('-receipt_date', 'barcode').values(*batch_fields)[:100],
+            'batch list status=ACTIVE': Batch.objects.filter(status='ACTIVE')
+            .order_by('-receipt_date', 'barcode').values(*batch_fields)[:100],
+            'BOL item choices': Batch.objects.filter(status='ACTIVE', current_quantity__gt=0)
+            .order_by('-receipt_date', 'barcode').values(*batch_fields)[:100],
+            'BOLs for customer': BOL.objects.filter(customer=self.customer)
+            .order_by('-ship_date').values('id', 'bol_number', 'ship_date')[:50],
+            'BOLs for supplier on date': BOL.objects.filter(supplier=self.supplier, ship_date=self.ship_date)
+            .values('id', 'bol_number'),
+            'BOLs shipped on date': BOL.objects.filter(ship_date=self.ship_date)
+            .order_by('bol_number').values('id', 'bol_number'),
+        }
+
+    def measure(self, queries, label):
+        """Print each query's plan and return its median latency in milliseconds"""
+        self.stdout.write('')
+        self.stdout.write(self.style.MIGRATE_HEADING(f'== {label} =='))
+        results = {}
+        for name, queryset in queries.items():
+            if self.show_plans:
+                self.stdout.write(f'-- {name}')
+                self.stdout.write(queryset.explain())
+            timings = []
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+        return results
+
+    def drop_indexes(self):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, index in self.indexes:
+                cursor.execute(str(index.remove_sql(model, editor)))
+
+    def create_indexes(self):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, index in self.indexes:
+                cursor.execute(str(index.create_sql(model, editor)))
+
+    def analyze(self):
+        """Refresh planner statistics after bulk loading or index changes"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'ANALYZE {Batch._meta.db_table}')
+                cursor.execute(f'ANALYZE {BOL._meta.db_table}')
+            else:
+                cursor.execute('ANALYZE')
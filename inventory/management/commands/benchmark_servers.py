@@ -0,0 +1,225 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from inventory.benchmarks import percentile
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = {
+    'wsgi': ('bol_management.wsgi:application', 'sync'),
+    'asgi': ('bol_management.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+
+class LoadResult:
+    def __init__(self):
+        self.timings = []
+        self.statuses = {}
+        self.errors = 0
+        self.connections = 0
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response; returns ``(status, keep_alive)``"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def _client(port, paths, deadline, send_delay, result):
+    """One client connection, reconnecting whenever the server closes it"""
+    reader = writer = None
+    sent = 0
+    while time.perf_counter() < deadline:
+        path = paths[sent % len(paths)]
+        sent += 1
+        request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept: application/json\r\n\r\n'.encode()
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                result.connections += 1
+            if send_delay:
+                # A slow client: the request line now, the headers after the delay
+                line, _, rest = request.partition(b'\r\n')
+                writer.write(line + b'\r\n')
+                await writer.drain()
+                await asyncio.sleep(send_delay)
+                request = rest
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            result.errors += 1
+            keep_alive = False
+        else:
+            result.timings.append((time.perf_counter() - started) * 1000)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _load(port, paths, concurrency, duration, send_delay):
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        _client(port, paths, deadline, send_delay, result) for _ in range(concurrency)
+    ))
+    return result
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_live(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                sock.sendall(b'GET /health/live/ HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+                if sock.recv(64).startswith(b'HTTP/1.1 200'):
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the app under gunicorn sync workers (WSGI) and uvicorn workers (ASGI) in turn '
+        'and compare throughput and latency with many concurrent keep-alive clients'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Path to request, repeatable (default /api/suppliers/ and /api/trucks/)',
+        )
+        parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=['wsgi', 'asgi'])
+        parser.add_argument('--workers', type=int, default=2, help='Server worker processes (default 2)')
+        parser.add_argument('--connections', type=int, default=50, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds of load per mode')
+        parser.add_argument(
+            '--send-delay',
+            type=int,
+            default=0,
+            help='Milliseconds each client waits between its request line and headers, '
+                 'to mimic slow clients (default 0)',
+        )
+        parser.add_argument('--output', help='Write the JSON results to this file')
+
+    def handle(self, *args, **options):
+        if 'asgi' in options['modes']:
+            try:
+                import uvicorn_worker  # noqa: F401
+            except ImportError:
+                raise CommandError('ASGI mode needs uvicorn and uvicorn-worker (pip install -r requirements.txt)')
+        paths = options['paths'] or ['/api/suppliers/', '/api/trucks/']
+
+        self.stdout.write(
+            f"{options['connections']} connections x {options['duration']:g}s against "
+            f"{settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1]}, "
+            f"{options['workers']} worker(s) per server: {', '.join(paths)}"
+        )
+        results = {}
+        for mode in options['modes']:
+            results[mode] = self.run_mode(mode, paths, options)
+            self.report(mode, results[mode])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def run_mode(self, mode, paths, options):
+        app, worker_class = MODES[mode]
+        port = _free_port()
+        env = dict(
+            os.environ,
+            # Plain HTTP on localhost, and no per-request log lines
+            SECURE_SSL_REDIRECT='False',
+            REQUEST_LOG_LEVEL='ERROR',
+            WEB_CONCURRENCY=str(options['workers']),
+        )
+        if mode == 'asgi':
+            env['DB_CONN_MAX_AGE'] = '0'
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', app,
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(options['workers']),
+                '--worker-class', worker_class,
+                '--log-level', 'warning',
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stderr=None if options['verbosity'] > 1 else subprocess.DEVNULL,
+        )
+        try:
+            if not _wait_until_live(port, process):
+                raise CommandError(f'The {mode} server did not come up')
+            # Warm the workers' caches and connections before timing
+            asyncio.run(_load(port, paths, options['workers'] * 2, 1, 0))
+            result = asyncio.run(_load(
+                port, paths, options['connections'], options['duration'], options['send_delay'] / 1000
+            ))
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        if not result.timings:
+            raise CommandError(f'No request to the {mode} server succeeded')
+        return {
+            'requests': len(result.timings),
+            'requests_per_s': round(len(result.timings) / options['duration'], 1),
+            'p50_ms': round(percentile(result.timings, 50), 2),
+            'p95_ms': round(percentile(result.timings, 95), 2),
+            'p99_ms': round(percentile(result.timings, 99), 2),
+            'mean_ms': round(statistics.fmean(result.timings), 2),
+            'connections_opened': result.connections,
+            'errors': result.errors,
+            'statuses': {str(status): count for status, count in sorted(result.statuses.items())},
+        }
+
+    def report(self, mode, result):
+        self.stdout.write(
+            f"{mode.upper():<5} {result['requests_per_s']:>8.1f} req/s  p50 {result['p50_ms']:>8.2f}ms  "
+            f"p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+            f"{result['connections_opened']:>6} connections  {result['errors']} errors  "
+            f"statuses {result['statuses']}"
+        )
@@ -0,0 +1,178 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.utils import timezone
+from inventory import cache as reference_cache, reports, stats
+from inventory.benchmarks import QueryCounter
+from inventory.forms import BatchForm, BOLForm, BOLItemForm, LocationForm, TruckForm
+from inventory.models import (
+    Item, Size, Supplier, Customer, Carrier, Truck, Location, Batch, BOL, BOLItem
+)
+from inventory.shipping import ship_bol
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Check that form and list pages run a fixed number of queries as row '
+        'counts grow (data is seeded inside a transaction and rolled back)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10, 100, 1000, 10000],
+            help='Row counts to seed for each measurement',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not connection.settings_dict['TEST'].get('NAME'):
+            raise CommandError(
+                'Refusing to seed rows into this database: run with DEBUG on or '
+                'configure a test database'
+            )
+        sizes = sorted(options['sizes'])
+        results = {}
+        for size in sizes:
+            self.stdout.write(f'Seeding {size} rows per table...')
+            try:
+                with transaction.atomic():
+                    self.seed(size)
+                    results[size] = self.measure()
+                    raise Rollback
+            except Rollback:
+                pass
+
+        names = list(results[sizes[0]])
+        width = max(len(name) for name in names)
+        self.stdout.write('')
+        self.stdout.write(f"{'page'.ljust(width)}  " + '  '.join(f'{size:>7}' for size in sizes))
+        failures = []
+        for name in names:
+            counts = [results[size][name] for size in sizes]
+            self.stdout.write(f'{name.ljust(width)}  ' + '  '.join(f'{count:>7}' for count in counts))
+            if len(set(counts)) > 1:
+                failures.append(name)
+
+        for size in sizes:
+            if results[size]['ship_bol (2 lines)'] != results[size]['ship_bol (40 lines)']:
+                failures.append(f'ship_bol with {size} rows (2 vs 40 lines)')
+
+        if failures:
+            raise CommandError(f"Query counts grow with row count for: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('Query counts are constant'))
+
+    def seed(self, size):
+        """Bulk create ``size`` trucks, locations, batches, BOLs and BOL items, plus 42 batches to ship"""
+        item = Item.objects.create(item_code='QCHK', item_name='Query check')
+        sizes = Size.objects.bulk_create(Size(size_label=f'QC{i}') for i in range(5))
+        supplier = Supplier.objects.create(supplier_name='Query check', bol_prefix='QCHK')
+        customer = Customer.objects.create(customer_name='Query check')
+        carrier = Carrier.objects.create(carrier_name='Query check', carrier_code='QCHK')
+
+        Truck.objects.bulk_create(
+            (Truck(carrier=carrier, truck_number=f'Q{i}') for i in range(size)),
+            batch_size=1000,
+        )
+        locations = Location.objects.bulk_create(
+            (Location(customer=customer, location_name=f'Q{i}') for i in range(size)),
+            batch_size=1000,
+        )
+        batches = Batch.objects.bulk_create(
+            (
+                Batch(
+                    barcode=f'QCHK{i}', item=item, size=sizes[i % len(sizes)], supplier=supplier,
+                    starting_quantity=100, current_quantity=100,
+                )
+                for i in range(size)
+            ),
+            batch_size=1000,
+        )
+        bols = BOL.objects.bulk_create(
+            (
+                BOL(bol_number=f'QCHK{i}', supplier=supplier, customer=customer,
+                    location=locations[i])
+                for i in range(size)
+            ),
+            batch_size=1000,
+        )
+        BOLItem.objects.bulk_create(
+            (BOLItem(bol=bols[i], batch=batches[i], quantity_shipped=1) for i in range(size)),
+            batch_size=1000,
+        )
+        self.ship_batches = Batch.objects.bulk_create(
+            Batch(
+                barcode=f'QCSHIP{i}', item=item, size=sizes[0], supplier=supplier,
+                starting_quantity=100, current_quantity=100,
+            )
+            for i in range(42)
+        )
+        self.ship_header = {'supplier': supplier, 'customer': customer, 'location': locations[0]}
+        self.user = get_user_model().objects.create_superuser('query-check', 'qc@localhost', 'x')
+
+    def measure(self):
+        """Return {page: query count} for every form and list page"""
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(self.user)
+        cases = {
+            'TruckForm': lambda: str(TruckForm()),
+            'LocationForm': lambda: str(LocationForm()),
+            'BatchForm': lambda: str(BatchForm()),
+            'BOLForm': lambda: str(BOLForm()),
+            'BOLItemForm': lambda: str(BOLItemForm()),
+        }
+        for url in (
+            '/admin/inventory/truck/',
+            '/admin/inventory/location/',
+            '/admin/inventory/batch/',
+            '/admin/inventory/bol/',
+            '/admin/inventory/bol/add/',
+            '/admin/inventory/bolitem/',
+            '/admin/inventory/inventorysummary/',
+            '/api/trucks/',
+            '/api/locations/',
+            '/api/batches/',
+        ):
+            cases[url] = lambda url=url: self.fetch(client, url)
+        # Dashless ids on the long BOL must not cost (or break) anything
+        cases['ship_bol (2 lines)'] = lambda: ship_bol(
+            {**self.ship_header, 'bol_number': 'QCSHIP2'}, [(batch, 1) for batch in self.ship_batches[:2]]
+        )
+        cases['ship_bol (40 lines)'] = lambda: ship_bol(
+            {**self.ship_header, 'bol_number': 'QCSHIP40'}, [(batch.pk.hex, 1) for batch in self.ship_batches[2:]]
+        )
+
+        counts = {}
+        for name, case in cases.items():
+            self.clear_caches()
+            ContentType.objects.clear_cache()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                case()
+            counts[name] = counter.count
+        return counts
+
+    def clear_caches(self):
+        """Drop the reference, stats and report entries so every case starts cold"""
+        for model in reference_cache.REFERENCE_MODELS:
+            reference_cache.invalidate(model)
+        today = timezone.localdate()
+        cache.delete_many(
+            [stats.STATS_CACHE_KEY] + [reports.cache_key(name, today) for name in reports.REPORTS]
+        )
+
+    def fetch(self, client, url):
+        response = client.get(url, secure=True)
+        if response.status_code != 200:
+            raise CommandError(f'{url} returned {response.status_code}')
+        if hasattr(response, 'streaming_content'):
+            b''.join(response.streaming_content)
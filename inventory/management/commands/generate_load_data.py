@@ -0,0 +1,453 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Min
+from inventory import cache
+from inventory.models import (
+    Item, Size, Supplier, Customer, Carrier, Truck, Location, Batch, BOL, BOLItem,
+    InventoryMovement, InventorySnapshot, InventorySummary
+)
+from inventory.totals import update_bol_totals
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+import random
+import time
+import uuid
+
+# Fixed namespace so the same seed always yields the same primary keys
+LOAD_NAMESPACE = uuid.UUID('6f1d3c52-8f0e-4f5b-9a53-2b7f4c1e9d10')
+
+# Relative barge arrivals per month: river traffic peaks from spring to autumn
+SEASONALITY = (0.4, 0.5, 0.9, 1.3, 1.5, 1.4, 1.2, 1.1, 1.2, 1.3, 0.9, 0.5)
+
+LOTS_PER_BARGE = 40
+SIZE_LABELS = ('-16', '3x6', '6x16', '-8', '12x20', '8x12', '4x8', '10x20')
+
+
+def _uuid(seed, kind, index):
+    return uuid.uuid5(LOAD_NAMESPACE, f'{seed}:{kind}:{index}')
+
+
+def _seasonal_date(rng, start, days):
+    """A date in ``[start, start + days)`` weighted by SEASONALITY"""
+    peak = max(SEASONALITY)
+    while True:
+        day = start + timedelta(days=rng.randrange(days))
+        if rng.random() * peak < SEASONALITY[day.month - 1]:
+            return day
+
+
+def _barge_lots(plan, barge_number):
+    """
+    Draw one barge: its lots share a receipt date, item and supplier.
+    Returns ``(barge, receipt_date, item, supplier, lots)`` where each lot
+    is ``(index, lot_number, size, starting, status)`` and ``status`` is
+    ON_HOLD for a lot that never ships, else the status it takes once empty.
+    """
+    seed = plan['seed']
+    rng = random.Random(f'{seed}:barge:{barge_number}')
+    barge = f"{plan['prefix']}B{barge_number:06d}"
+    receipt_date = _seasonal_date(rng, plan['start'], plan['days'])
+    item = rng.choice(plan['items'])
+    supplier = rng.choice(plan['suppliers'])
+
+    first = barge_number * LOTS_PER_BARGE
+    lots = []
+    for index in range(first, min(first + LOTS_PER_BARGE, plan['batches'])):
+        size = rng.choice(plan['sizes'])
+        starting = rng.randint(50, 400)
+        if rng.random() < 0.05:
+            status = 'ON_HOLD'
+        else:
+            status = 'SHIPPED' if rng.random() < 0.3 else 'DEPLETED'
+        lots.append((index, f'{index - first + 1:03d}', size, starting, status))
+    return barge, receipt_date, item, supplier, lots
+
+
+def _ship_date(plan, index):
+    rng = random.Random(f"{plan['seed']}:ship-date:{index}")
+    return _seasonal_date(rng, plan['first_receipt'], (plan['today'] - plan['first_receipt']).days)
+
+
+def _allocate_lines(plan):
+    """
+    Ship every BOL from the lots on hand, in ship-date order: each line
+    takes a lot received on or before the ship date and never more bags
+    than it has left, so the batches' quantities match their BOL items.
+    Sets ``plan['first_receipt']`` and returns ``(shipped, lines)``: bags
+    shipped per batch index and ``[(batch_index, bags), ...]`` per BOL index.
+    """
+    seed = plan['seed']
+    barges = [_barge_lots(plan, number) for number in range((plan['batches'] - 1) // LOTS_PER_BARGE + 1)]
+    barges.sort(key=lambda barge: barge[1])
+    plan['first_receipt'] = barges[0][1]
+
+    remaining = [0] * plan['batches']
+    arrivals = []
+    for _, receipt_date, _, _, lots in barges:
+        for index, _, _, starting, status in lots:
+            if status != 'ON_HOLD':
+                remaining[index] = starting
+                arrivals.append((receipt_date, index))
+
+    shipped = [0] * plan['batches']
+    lines = [[] for _ in range(plan['bols'])]
+    on_hand = []
+    arrived = 0
+    for ship_date, bol_index in sorted((_ship_date(plan, index), index) for index in range(plan['bols'])):
+        while arrived < len(arrivals) and arrivals[arrived][0] <= ship_date:
+            on_hand.append(arrivals[arrived][1])
+            arrived += 1
+        rng = random.Random(f'{seed}:bol-lines:{bol_index}')
+        line_count = 1 + min(int(rng.expovariate(1 / 3)), 11)
+        quantities = {}
+        for _ in range(line_count):
+            if not on_hand:
+                break
+            position = rng.randrange(len(on_hand))
+            batch_index = on_hand[position]
+            if batch_index in quantities:
+                continue
+            bags = min(rng.randint(1, 60), remaining[batch_index])
+            quantities[batch_index] = bags
+            remaining[batch_index] -= bags
+            shipped[batch_index] += bags
+            if not remaining[batch_index]:
+                on_hand[position] = on_hand[-1]
+                on_hand.pop()
+        lines[bol_index] = sorted(quantities.items())
+    return shipped, lines
+
+
+def _barge_batches(plan, barge_number, shipped):
+    """Unsaved batches for one barge, less the bags ``shipped`` ({batch index: bags})"""
+    barge, receipt_date, (item_id, item_code), (supplier_id, bol_prefix), lots = _barge_lots(plan, barge_number)
+    batches = []
+    for index, lot_number, (size_id, size_label), starting, status in lots:
+        current = starting - shipped.get(index, 0)
+        if status != 'ON_HOLD' and current:
+            status = 'ACTIVE'
+        batches.append(Batch(
+            id=_uuid(plan['seed'], 'batch', index),
+            barcode=Batch.build_barcode(barge, lot_number, bol_prefix, item_code, size_label),
+            item_id=item_id,
+            size_id=size_id,
+            supplier_id=supplier_id,
+            lot_number=lot_number,
+            barge=barge,
+            starting_quantity=starting,
+            current_quantity=current,
+            receipt_date=receipt_date,
+            status=status,
+        ))
+    return batches
+
+
+def _batch_rows(plan, chunk, shipped):
+    """Unsaved batches for one chunk, generated barge by barge"""
+    start = chunk * plan['chunk_size']
+    stop = min(start + plan['chunk_size'], plan['batches'])
+    batches = []
+    for barge_number in range(start // LOTS_PER_BARGE, (stop - 1) // LOTS_PER_BARGE + 1):
+        first = barge_number * LOTS_PER_BARGE
+        batches.extend(_barge_batches(plan, barge_number, shipped)[max(start - first, 0):stop - first])
+    return batches
+
+
+def _bol_rows(plan, chunk, lines):
+    """
+    Unsaved BOLs and BOL items for one chunk, with Pareto-distributed
+    customers; ``lines`` is the chunk's slice of the allocated lines
+    """
+    seed = plan['seed']
+    start = chunk * plan['chunk_size']
+    bols = []
+    items = []
+    for index, bol_lines in enumerate(lines, start):
+        rng = random.Random(f'{seed}:bol:{index}')
+        customer_id = rng.choices(plan['customers'], cum_weights=plan['customer_weights'])[0]
+        bol = BOL(
+            id=_uuid(seed, 'bol', index),
+            bol_number=f"{plan['prefix']}{index:08d}",
+            supplier_id=rng.choice(plan['suppliers'])[0],
+            customer_id=customer_id,
+            location_id=rng.choice(plan['locations'][customer_id]),
+            truck_id=rng.choice(plan['trucks']),
+            ship_date=_ship_date(plan, index),
+        )
+        bols.append(bol)
+        for batch_index, bags in bol_lines:
+            items.append(BOLItem(
+                id=_uuid(seed, 'bol-item', f'{index}:{batch_index}'),
+                bol_id=bol.id,
+                batch_id=_uuid(seed, 'batch', batch_index),
+                quantity_shipped=bags,
+            ))
+    return bols, items
+
+
+def _build_chunk(kind, plan, chunk, allocated):
+    """
+    Worker body: build the unsaved rows for one chunk; ``allocated`` is its
+    share of ``_allocate_lines``
+    """
+    if kind == 'batches':
+        return _batch_rows(plan, chunk, allocated), []
+    return _bol_rows(plan, chunk, allocated)
+
+
+def _insert_rows(kind, rows, items):
+    with transaction.atomic():
+        if kind == 'batches':
+            Batch.objects.bulk_create(rows)
+        else:
+            BOL.objects.bulk_create(rows)
+            BOLItem.objects.bulk_create(items)
+    return len(rows)
+
+
+def _insert_chunk(kind, plan, chunk, allocated):
+    """Worker body: build one chunk and bulk insert it in its own transaction"""
+    try:
+        return _insert_rows(kind, *_build_chunk(kind, plan, chunk, allocated))
+    finally:
+        if plan['workers'] > 1:
+            connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate production-scale synthetic batches, BOLs and BOL items for load '
+        'testing (the same --seed gives the same rows for any chunk size or worker count)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batches', type=int, default=100_000, help='Batches to create')
+        parser.add_argument('--bols', type=int, default=20_000, help='BOLs to create (up to 12 items each)')
+        parser.add_argument('--items', type=int, default=12, help='Items to create')
+        parser.add_argument('--suppliers', type=int, default=6, help='Suppliers to create')
+        parser.add_argument('--customers', type=int, default=500, help='Customers to create')
+        parser.add_argument('--carriers', type=int, default=20, help='Carriers to create (10 trucks each)')
+        parser.add_argument('--years', type=int, default=3, help='Years of history to spread receipts over')
+        parser.add_argument('--chunk-size', type=int, default=10_000, help='Rows per bulk insert transaction')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes building and inserting chunks (best on PostgreSQL; SQLite serializes writes)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument(
+            '--prefix',
+            default='LD',
+            help='Prefix for every generated code/number, so load data can sit next to real data',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='First delete the data a previous run with the same --seed and counts generated',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not prefix or len(prefix) > 5:
+            raise CommandError('--prefix must be 1-5 characters')
+        if options['batches'] < 1:
+            raise CommandError('--batches must be at least 1')
+        if options['clear']:
+            self.clear(options)
+        if Item.objects.filter(item_code__in=[f'{prefix}I{i:02d}' for i in range(options['items'])]).exists():
+            raise CommandError(
+                f"Load data with prefix '{prefix}' already exists "
+                f"(use --clear with the --seed and counts that generated it)"
+            )
+
+        started = time.perf_counter()
+        plan = self.create_reference_data(options)
+        self.stdout.write(f'Reference data created ({time.perf_counter() - started:.1f}s)')
+
+        shipped, lines = _allocate_lines(plan)
+        self.run_chunks('batches', plan, shipped)
+        self.run_chunks('bols', plan, lines)
+
+        self.stdout.write('Updating BOL totals, the inventory summary and the movement ledger...')
+        # Only generated BOLs can belong to the suppliers just created
+        update_bol_totals(BOL.objects.filter(supplier_id__in=[pk for pk, _ in plan['suppliers']]))
+        InventorySummary.objects.rebuild()
+        InventoryMovement.objects.backfill(batch_size=options['chunk_size'])
+        for model in cache.REFERENCE_MODELS:
+            cache.invalidate(model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['batches']} batches and {options['bols']} BOLs "
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def create_reference_data(self, options):
+        """Bulk create master data and return the picklable plan the workers share"""
+        seed = options['seed']
+        prefix = options['prefix']
+        rng = random.Random(f'{seed}:reference')
+
+        items = Item.objects.bulk_create(
+            Item(
+                id=_uuid(seed, 'item', i),
+                item_code=f'{prefix}I{i:02d}',
+                item_name=f'Load item {i}',
+                standard_bag_weight=Decimal(rng.choice(('1.00', '1.20', '1.50', '1.80'))),
+            )
+            for i in range(options['items'])
+        )
+        sizes = Size.objects.bulk_create(
+            Size(id=_uuid(seed, 'size', i), size_label=f'{prefix}{label}')
+            for i, label in enumerate(SIZE_LABELS)
+        )
+        suppliers = Supplier.objects.bulk_create(
+            Supplier(
+                id=_uuid(seed, 'supplier', i),
+                supplier_name=f'{prefix} Load supplier {i}',
+                bol_prefix=f'{prefix}S{i}',
+            )
+            for i in range(options['suppliers'])
+        )
+        customers = Customer.objects.bulk_create(
+            Customer(id=_uuid(seed, 'customer', i), customer_name=f'{prefix} Load customer {i:05d}')
+            for i in range(options['customers'])
+        )
+        carriers = Carrier.objects.bulk_create(
+            Carrier(
+                id=_uuid(seed, 'carrier', i),
+                carrier_name=f'{prefix} Load carrier {i}',
+                carrier_code=f'{prefix}C{i:03d}',
+            )
+            for i in range(options['carriers'])
+        )
+        trucks = Truck.objects.bulk_create(
+            Truck(id=_uuid(seed, 'truck', f'{carrier.pk}:{n}'), carrier=carrier, truck_number=f'T{n:02d}')
+            for carrier in carriers
+            for n in range(10)
+        )
+        locations = Location.objects.bulk_create(
+            Location(
+                id=_uuid(seed, 'location', f'{customer.pk}:{n}'),
+                customer=customer,
+                location_name=f'Site {n + 1}',
+            )
+            for customer in customers
+            for n in range(rng.randint(1, 4))
+        )
+        locations_by_customer = {}
+        for location in locations:
+            locations_by_customer.setdefault(location.customer_id, []).append(location.pk)
+
+        today = date.today()
+        days = 365 * options['years']
+        return {
+            'seed': seed,
+            'prefix': prefix,
+            'batches': options['batches'],
+            'bols': options['bols'],
+            'chunk_size': options['chunk_size'],
+            'workers': options['workers'],
+            'today': today,
+            'start': today - timedelta(days=days),
+            'days': days,
+            'items': [(item.pk, item.item_code) for item in items],
+            'sizes': [(size.pk, size.size_label) for size in sizes],
+            'suppliers': [(supplier.pk, supplier.bol_prefix) for supplier in suppliers],
+            'customers': [customer.pk for customer in customers],
+            # Zipf weights: a handful of customers take most of the shipments
+            'customer_weights': list(accumulate(1 / rank for rank in range(1, len(customers) + 1))),
+            'locations': locations_by_customer,
+            'trucks': [truck.pk for truck in trucks],
+        }
+
+    def run_chunks(self, kind, plan, allocated):
+        """
+        Insert every chunk of ``kind``, in worker processes when --workers > 1;
+        ``allocated`` is the per-batch or per-BOL list from ``_allocate_lines``
+        """
+        total = plan[kind]
+        size = plan['chunk_size']
+        chunks = range((total + size - 1) // size)
+        if kind == 'batches':
+            # Only the batches that shipped anything, keyed by batch index
+            shares = [
+                {
+                    index: bags
+                    for index, bags in enumerate(allocated[chunk * size:(chunk + 1) * size], chunk * size)
+                    if bags
+                }
+                for chunk in chunks
+            ]
+        else:
+            shares = [allocated[chunk * size:(chunk + 1) * size] for chunk in chunks]
+        started = time.perf_counter()
+        done = 0
+        if plan['workers'] > 1:
+            # Child processes must open their own connections
+            connections.close_all()
+            args = ([kind] * len(chunks), [plan] * len(chunks), chunks, shares)
+            with ProcessPoolExecutor(max_workers=plan['workers']) as pool:
+                if connection.vendor == 'sqlite':
+                    # SQLite allows one writer: build in parallel, insert here
+                    counts = (_insert_rows(kind, *rows) for rows in pool.map(_build_chunk, *args))
+                else:
+                    counts = pool.map(_insert_chunk, *args)
+                for count in counts:
+                    done += count
+                    self.stdout.write(f'  {kind}: {done}/{total}')
+        else:
+            for chunk in chunks:
+                done += _insert_chunk(kind, plan, chunk, shares[chunk])
+                self.stdout.write(f'  {kind}: {done}/{total}')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Inserted {done} {kind} in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.0f} rows/s)')
+
+    def clear(self, options):
+        """
+        Delete what a run with the same --seed and counts generated, by the
+        primary keys it derived from the seed, so real rows that happen to
+        share the prefix are never touched. Movements, BOL items and batches
+        are deleted in bulk, bypassing signals; the summary is rebuilt after.
+        """
+        seed = options['seed']
+        self.stdout.write(f"Clearing load data generated with seed {seed}...")
+
+        def generated(kind, count):
+            pks = [_uuid(seed, kind, i) for i in range(count)]
+            size = connection.ops.bulk_batch_size(['pk'], pks)
+            return [pks[start:start + size] for start in range(0, len(pks), size)]
+
+        batch_chunks = generated('batch', options['batches'])
+        with transaction.atomic():
+            first_receipt = None
+            for pks in batch_chunks:
+                earliest = Batch.objects.filter(pk__in=pks).aggregate(earliest=Min('receipt_date'))['earliest']
+                if earliest and (first_receipt is None or earliest < first_receipt):
+                    first_receipt = earliest
+                movements = InventoryMovement.objects.filter(batch_id__in=pks)
+                movements._raw_delete(movements.db)
+            if first_receipt is not None:
+                # Generated stock is in the snapshots from its first receipt on
+                InventorySnapshot.objects.invalidate(first_receipt)
+            for pks in generated('bol', options['bols']):
+                items = BOLItem.objects.filter(bol_id__in=pks)
+                # Skip the per-line totals signal; the BOLs go next
+                items._raw_delete(items.db)
+                BOL.objects.filter(pk__in=pks).delete()
+            for pks in batch_chunks:
+                batches = Batch.objects.filter(pk__in=pks)
+                # Skip the per-row summary signal; the summary is rebuilt below
+                batches._raw_delete(batches.db)
+            for model, kind, count in (
+                (Customer, 'customer', options['customers']),
+                (Carrier, 'carrier', options['carriers']),
+                (Supplier, 'supplier', options['suppliers']),
+                (Size, 'size', len(SIZE_LABELS)),
+                (Item, 'item', options['items']),
+            ):
+                for pks in generated(kind, count):
+                    model.objects.filter(pk__in=pks).delete()
+            InventorySummary.objects.rebuild()
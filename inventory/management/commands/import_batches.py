@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.importers import import_batches
+import csv
+import time
+
+
+class Command(BaseCommand):
+    help = 'Import barge receipt batches in bulk from a CSV or Excel (.xlsx) file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .xlsx file with one batch per row')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows validated and inserted per chunk',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without creating batches',
+        )
+        parser.add_argument(
+            '--errors',
+            help='Write the per-row error report to this CSV file',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.perf_counter()
+        try:
+            with open(path, 'rb') as fileobj:
+                result = import_batches(
+                    fileobj,
+                    path,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not import {path}: {e}')
+        except csv.Error as e:
+            # Chunks before the bad line are already committed
+            raise CommandError(f'Could not import {path}: {e} (rows before it may already be imported)')
+        elapsed = time.perf_counter() - started
+
+        for row_number, message in result.errors[:20]:
+            self.stdout.write(self.style.WARNING(f'Row {row_number}: {message}'))
+        if len(result.errors) > 20:
+            self.stdout.write(self.style.WARNING(f'... and {len(result.errors) - 20} more errors'))
+
+        if options['errors'] and result.errors:
+            with open(options['errors'], 'w', newline='') as report:
+                writer = csv.writer(report)
+                writer.writerow(['row', 'error'])
+                writer.writerows(result.errors)
+            self.stdout.write(f"Error report written to {options['errors']}")
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.created} of {result.rows} rows in {elapsed:.2f}s '
+            f'({len(result.errors)} errors)'
+        ))
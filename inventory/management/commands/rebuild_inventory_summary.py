@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import InventorySummary, Item, Size, Supplier
+
+
+class Command(BaseCommand):
+    help = 'Recompute the on-hand inventory summary from batches and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only verify the summary; exit with an error if it has drifted',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert',
+        )
+
+    def handle(self, *args, **options):
+        check_only = options['check']
+        drift = InventorySummary.objects.rebuild(
+            batch_size=options['batch_size'],
+            dry_run=check_only,
+        )
+
+        if drift:
+            items = dict(Item.objects.values_list('id', 'item_code'))
+            sizes = dict(Size.objects.values_list('id', 'size_label'))
+            suppliers = dict(Supplier.objects.values_list('id', 'bol_prefix'))
+            for (item_id, size_id, supplier_id), stored, expected in sorted(drift, key=str):
+                self.stdout.write(
+                    f'{items.get(item_id, item_id)} {sizes.get(size_id, size_id)} '
+                    f'({suppliers.get(supplier_id, supplier_id)}): '
+                    f'stored {stored[0]} batches/{stored[1]} bags/{stored[2]} MT, '
+                    f'expected {expected[0]} batches/{expected[1]} bags/{expected[2]} MT'
+                )
+
+        if check_only:
+            if drift:
+                raise CommandError(f'{len(drift)} summary rows have drifted')
+            self.stdout.write(self.style.SUCCESS('Inventory summary is in sync'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Inventory summary rebuilt ({len(drift)} drifted rows corrected, '
+                f'{InventorySummary.objects.count()} rows)'
+            ))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from inventory.models import BOL
+from inventory.totals import recompute
+from datetime import date
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored BOL bag and weight totals from their line items and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only verify the totals; exit with an error if any have drifted',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only BOLs shipped on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='BOLs checked per query',
+        )
+
+    def handle(self, *args, **options):
+        bols = BOL.objects.all()
+        if options['since']:
+            try:
+                bols = bols.filter(ship_date__gte=date.fromisoformat(options['since']))
+            except ValueError:
+                raise CommandError('--since must be a date (YYYY-MM-DD)')
+
+        check_only = options['check']
+        started = time.perf_counter()
+        drift = recompute(bols, batch_size=options['batch_size'], dry_run=check_only)
+        elapsed = time.perf_counter() - started
+
+        for bol_number, stored, expected in drift[:50]:
+            self.stdout.write(
+                f'{bol_number}: stored {stored[0]} bags/{stored[1]} MT, '
+                f'expected {expected[0]} bags/{expected[1]} MT'
+            )
+        if len(drift) > 50:
+            self.stdout.write(f'... and {len(drift) - 50} more')
+
+        if check_only:
+            if drift:
+                raise CommandError(f'{len(drift)} BOLs have drifted totals')
+            self.stdout.write(self.style.SUCCESS('BOL totals are in sync'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'BOL totals recomputed in {elapsed:.1f}s ({len(drift)} drifted BOLs corrected)'
+            ))
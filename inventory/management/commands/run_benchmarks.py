@@ -0,0 +1,81 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from inventory import benchmarks
+import io
+import json
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the list/detail views, /api/* endpoints and BOL shipping and '
+        'write p50/p95/p99 latency, queries and bytes per request to a JSON report'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Baseline JSON report to check for regressions')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.25,
+            help='Allowed fractional p95/bytes growth over the baseline (default 0.25)',
+        )
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario')
+        parser.add_argument('--only', help='Only run scenarios whose name contains this text')
+        parser.add_argument(
+            '--use-existing',
+            action='store_true',
+            help='Run against the configured database instead of a freshly seeded test database',
+        )
+        parser.add_argument('--batches', type=int, default=20_000, help='Batches to seed (fresh database)')
+        parser.add_argument('--bols', type=int, default=5_000, help='BOLs to seed (fresh database)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for generate_load_data')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        old_name = None
+        if not options['use_existing']:
+            self.stdout.write('Creating and seeding a test database...')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            call_command(
+                'generate_load_data',
+                batches=options['batches'],
+                bols=options['bols'],
+                seed=options['seed'],
+                stdout=self.stdout if options['verbosity'] > 1 else io.StringIO(),
+            )
+        try:
+            report = benchmarks.run(
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                only=options['only'],
+                progress=self.report_progress,
+            )
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if baseline is not None:
+            regressions = benchmarks.compare(baseline, report, options['threshold'])
+            for name, metric, before, after in regressions:
+                self.stdout.write(self.style.ERROR(f'{name}: {metric} {before} -> {after}'))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}"))
+
+    def report_progress(self, name, result):
+        self.stdout.write(
+            f"{name:<24} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"p99 {result['p99_ms']:>8.2f}ms  {result['queries']:>3} queries  {result['bytes']:>9} bytes"
+        )
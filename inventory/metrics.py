@@ -0,0 +1,165 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Request, database, cache and shipping counters are updated in memory by
+the code that already observes them (``RequestTimingMiddleware``,
+``inventory.cache``, ``inventory.stats`` and ``ship_bol``); recording is a
+dict update under a lock, so the overhead is negligible. Inventory gauges
+are read from the ``InventorySummary`` table only when ``/metrics`` is
+scraped.
+
+Every worker process keeps its own counters, so behind a multi-worker
+server each scrape reports the worker that answered it; Prometheus'
+``rate()`` over the per-worker series still gives the overall trend.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db.models import Sum
+
+from .models import InventorySummary
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_histograms = {}
+_started = time.time()
+
+HELP = {
+    'bol_http_requests_total': ('counter', 'HTTP requests by URL name, method and status'),
+    'bol_http_request_duration_seconds': ('histogram', 'HTTP request latency by URL name'),
+    'bol_db_queries_total': ('counter', 'Database queries run while serving requests, by URL name'),
+    'bol_db_query_duration_seconds_total': ('counter', 'Time spent in database queries, by URL name'),
+    'bol_db_duplicate_queries_total': ('counter', 'Queries repeating SQL already run in the same request'),
+    'bol_cache_requests_total': ('counter', 'Cache lookups by cache and result (hit/miss)'),
+    'bol_bols_shipped_total': ('counter', 'BOLs shipped through ship_bol'),
+    'bol_bags_shipped_total': ('counter', 'Bags shipped through ship_bol'),
+    'bol_on_hand_bags': ('gauge', 'Bags on hand per item'),
+    'bol_on_hand_weight_mt': ('gauge', 'Metric tons on hand per item'),
+    'bol_process_start_time_seconds': ('gauge', 'Start time of this worker process (Unix time)'),
+}
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(LATENCY_BUCKETS, value)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Add ``value`` to a counter"""
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram"""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram()
+        histogram.observe(value)
+
+
+def observe_request(route, method, status, duration, queries, db_duration, duplicates):
+    """Record one served request (called by RequestTimingMiddleware)"""
+    route = route or 'unmatched'
+    inc('bol_http_requests_total', route=route, method=method, status=str(status))
+    observe('bol_http_request_duration_seconds', duration, route=route)
+    if queries:
+        inc('bol_db_queries_total', queries, route=route)
+        inc('bol_db_query_duration_seconds_total', db_duration, route=route)
+    if duplicates:
+        inc('bol_db_duplicate_queries_total', duplicates, route=route)
+
+
+def record_cache(cache_name, hit):
+    inc('bol_cache_requests_total', cache=cache_name, result='hit' if hit else 'miss')
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def inventory_gauges():
+    """``{(name, labels): value}`` for the on-hand gauges, read from InventorySummary"""
+    gauges = {}
+    rows = (
+        InventorySummary.objects.order_by()
+        .values('item__item_code')
+        .annotate(bags_total=Sum('bags'), weight_total=Sum('weight_mt'))
+    )
+    for row in rows:
+        labels = (('item', row['item__item_code']),)
+        gauges[('bol_on_hand_bags', labels)] = int(row['bags_total'] or 0)
+        gauges[('bol_on_hand_weight_mt', labels)] = float(row['weight_total'] or 0)
+    return gauges
+
+
+def render(include_inventory=True):
+    """Render every metric in the Prometheus text format (version 0.0.4)"""
+    with _lock:
+        samples = dict(_counters)
+        histograms = {
+            key: (list(h.buckets), h.count, h.sum) for key, h in _histograms.items()
+        }
+    samples[('bol_process_start_time_seconds', (('pid', str(os.getpid())),))] = _started
+    if include_inventory:
+        samples.update(inventory_gauges())
+
+    by_name = defaultdict(list)
+    for (name, labels), value in samples.items():
+        by_name[name].append((labels, value))
+    for (name, labels), value in histograms.items():
+        by_name[name].append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name[name]):
+            if kind != 'histogram':
+                lines.append(f'{name}{_labels(labels)} {_format(value)}')
+                continue
+            buckets, count, total = value
+            cumulative = 0
+            for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {_format(total)}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,215 @@
+"""
+Per-request timing instrumentation.
+
+``RequestTimingMiddleware`` wraps every request in a
+``connection.execute_wrapper`` that records how many queries ran, how long
+they took and how many repeated an earlier statement's SQL (the signature
+of an N+1 loop). The numbers go out as a ``Server-Timing`` header, visible
+in the browser's network panel, as one JSON log line per request on the
+``inventory.requests`` logger and into the request metrics served at
+``/metrics``. Requests over ``SLOW_REQUEST_MS``, ``SLOW_REQUEST_QUERIES``
+or ``SLOW_REQUEST_DUPLICATES`` are logged at WARNING with the thresholds
+they crossed.
+
+Both middleware here run natively in sync (WSGI) and async (ASGI) chains,
+so an async view under uvicorn is not pushed back onto a thread by them.
+``StaticFilesMiddleware`` is WhiteNoise with that async path added.
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+
+logger = logging.getLogger('inventory.requests')
+
+# Under ASGI the ORM runs queries on a per-request worker thread with its own
+# connection, out of reach of a wrapper put on the event loop's connection.
+# Those connections get _time_async_query instead, which finds the request's
+# timer through this context variable (copied into the worker thread).
+_async_timer = ContextVar('async_request_timer', default=None)
+
+
+def _time_async_query(execute, sql, params, many, context):
+    timer = _async_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def _install_async_timer(sender, connection, **kwargs):
+    if _time_async_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_async_query)
+
+
+class QueryTimer:
+    """connection.execute_wrapper hook that times queries and spots repeated SQL"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicates(self):
+        """Queries whose SQL text (ignoring parameters) already ran in this request"""
+        return sum(count - 1 for count in self.statements.values())
+
+
+class RequestTimingMiddleware:
+    """Measure wall time, DB time, query count and duplicate queries per request"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.slow_queries = getattr(settings, 'SLOW_REQUEST_QUERIES', 50)
+        self.slow_duplicates = getattr(settings, 'SLOW_REQUEST_DUPLICATES', 10)
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            connection_created.connect(_install_async_timer, dispatch_uid='inventory.async_request_timer')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        return self.finish(request, response, timer, started)
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        token = _async_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _async_timer.reset(token)
+        return self.finish(request, response, timer, started)
+
+    def finish(self, request, response, timer, started):
+        """Add the Server-Timing header and log, or defer logging until a stream ends"""
+        elapsed = time.perf_counter() - started
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={(elapsed - timer.duration) * 1000:.1f}, '
+                f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries", '
+                f'dup;desc="{timer.duplicates} duplicate queries"'
+            )
+
+        if response.streaming:
+            # The body (and its queries) is produced after we return
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(request, response, response.streaming_content, timer, started)
+        else:
+            self.log(request, response, timer, elapsed)
+        return response
+
+    def stream(self, request, response, content, timer, started):
+        """Keep measuring while a streaming response is consumed, then log"""
+        try:
+            with connection.execute_wrapper(timer):
+                yield from content
+        finally:
+            self.log(request, response, timer, time.perf_counter() - started)
+
+    async def astream(self, request, response, content, timer, started):
+        """``stream`` for responses with an async iterator as their body"""
+        token = _async_timer.set(timer)
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            _async_timer.reset(token)
+            self.log(request, response, timer, time.perf_counter() - started)
+
+    def log(self, request, response, timer, elapsed):
+        """Record the request's metrics and write its log line"""
+        total_ms = elapsed * 1000
+        exceeded = []
+        if total_ms > self.slow_ms:
+            exceeded.append('time')
+        if timer.count > self.slow_queries:
+            exceeded.append('queries')
+        if timer.duplicates > self.slow_duplicates:
+            exceeded.append('duplicates')
+
+        match = request.resolver_match
+        view = None
+        if match is not None:
+            view = getattr(match.func, 'view_class', match.func).__name__
+        metrics.observe_request(
+            match.view_name if match else None,
+            request.method,
+            response.status_code,
+            elapsed,
+            timer.count,
+            timer.duration,
+            timer.duplicates,
+        )
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'view': view,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_ms': round(timer.duration * 1000, 1),
+            'queries': timer.count,
+            'duplicates': timer.duplicates,
+        }
+        if exceeded:
+            record['slow'] = exceeded
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise with an async path: under ASGI a request for a page or API
+    call passes straight through instead of costing a thread hop. Static
+    files are still served by WhiteNoise's (synchronous) file response.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.16 on 2026-10-18 09:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def populate_inventory_summary(apps, schema_editor):
+    """Seed the summary from the batches that already exist"""
+    Batch = apps.get_model('inventory', 'Batch')
+    InventorySummary = apps.get_model('inventory', 'InventorySummary')
+    rows = (
+        Batch.objects.filter(status__in=('ACTIVE', 'ON_HOLD'), current_quantity__gt=0)
+        .order_by()
+        .values('item_id', 'size_id', 'supplier_id')
+        .annotate(
+            batch_count=models.Count('pk'),
+            bag_count=models.Sum('current_quantity'),
+            weight=models.Sum(
+                models.F('current_quantity') * models.F('item__standard_bag_weight'),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+    )
+    InventorySummary.objects.bulk_create([
+        InventorySummary(
+            item_id=row['item_id'],
+            size_id=row['size_id'],
+            supplier_id=row['supplier_id'],
+            batches=row['batch_count'],
+            bags=row['bag_count'],
+            weight_mt=row['weight'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('batches', models.IntegerField(default=0, help_text='On-hand batches')),
+                ('bags', models.IntegerField(default=0, help_text='On-hand bags')),
+                ('weight_mt', models.DecimalField(decimal_places=2, default=0, help_text='On-hand weight in MT', max_digits=14)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summaries', to='inventory.item')),
+                ('size', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summaries', to='inventory.size')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summaries', to='inventory.supplier')),
+            ],
+            options={
+                'verbose_name_plural': 'Inventory summaries',
+                'ordering': ['item__item_code', 'size__size_label', 'supplier__supplier_name'],
+                'unique_together': {('item', 'size', 'supplier')},
+            },
+        ),
+        migrations.RunPython(populate_inventory_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_inventorysummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['-receipt_date', 'barcode'], name='batch_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['status', '-receipt_date', 'barcode'], name='batch_status_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(condition=models.Q(('current_quantity__gt', 0), ('status', 'ACTIVE')), fields=['-receipt_date', 'barcode'], name='batch_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bol',
+            index=models.Index(fields=['-ship_date', 'bol_number'], name='bol_shipped_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bol',
+            index=models.Index(fields=['customer', '-ship_date'], name='bol_customer_shipped_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bol',
+            index=models.Index(fields=['supplier', '-ship_date'], name='bol_supplier_shipped_idx'),
+        ),
+    ]
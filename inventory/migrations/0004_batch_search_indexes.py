@@ -0,0 +1,75 @@
+from django.db import OperationalError, migrations, transaction
+
+TRIGRAM_COLUMNS = ('barcode', 'lot_number', 'barge')
+
+# Frozen copy of the SQLite FTS5 index in inventory.search at the time of
+# this migration, so later changes there cannot alter its history
+FTS_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_batch_fts USING fts5("
+    "barcode, lot_number, barge, content='inventory_batch', "
+    "content_rowid='rowid', tokenize='trigram')"
+)
+FTS_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_batch_fts_insert AFTER INSERT ON inventory_batch BEGIN
+        INSERT INTO inventory_batch_fts (rowid, barcode, lot_number, barge)
+        VALUES (new.rowid, new.barcode, new.lot_number, new.barge);
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_batch_fts_delete AFTER DELETE ON inventory_batch BEGIN
+        INSERT INTO inventory_batch_fts (inventory_batch_fts, rowid, barcode, lot_number, barge)
+        VALUES ('delete', old.rowid, old.barcode, old.lot_number, old.barge);
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_batch_fts_update AFTER UPDATE OF barcode, lot_number, barge
+    ON inventory_batch BEGIN
+        INSERT INTO inventory_batch_fts (inventory_batch_fts, rowid, barcode, lot_number, barge)
+        VALUES ('delete', old.rowid, old.barcode, old.lot_number, old.barge);
+        INSERT INTO inventory_batch_fts (rowid, barcode, lot_number, barge)
+        VALUES (new.rowid, new.barcode, new.lot_number, new.barge);
+    END""",
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in TRIGRAM_COLUMNS:
+            # Matches the UPPER(col::text) LIKE UPPER(%s) Django emits for icontains
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS batch_{column}_trgm_idx ON inventory_batch '
+                f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+            )
+    elif connection.vendor == 'sqlite':
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute(FTS_TABLE_SQL)
+        except OperationalError:
+            # No FTS5, or a SQLite older than 3.34 without the trigram tokenizer
+            return
+        for sql in FTS_TRIGGERS_SQL:
+            schema_editor.execute(sql)
+        schema_editor.execute("INSERT INTO inventory_batch_fts (inventory_batch_fts) VALUES ('rebuild')")
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for column in TRIGRAM_COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS batch_{column}_trgm_idx')
+    elif connection.vendor == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS inventory_batch_fts_{trigger}')
+        schema_editor.execute('DROP TABLE IF EXISTS inventory_batch_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_batch_bol_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
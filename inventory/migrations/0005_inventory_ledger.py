@@ -0,0 +1,47 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_batch_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('snapshot_date', models.DateField()),
+                ('bags', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_snapshots', to='inventory.item')),
+                ('size', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_snapshots', to='inventory.size')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_snapshots', to='inventory.supplier')),
+            ],
+            options={
+                'ordering': ['-snapshot_date', 'item__item_code', 'size__size_label'],
+                'unique_together': {('snapshot_date', 'item', 'size', 'supplier')},
+            },
+        ),
+        migrations.CreateModel(
+            name='InventoryMovement',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('RECEIPT', 'Receipt'), ('SHIPMENT', 'Shipment'), ('ADJUSTMENT', 'Adjustment')], max_length=10)),
+                ('quantity', models.IntegerField(help_text='Bags in (positive) or out (negative)')),
+                ('effective_date', models.DateField(help_text='Date the stock changed (receipt or ship date)')),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory.batch')),
+                ('bol', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.bol')),
+            ],
+            options={
+                'ordering': ['effective_date', 'id'],
+                'indexes': [models.Index(fields=['effective_date'], name='movement_date_idx'), models.Index(fields=['batch', 'effective_date'], name='movement_batch_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_movement_keys(apps, schema_editor):
+    """Copy each movement's item, size and supplier from its batch"""
+    Batch = apps.get_model('inventory', 'Batch')
+    InventoryMovement = apps.get_model('inventory', 'InventoryMovement')
+    batch = Batch.objects.filter(pk=models.OuterRef('batch_id'))
+    InventoryMovement.objects.update(
+        item_id=models.Subquery(batch.values('item_id')[:1]),
+        size_id=models.Subquery(batch.values('size_id')[:1]),
+        supplier_id=models.Subquery(batch.values('supplier_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_inventory_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='batch',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.batch'),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='item',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='inventory.item'),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='size',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='inventory.size'),
+        ),
+        migrations.AddField(
+            model_name='inventorymovement',
+            name='supplier',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='inventory.supplier'),
+        ),
+        migrations.RunPython(populate_movement_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='item',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='inventory.item'),
+        ),
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='size',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='inventory.size'),
+        ),
+        migrations.AlterField(
+            model_name='inventorymovement',
+            name='supplier',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_movements', to='inventory.supplier'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_movement_keep_deleted_batches'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['updated_at'], name='batch_updated_idx'),
+        ),
+    ]
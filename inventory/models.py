@@ -1,5 +1,8 @@
+import datetime
 import uuid
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.urls import reverse
@@ -77,11 +80,12 @@ class Supplier(TimeStampedModel):
         return f"{self.bol_prefix} - {self.supplier_name}"
 
     def get_next_bol_number(self):
-        """Get and increment the next BOL number"""
-        current = self.next_bol_no
-        self.next_bol_no += 1
-        self.save()
-        return current
+        """Get and increment the next BOL number atomically"""
+        from .bol_numbers import allocate_bol_numbers
+
+        numbers = allocate_bol_numbers(self.pk, 1)
+        self.next_bol_no = numbers.stop
+        return numbers.start
 
 
 class Customer(TimeStampedModel):
@@ -160,6 +164,24 @@ class Location(TimeStampedModel):
         return f"{self.customer.customer_name} - {self.location_name}"
 
 
+def weight_expression(quantity, bag_weight):
+    """``quantity x bag_weight`` in MT, computed as a Decimal by the database"""
+    return models.ExpressionWrapper(
+        models.F(quantity) * models.F(bag_weight),
+        output_field=models.DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _mt(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+class BatchQuerySet(models.QuerySet):
+    def with_weight(self):
+        """Annotate ``weight``: on-hand MT (current bags x the item's bag weight)"""
+        return self.annotate(weight=weight_expression('current_quantity', 'item__standard_bag_weight'))
+
+
 class Batch(TimeStampedModel):
     """Model for inventory batches"""
     
@@ -169,6 +191,9 @@ class Batch(TimeStampedModel):
         ('ON_HOLD', 'On Hold'),
         ('SHIPPED', 'Shipped'),
     ]
+    # Statuses whose bags are still physically in the warehouse
+    ON_HAND_STATUSES = ('ACTIVE', 'ON_HOLD')
+    SUMMARY_FIELDS = ('item_id', 'size_id', 'supplier_id', 'current_quantity', 'status')
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     barcode = models.CharField(max_length=50, unique=True)
@@ -189,9 +214,25 @@ class Batch(TimeStampedModel):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
     notes = models.TextField(blank=True)
 
+    objects = BatchQuerySet.as_manager()
+
     class Meta:
         ordering = ['-receipt_date', 'barcode']
         verbose_name_plural = 'Batches'
+        indexes = [
+            # Default ordering and keyset pagination of the batch list/API
+            models.Index(fields=['-receipt_date', 'barcode'], name='batch_received_idx'),
+            # Status-filtered lists in the same order
+            models.Index(fields=['status', '-receipt_date', 'barcode'], name='batch_status_received_idx'),
+            # Latest batch edit, for the report cache fingerprint
+            models.Index(fields=['updated_at'], name='batch_updated_idx'),
+            # Batches that can still be shipped (BOLItemForm choices)
+            models.Index(
+                fields=['-receipt_date', 'barcode'],
+                condition=models.Q(status='ACTIVE', current_quantity__gt=0),
+                name='batch_available_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.barcode} - {self.item.item_code} {self.size.size_label}"
@@ -199,26 +240,47 @@ class Batch(TimeStampedModel):
     def save(self, *args, **kwargs):
         # Auto-generate barcode if not provided
         if not self.barcode:
-            lot_part = self.lot_number or ''
-            barge_part = self.barge or ''
-            supplier_part = self.supplier.bol_prefix if self.supplier else ''
-            item_part = self.item.item_code if self.item else ''
-            size_part = self.size.size_label if self.size else ''
-            self.barcode = f"{barge_part}{lot_part}{supplier_part}{item_part}{size_part}"
+            self.barcode = self.build_barcode(
+                self.barge,
+                self.lot_number,
+                self.supplier.bol_prefix if self.supplier else '',
+                self.item.item_code if self.item else '',
+                self.size.size_label if self.size else '',
+            )
         
         # Set current_quantity on first save
-        if not self.pk and not hasattr(self, '_current_quantity_set'):
+        if self._state.adding and not hasattr(self, '_current_quantity_set'):
             self.current_quantity = self.starting_quantity
         
-        super().save(*args, **kwargs)
+        # Keep the on-hand summary in step within the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            previous = None
+            if not self._state.adding:
+                previous = Batch.objects.select_for_update().filter(pk=self.pk).values(
+                    *self.SUMMARY_FIELDS
+                ).first()
+            super().save(*args, **kwargs)
+            InventorySummary.objects.record_batch_change(previous, self.summary_state())
+            InventoryMovement.objects.record_batch_save(self, previous)
+
+    @staticmethod
+    def build_barcode(barge, lot_number, bol_prefix, item_code, size_label):
+        """Barcode from barge + lot + supplier prefix + item code + size"""
+        return f"{barge or ''}{lot_number or ''}{bol_prefix or ''}{item_code or ''}{size_label or ''}"
+
+    def summary_state(self):
+        """The fields that decide this batch's contribution to InventorySummary"""
+        return {field: getattr(self, field) for field in self.SUMMARY_FIELDS}
 
     def get_absolute_url(self):
         return reverse('inventory:batch_detail', kwargs={'pk': self.pk})
 
     @property
     def total_weight_mt(self):
-        """Calculate total weight in metric tons"""
-        return float(self.current_quantity) * float(self.item.standard_bag_weight)
+        """On-hand weight in metric tons, from the ``with_weight()`` annotation when present"""
+        if 'weight' in self.__dict__:
+            return _mt(self.weight)
+        return _mt(self.current_quantity * self.item.standard_bag_weight)
 
     @property
     def is_depleted(self):
@@ -250,11 +312,22 @@ class BOL(TimeStampedModel):
         ordering = ['-ship_date', 'bol_number']
         verbose_name = 'BOL'
         verbose_name_plural = 'BOLs'
+        indexes = [
+            models.Index(fields=['-ship_date', 'bol_number'], name='bol_shipped_idx'),
+            models.Index(fields=['customer', '-ship_date'], name='bol_customer_shipped_idx'),
+            models.Index(fields=['supplier', '-ship_date'], name='bol_supplier_shipped_idx'),
+        ]
 
     def __str__(self):
         return f"BOL {self.bol_number} - {self.customer.customer_name}"
 
 
+class BOLItemQuerySet(models.QuerySet):
+    def with_weight(self):
+        """Annotate ``weight``: shipped MT (bags x the batch item's bag weight)"""
+        return self.annotate(weight=weight_expression('quantity_shipped', 'batch__item__standard_bag_weight'))
+
+
 class BOLItem(TimeStampedModel):
     """Model for individual items on a BOL"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -262,6 +335,8 @@ class BOLItem(TimeStampedModel):
     batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name='bol_items')
     quantity_shipped = models.PositiveIntegerField(validators=[MinValueValidator(1)])
 
+    objects = BOLItemQuerySet.as_manager()
+
     class Meta:
         ordering = ['bol', 'batch__barcode']
 
@@ -270,5 +345,474 @@ class BOLItem(TimeStampedModel):
 
     @property
     def weight_mt(self):
-        """Calculate weight in metric tons"""
-        return float(self.quantity_shipped) * float(self.batch.item.standard_bag_weight)
\ No newline at end of file
+        """Shipped weight in metric tons, from the ``with_weight()`` annotation when present"""
+        if 'weight' in self.__dict__:
+            return _mt(self.weight)
+        if self.quantity_shipped is None or self.batch_id is None:
+            return Decimal('0.00')
+        return _mt(self.quantity_shipped * self.batch.item.standard_bag_weight)
+
+
+class InventorySummaryManager(models.Manager):
+    """Incremental maintenance of the on-hand inventory summary"""
+
+    @staticmethod
+    def contribution(state):
+        """Return ``(key, batches, bags)`` that a batch state adds to the summary"""
+        key = (state['item_id'], state['size_id'], state['supplier_id'])
+        if state['status'] in Batch.ON_HAND_STATUSES and state['current_quantity'] > 0:
+            return key, 1, state['current_quantity']
+        return key, 0, 0
+
+    def batch_deltas(self, changes):
+        """Fold ``(before, after)`` batch states (either may be None) into per-key deltas"""
+        deltas = defaultdict(lambda: [0, 0])
+        for before, after in changes:
+            if before:
+                key, batches, bags = self.contribution(before)
+                deltas[key][0] -= batches
+                deltas[key][1] -= bags
+            if after:
+                key, batches, bags = self.contribution(after)
+                deltas[key][0] += batches
+                deltas[key][1] += bags
+        return {key: tuple(delta) for key, delta in deltas.items() if delta != [0, 0]}
+
+    def record_batch_change(self, before, after):
+        """Apply the delta of a single batch changing from ``before`` to ``after``"""
+        self.apply_deltas(self.batch_deltas([(before, after)]))
+
+    def apply_deltas(self, deltas):
+        """
+        Add ``{(item_id, size_id, supplier_id): (batches, bags)}`` deltas to the
+        summary with a constant number of queries. Must run inside the
+        transaction that changed the batches.
+        """
+        if not deltas:
+            return
+        with transaction.atomic(using=self.db):
+            # Rows only need creating for keys that gain stock; a decrement
+            # without a row means the row is being cascade-deleted
+            self.bulk_create([
+                InventorySummary(item_id=item_id, size_id=size_id, supplier_id=supplier_id)
+                for (item_id, size_id, supplier_id), (batches, bags) in deltas.items()
+                if batches > 0 or bags > 0
+            ], ignore_conflicts=True)
+
+            key_filter = models.Q()
+            for item_id, size_id, supplier_id in deltas:
+                key_filter |= models.Q(item_id=item_id, size_id=size_id, supplier_id=supplier_id)
+            # Lock in primary-key order so concurrent shipments cannot deadlock
+            rows = self.select_for_update().filter(key_filter).order_by('pk').values_list(
+                'pk', 'item_id', 'size_id', 'supplier_id'
+            )
+            ids = {(item_id, size_id, supplier_id): pk for pk, item_id, size_id, supplier_id in rows}
+            if not ids:
+                return
+
+            batch_whens = []
+            bag_whens = []
+            for key, pk in ids.items():
+                batches, bags = deltas[key]
+                batch_whens.append(models.When(pk=pk, then=models.Value(batches)))
+                bag_whens.append(models.When(pk=pk, then=models.Value(bags)))
+            new_bags = models.F('bags') + models.Case(
+                *bag_whens, default=models.Value(0), output_field=models.IntegerField()
+            )
+            bag_weight = models.Subquery(
+                Item.objects.filter(pk=models.OuterRef('item_id')).values('standard_bag_weight')[:1]
+            )
+            self.filter(pk__in=list(ids.values())).update(
+                batches=models.F('batches') + models.Case(
+                    *batch_whens, default=models.Value(0), output_field=models.IntegerField()
+                ),
+                bags=new_bags,
+                weight_mt=models.ExpressionWrapper(
+                    new_bags * bag_weight,
+                    output_field=models.DecimalField(max_digits=14, decimal_places=2),
+                ),
+                updated_at=timezone.now(),
+            )
+
+    def reweigh(self, item_ids):
+        """Recompute ``weight_mt`` for the given items' rows from their current bag weight"""
+        bag_weight = models.Subquery(
+            Item.objects.filter(pk=models.OuterRef('item_id')).values('standard_bag_weight')[:1]
+        )
+        return self.filter(item_id__in=item_ids).update(
+            weight_mt=models.ExpressionWrapper(
+                models.F('bags') * bag_weight,
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    def expected_rows(self):
+        """Recompute the summary from Batch in one grouped query"""
+        return (
+            Batch.objects.filter(status__in=Batch.ON_HAND_STATUSES, current_quantity__gt=0)
+            .order_by()
+            .values('item_id', 'size_id', 'supplier_id')
+            .annotate(
+                batch_count=models.Count('pk'),
+                bag_count=models.Sum('current_quantity'),
+                weight=models.Sum(
+                    models.F('current_quantity') * models.F('item__standard_bag_weight'),
+                    output_field=models.DecimalField(max_digits=14, decimal_places=2),
+                ),
+            )
+        )
+
+    def rebuild(self, batch_size=1000, dry_run=False):
+        """
+        Recompute the whole summary from Batch and replace the table.
+
+        Returns a list of ``(key, stored, expected)`` tuples for every key whose
+        stored ``(batches, bags, weight_mt)`` drifted from the recomputed values.
+        """
+        empty = (0, 0, Decimal('0.00'))
+        with transaction.atomic(using=self.db):
+            stored = {
+                (item_id, size_id, supplier_id): (batches, bags, _mt(weight_mt))
+                for item_id, size_id, supplier_id, batches, bags, weight_mt in self.select_for_update()
+                .order_by('pk')
+                .values_list('item_id', 'size_id', 'supplier_id', 'batches', 'bags', 'weight_mt')
+            }
+            expected = {}
+            new_rows = []
+            for row in self.expected_rows().iterator(chunk_size=batch_size):
+                key = (row['item_id'], row['size_id'], row['supplier_id'])
+                expected[key] = (row['batch_count'], row['bag_count'], _mt(row['weight'] or 0))
+                new_rows.append(InventorySummary(
+                    item_id=row['item_id'],
+                    size_id=row['size_id'],
+                    supplier_id=row['supplier_id'],
+                    batches=row['batch_count'],
+                    bags=row['bag_count'],
+                    weight_mt=expected[key][2],
+                ))
+
+            drift = [
+                (key, stored.get(key, empty), expected.get(key, empty))
+                for key in set(stored) | set(expected)
+                if stored.get(key, empty) != expected.get(key, empty)
+            ]
+            if not dry_run:
+                self.all().delete()
+                self.bulk_create(new_rows, batch_size=batch_size)
+        return drift
+
+
+class InventorySummary(TimeStampedModel):
+    """On-hand bags and weight per item, size and supplier, maintained incrementally"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='inventory_summaries')
+    size = models.ForeignKey(Size, on_delete=models.CASCADE, related_name='inventory_summaries')
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='inventory_summaries')
+    batches = models.IntegerField(default=0, help_text="On-hand batches")
+    bags = models.IntegerField(default=0, help_text="On-hand bags")
+    weight_mt = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="On-hand weight in MT")
+
+    objects = InventorySummaryManager()
+
+    class Meta:
+        ordering = ['item__item_code', 'size__size_label', 'supplier__supplier_name']
+        unique_together = ['item', 'size', 'supplier']
+        verbose_name_plural = 'Inventory summaries'
+
+    def __str__(self):
+        return f"{self.item.item_code} {self.size.size_label} ({self.supplier.bol_prefix}): {self.bags} bags"
+
+
+def _as_date(value):
+    """DateField defaults such as ``timezone.now`` leave a datetime on unsaved instances"""
+    if isinstance(value, datetime.datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+class InventoryMovementManager(models.Manager):
+    """Writes to the append-only ledger of batch quantity changes"""
+
+    def record(self, movements):
+        """
+        Append movements with one ``bulk_create``. Snapshots taken on or
+        after a back-dated movement no longer add up, so they are dropped
+        and retaken by the next ``snapshot_inventory`` run.
+        """
+        movements = [movement for movement in movements if movement.quantity]
+        if not movements:
+            return []
+        for movement in movements:
+            movement.effective_date = _as_date(movement.effective_date)
+            if movement.item_id is None and InventoryMovement.batch.is_cached(movement):
+                movement.item_id, movement.size_id, movement.supplier_id = (
+                    movement.batch.item_id, movement.batch.size_id, movement.batch.supplier_id
+                )
+        earliest = min(movement.effective_date for movement in movements)
+        with transaction.atomic(using=self.db):
+            created = self.bulk_create(movements)
+            if earliest < timezone.localdate():
+                InventorySnapshot.objects.invalidate(earliest)
+        return created
+
+    def record_batch_save(self, batch, previous):
+        """Ledger entries for ``Batch.save()``; ``previous`` is the row's state before it"""
+        if previous is None:
+            self.record([InventoryMovement(
+                batch=batch, kind=InventoryMovement.RECEIPT,
+                quantity=batch.current_quantity, effective_date=batch.receipt_date,
+            )])
+            return
+        self.record([InventoryMovement(
+            batch=batch, kind=InventoryMovement.ADJUSTMENT,
+            quantity=batch.current_quantity - previous['current_quantity'],
+            effective_date=timezone.localdate(),
+        )])
+        moved = any(previous[field] != getattr(batch, field) for field in ('item_id', 'size_id', 'supplier_id'))
+        if moved:
+            # The batch's whole history now belongs to another item/size/supplier
+            self.filter(batch=batch).update(item_id=batch.item_id, size_id=batch.size_id, supplier_id=batch.supplier_id)
+            InventorySnapshot.objects.invalidate(_as_date(batch.receipt_date))
+
+    def record_batch_delete(self, batch):
+        """
+        Write off a deleted batch's remaining bags today; its history stays
+        in the ledger, no longer linked to the batch
+        """
+        self.record([InventoryMovement(
+            item_id=batch.item_id, size_id=batch.size_id, supplier_id=batch.supplier_id,
+            kind=InventoryMovement.ADJUSTMENT, quantity=-batch.current_quantity,
+            effective_date=timezone.localdate(), note=f'Batch {batch.barcode} deleted',
+        )])
+
+    def backfill(self, batch_size=1000):
+        """
+        Reconstruct the ledger of batches that have none (rows that predate
+        it or were bulk loaded): a receipt of ``starting_quantity`` on the
+        receipt date, a shipment per BOL item on its ship date and, when the
+        result differs from ``current_quantity``, an adjustment dated today.
+        Returns the number of batches backfilled.
+        """
+        today = timezone.localdate()
+        pending = Batch.objects.filter(~models.Exists(self.filter(batch=models.OuterRef('pk'))))
+        last_pk = None
+        backfilled = 0
+        while True:
+            chunk = pending.order_by('pk')
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            batches = list(chunk.values(
+                'pk', 'item_id', 'size_id', 'supplier_id', 'starting_quantity', 'current_quantity', 'receipt_date'
+            )[:batch_size])
+            if not batches:
+                return backfilled
+            last_pk = batches[-1]['pk']
+
+            shipped = defaultdict(list)
+            for line in (
+                BOLItem.objects.filter(batch_id__in=[batch['pk'] for batch in batches])
+                .order_by().values('batch_id', 'bol_id', 'bol__ship_date', 'quantity_shipped')
+            ):
+                shipped[line['batch_id']].append(line)
+
+            movements = []
+            for batch in batches:
+                keys = {
+                    'batch_id': batch['pk'], 'item_id': batch['item_id'],
+                    'size_id': batch['size_id'], 'supplier_id': batch['supplier_id'],
+                }
+                movements.append(InventoryMovement(
+                    **keys, kind=InventoryMovement.RECEIPT,
+                    quantity=batch['starting_quantity'], effective_date=batch['receipt_date'],
+                ))
+                balance = batch['starting_quantity']
+                for line in shipped[batch['pk']]:
+                    movements.append(InventoryMovement(
+                        **keys, kind=InventoryMovement.SHIPMENT, bol_id=line['bol_id'],
+                        quantity=-line['quantity_shipped'], effective_date=line['bol__ship_date'],
+                    ))
+                    balance -= line['quantity_shipped']
+                movements.append(InventoryMovement(
+                    **keys, kind=InventoryMovement.ADJUSTMENT,
+                    quantity=batch['current_quantity'] - balance, effective_date=today,
+                    note='Backfilled to match the recorded quantity',
+                ))
+            with transaction.atomic(using=self.db):
+                self.record(movements)
+            backfilled += len(batches)
+
+    def balances(self, after, through, batch_filter=None):
+        """
+        ``{(item_id, size_id, supplier_id): bags}`` moved in the date range
+        (``after``, ``through``]; ``after=None`` starts from the beginning.
+        """
+        movements = self.filter(effective_date__lte=through)
+        if after is not None:
+            movements = movements.filter(effective_date__gt=after)
+        if batch_filter is not None:
+            movements = movements.filter(batch_filter)
+        rows = (
+            movements.order_by()
+            .values_list('item_id', 'size_id', 'supplier_id')
+            .annotate(bags=models.Sum('quantity'))
+        )
+        return {(item_id, size_id, supplier_id): bags for item_id, size_id, supplier_id, bags in rows}
+
+    def batch_quantities_as_of(self, batch_ids, day):
+        """``{batch_id: bags}`` on hand at the end of ``day`` for the given batches"""
+        rows = (
+            self.filter(batch_id__in=batch_ids, effective_date__lte=day)
+            .order_by().values_list('batch_id').annotate(bags=models.Sum('quantity'))
+        )
+        return dict(rows)
+
+
+class InventoryMovement(models.Model):
+    """Append-only ledger entry: bags into (positive) or out of (negative) a batch"""
+
+    RECEIPT = 'RECEIPT'
+    SHIPMENT = 'SHIPMENT'
+    ADJUSTMENT = 'ADJUSTMENT'
+    KIND_CHOICES = [
+        (RECEIPT, 'Receipt'),
+        (SHIPMENT, 'Shipment'),
+        (ADJUSTMENT, 'Adjustment'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    # Covered by movement_batch_date_idx. Deleting a batch keeps its history
+    # (plus a write-off, see inventory.signals), keyed by the columns below
+    batch = models.ForeignKey(
+        Batch, on_delete=models.SET_NULL, null=True, blank=True, related_name='movements', db_index=False
+    )
+    # The batch's item, size and supplier, kept with the row so the ledger
+    # adds up per item/size/supplier without the batch
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='inventory_movements')
+    size = models.ForeignKey(Size, on_delete=models.CASCADE, related_name='inventory_movements')
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='inventory_movements')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    quantity = models.IntegerField(help_text="Bags in (positive) or out (negative)")
+    effective_date = models.DateField(help_text="Date the stock changed (receipt or ship date)")
+    bol = models.ForeignKey(BOL, on_delete=models.SET_NULL, null=True, blank=True, related_name='movements')
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = InventoryMovementManager()
+
+    class Meta:
+        ordering = ['effective_date', 'id']
+        indexes = [
+            # Snapshot tails: movements after the latest snapshot
+            models.Index(fields=['effective_date'], name='movement_date_idx'),
+            # Per-batch history and quantities as of a date
+            models.Index(fields=['batch', 'effective_date'], name='movement_batch_date_idx'),
+        ]
+
+    def __str__(self):
+        batch = self.batch_id or 'deleted batch'
+        return f"{self.effective_date} {self.get_kind_display()} {self.quantity:+d} bags ({batch})"
+
+
+class InventorySnapshotManager(models.Manager):
+    """Daily closing stock, so as-of queries replay only the movements since"""
+
+    def invalidate(self, from_day=None):
+        """Drop snapshots from ``from_day`` on (all of them when None)"""
+        snapshots = self.all() if from_day is None else self.filter(snapshot_date__gte=from_day)
+        return snapshots.delete()[0]
+
+    def latest_date(self, on_or_before=None):
+        snapshots = self.all()
+        if on_or_before is not None:
+            snapshots = snapshots.filter(snapshot_date__lte=on_or_before)
+        return snapshots.aggregate(latest=models.Max('snapshot_date'))['latest']
+
+    def stock_as_of(self, day):
+        """
+        ``{(item_id, size_id, supplier_id): bags}`` at the end of ``day``:
+        the latest snapshot on or before it plus the movements since.
+        """
+        snapshot_date = self.latest_date(day)
+        stock = defaultdict(int)
+        if snapshot_date is not None:
+            for item_id, size_id, supplier_id, bags in self.filter(snapshot_date=snapshot_date).values_list(
+                'item_id', 'size_id', 'supplier_id', 'bags'
+            ):
+                stock[(item_id, size_id, supplier_id)] = bags
+        for key, bags in InventoryMovement.objects.balances(snapshot_date, day).items():
+            stock[key] += bags
+        return {key: bags for key, bags in stock.items() if bags}
+
+    def take_through(self, day, batch_size=1000):
+        """
+        Write one snapshot per day from the day after the latest snapshot
+        (or the first movement) through ``day``, rolling the previous day's
+        stock forward with one grouped query over the movements in between.
+        Returns the number of days written.
+        """
+        previous = self.latest_date(day)
+        if previous is None:
+            first = InventoryMovement.objects.aggregate(first=models.Min('effective_date'))['first']
+            if first is None or first > day:
+                return 0
+            start = first
+            stock = defaultdict(int)
+        else:
+            start = previous + datetime.timedelta(days=1)
+            stock = defaultdict(int, self.stock_as_of(previous))
+        if start > day:
+            return 0
+
+        daily = defaultdict(list)
+        rows = (
+            InventoryMovement.objects.filter(effective_date__gte=start, effective_date__lte=day)
+            .order_by()
+            .values_list('effective_date', 'item_id', 'size_id', 'supplier_id')
+            .annotate(bags=models.Sum('quantity'))
+        )
+        for effective_date, item_id, size_id, supplier_id, bags in rows:
+            daily[effective_date].append(((item_id, size_id, supplier_id), bags))
+
+        days = 0
+        with transaction.atomic(using=self.db):
+            self.filter(snapshot_date__gte=start, snapshot_date__lte=day).delete()
+            snapshots = []
+            current = start
+            while current <= day:
+                for key, bags in daily.get(current, ()):
+                    stock[key] += bags
+                snapshots.extend(
+                    InventorySnapshot(
+                        snapshot_date=current, item_id=item_id, size_id=size_id,
+                        supplier_id=supplier_id, bags=bags,
+                    )
+                    for (item_id, size_id, supplier_id), bags in stock.items() if bags
+                )
+                if len(snapshots) >= batch_size:
+                    self.bulk_create(snapshots, batch_size=batch_size)
+                    snapshots = []
+                current += datetime.timedelta(days=1)
+                days += 1
+            self.bulk_create(snapshots, batch_size=batch_size)
+        return days
+
+
+class InventorySnapshot(models.Model):
+    """Bags on hand per item, size and supplier at the end of a day"""
+    id = models.BigAutoField(primary_key=True)
+    snapshot_date = models.DateField()
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='inventory_snapshots')
+    size = models.ForeignKey(Size, on_delete=models.CASCADE, related_name='inventory_snapshots')
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='inventory_snapshots')
+    bags = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = InventorySnapshotManager()
+
+    class Meta:
+        ordering = ['-snapshot_date', 'item__item_code', 'size__size_label']
+        unique_together = ['snapshot_date', 'item', 'size', 'supplier']
+
+    def __str__(self):
+        return f"{self.snapshot_date} {self.item.item_code} {self.size.size_label}: {self.bags} bags"
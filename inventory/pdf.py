@@ -0,0 +1,220 @@
+"""
+Bill of Lading PDF layout.
+
+A small PDF writer for the BOL document: pages are drawn with the
+standard Helvetica fonts (no font files to embed) and compressed with
+zlib. ``render_bol`` turns one BOL, given as plain Python values, into its
+compressed page streams. ``assemble`` wraps any list of page streams into
+a PDF file, so one BOL and a whole day's BOLs are built the same way.
+
+This module imports nothing from Django so ``render_bol`` can run in
+worker processes (see ``inventory.documents``). Text is written in
+Latin-1; other characters print as ``?``.
+"""
+
+import zlib
+
+# Bump when the layout changes, so cached pages are rendered again
+LAYOUT_VERSION = 1
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 40
+ROW_HEIGHT = 14
+# Item rows that fit below the header on the first page and on later pages;
+# the last page also needs CLOSING_ROWS for the totals, notes and signatures
+FIRST_PAGE_ROWS = 33
+PAGE_ROWS = 46
+CLOSING_ROWS = 8
+
+# (title, x, width in characters, right aligned)
+ITEM_COLUMNS = (
+    ('Barcode', MARGIN, 36, False),
+    ('Item', 225, 18, False),
+    ('Size', 320, 10, False),
+    ('Lot', 375, 18, False),
+    ('Bags', 500, 8, True),
+    ('Weight (MT)', PAGE_WIDTH - MARGIN, 12, True),
+)
+
+# Helvetica advance widths (1/1000 em) for right-aligning figures
+_NARROW = {'.': 278, ',': 278, ' ': 278, '-': 333, '(': 333, ')': 333}
+
+
+def _width(text, size):
+    return sum(_NARROW.get(char, 556) for char in text) * size / 1000
+
+
+def _escape(text):
+    text = ' '.join(str(text).split())
+    text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def _clip(text, length):
+    text = str(text or '')
+    return text if len(text) <= length else text[:length - 1] + '~'
+
+
+class _Page:
+    """Content stream operators for one page"""
+
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x, y, text, size=9, bold=False, right=False):
+        if right:
+            x -= _width(str(text), size)
+        self.ops.append(f'BT /F{2 if bold else 1} {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET')
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.ops.append(f'{width} w {x1:.1f} {y1:.1f} m {x2:.1f} {y2:.1f} l S')
+
+    def box(self, x, y, width, height):
+        self.ops.append(f'0.5 w {x:.1f} {y:.1f} {width:.1f} {height:.1f} re S')
+
+    def stream(self):
+        return zlib.compress('\n'.join(self.ops).encode('latin-1'))
+
+
+def _party(page, x, y, title, lines):
+    """A labelled address box with its top-left corner at ``(x, y)``"""
+    width = (PAGE_WIDTH - 2 * MARGIN - 10) / 2
+    page.box(x, y - 70, width, 70)
+    page.text(x + 6, y - 12, title.upper(), size=7, bold=True)
+    for number, line in enumerate([line for line in lines if line][:4]):
+        page.text(x + 6, y - 26 - number * 11, _clip(line, 48), size=9, bold=number == 0)
+
+
+def _header(page, document):
+    top = PAGE_HEIGHT - MARGIN
+    page.text(MARGIN, top - 18, 'BILL OF LADING', size=18, bold=True)
+    page.text(PAGE_WIDTH - MARGIN, top - 14, f"BOL No. {document['bol_number']}", size=12, bold=True, right=True)
+    page.text(PAGE_WIDTH - MARGIN, top - 28, f"Ship date: {document['ship_date']}", size=9, right=True)
+
+    right = MARGIN + (PAGE_WIDTH - 2 * MARGIN) / 2 + 5
+    _party(page, MARGIN, top - 40, 'Shipper', document['shipper'])
+    _party(page, right, top - 40, 'Consignee', document['consignee'])
+    _party(page, MARGIN, top - 120, 'Ship to', document['ship_to'])
+    _party(page, right, top - 120, 'Carrier', document['carrier'])
+    return top - 210
+
+
+def _continuation_header(page, document):
+    top = PAGE_HEIGHT - MARGIN
+    page.text(MARGIN, top - 12, f"BOL No. {document['bol_number']} (continued)", size=11, bold=True)
+    page.text(PAGE_WIDTH - MARGIN, top - 12, f"Ship date: {document['ship_date']}", size=9, right=True)
+    return top - 30
+
+
+def _table_header(page, y):
+    for title, x, _, right in ITEM_COLUMNS:
+        page.text(x, y, title, size=8, bold=True, right=right)
+    page.line(MARGIN, y - 4, PAGE_WIDTH - MARGIN, y - 4)
+    return y - ROW_HEIGHT - 2
+
+
+def _footer(page, document, number, count):
+    page.text(MARGIN, MARGIN - 15, f"BOL {document['bol_number']}", size=7)
+    page.text(PAGE_WIDTH - MARGIN, MARGIN - 15, f'Page {number} of {count}', size=7, right=True)
+
+
+def _closing(page, document, y, bags, weight):
+    page.line(MARGIN, y + ROW_HEIGHT - 4, PAGE_WIDTH - MARGIN, y + ROW_HEIGHT - 4)
+    page.text(MARGIN, y, f"Total: {len(document['items'])} lines", size=9, bold=True)
+    page.text(ITEM_COLUMNS[-2][1], y, f'{bags:,}', size=9, bold=True, right=True)
+    page.text(ITEM_COLUMNS[-1][1], y, f'{weight:,.2f}', size=9, bold=True, right=True)
+    y -= 2 * ROW_HEIGHT
+    if document['notes']:
+        page.text(MARGIN, y, 'Notes:', size=8, bold=True)
+        page.text(MARGIN + 32, y, _clip(document['notes'], 110), size=8)
+        y -= 2 * ROW_HEIGHT
+    width = (PAGE_WIDTH - 2 * MARGIN - 40) / 3
+    for number, label in enumerate(('Shipper signature', 'Driver signature', 'Received by')):
+        x = MARGIN + number * (width + 20)
+        page.line(x, y - 20, x + width, y - 20)
+        page.text(x, y - 30, label, size=7)
+        page.text(x, y - 48, 'Date:', size=7)
+
+
+def _paginate(items):
+    """Split item rows into pages, keeping room for the totals and signatures"""
+    pages = [items[:FIRST_PAGE_ROWS]]
+    rest = items[FIRST_PAGE_ROWS:]
+    while rest:
+        pages.append(rest[:PAGE_ROWS])
+        rest = rest[PAGE_ROWS:]
+    limit = FIRST_PAGE_ROWS if len(pages) == 1 else PAGE_ROWS
+    if len(pages[-1]) + CLOSING_ROWS > limit:
+        pages.append([])
+    return pages
+
+
+def render_bol(document):
+    """
+    Compressed page streams for one BOL.
+
+    ``document`` is a dict with ``bol_number``, ``ship_date``, ``notes``, the
+    address lines ``shipper``, ``consignee``, ``ship_to`` and ``carrier``, and
+    ``items``: ``(barcode, item, size, lot, bags, weight)`` tuples. Totals are
+    summed from the items so they always match the lines printed.
+    """
+    pages = _paginate(document['items'])
+    streams = []
+    bags = sum(item[4] for item in document['items'])
+    weight = sum(item[5] for item in document['items'])
+    for number, rows in enumerate(pages, 1):
+        page = _Page()
+        y = _header(page, document) if number == 1 else _continuation_header(page, document)
+        y = _table_header(page, y)
+        for row in rows:
+            for (_, x, length, right), value in zip(ITEM_COLUMNS, row):
+                if isinstance(value, int):
+                    value = f'{value:,}'
+                elif not isinstance(value, str):
+                    value = f'{value:,.2f}'
+                page.text(x, y, _clip(value, length), size=8, right=right)
+            y -= ROW_HEIGHT
+        if number == len(pages):
+            _closing(page, document, y - 4, bags, weight)
+        _footer(page, document, number, len(pages))
+        streams.append(page.stream())
+    return streams
+
+
+def assemble(streams, title=''):
+    """A complete PDF file (bytes) with one page per compressed content stream"""
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, 5 info, then a page and its content per stream
+    first_page = 6
+    kids = ' '.join(f'{first_page + 2 * number} 0 R' for number in range(len(streams)))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {len(streams)} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        f'<< /Title ({_escape(title)}) /Producer (BOL Management System) >>'.encode('latin-1'),
+    ]
+    for number, stream in enumerate(streams):
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> '
+            f'/Contents {first_page + 2 * number + 1} 0 R >>'.encode()
+        )
+        objects.append(
+            f'<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n'.encode() + stream + b'\nendstream'
+        )
+
+    output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode()
+    output += (
+        f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 5 0 R >>\n'
+        f'startxref\n{xref}\n%%EOF\n'
+    ).encode()
+    return bytes(output)
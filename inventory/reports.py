@@ -0,0 +1,252 @@
+"""
+Inventory aging and valuation reports.
+
+Both reports are aggregated in the database with one grouped query, so
+their cost does not depend on Python looping over batches:
+
+* ``aging`` groups on-hand batches by item, size, supplier and age bucket
+  (days since ``receipt_date``, bucketed with a ``CASE`` over precomputed
+  receipt-date bounds so the status/receipt-date index applies);
+* ``valuation`` gives on-hand bags and MT by item, size and supplier.
+
+Both take an ``as_of`` date. Today's figures come from the batch table and
+``InventorySummary``. Past dates are rebuilt from the movement ledger:
+valuation from the latest ``InventorySnapshot`` plus the movements since,
+aging from each batch's ledger balance on that date. The ledger has no
+status history, so past reports count every batch with bags left,
+including batches on hold.
+
+Results are cached per report and day under a key that includes the
+newest ledger movement and summary change, so any stock change produces
+a fresh report on the next request. ``export`` renders a report as CSV or
+XLSX.
+"""
+
+import csv
+import hashlib
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case, CharField, Count, DecimalField, F, Max, Min, OuterRef, Subquery, Sum, Value, When
+)
+from django.utils import timezone
+
+from . import metrics
+from .models import Batch, InventoryMovement, InventorySnapshot, InventorySummary, Item, Size, Supplier
+from .stats import fetch_scalars
+
+CACHE_PREFIX = 'reports'
+WEIGHT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+# (label, maximum age in days); the last bucket is open-ended
+AGING_BUCKETS = (
+    ('0-30', 30),
+    ('31-60', 60),
+    ('61-90', 90),
+    ('91-180', 180),
+    ('181-365', 365),
+    ('365+', None),
+)
+
+COLUMNS = {
+    'aging': (
+        ('item_code', 'Item'), ('size_label', 'Size'), ('supplier', 'Supplier'),
+        ('bucket', 'Age (days)'), ('batches', 'Batches'), ('bags', 'Bags'),
+        ('weight_mt', 'Weight (MT)'), ('oldest_receipt', 'Oldest receipt'),
+        ('max_age_days', 'Max age (days)'),
+    ),
+    'valuation': (
+        ('item_code', 'Item'), ('size_label', 'Size'), ('supplier', 'Supplier'),
+        ('bags', 'Bags'), ('bag_weight', 'MT per bag'), ('weight_mt', 'Weight (MT)'),
+    ),
+}
+
+
+def _bucket(as_of, field='receipt_date'):
+    """CASE expression labelling each row's age bucket on ``as_of``"""
+    whens = [
+        When(**{f'{field}__gte': as_of - timedelta(days=max_days)}, then=Value(label))
+        for label, max_days in AGING_BUCKETS if max_days is not None
+    ]
+    return Case(*whens, default=Value(AGING_BUCKETS[-1][0]), output_field=CharField())
+
+
+def _weight(value):
+    return Decimal(value).quantize(Decimal('0.01')) if value is not None else Decimal('0.00')
+
+
+def compute_aging(as_of):
+    """Aging rows grouped by item, size, supplier and bucket"""
+    today = timezone.localdate()
+    batches = Batch.objects.filter(receipt_date__lte=as_of)
+    if as_of >= today:
+        batches = batches.filter(status__in=Batch.ON_HAND_STATUSES, current_quantity__gt=0)
+        bags = F('current_quantity')
+    else:
+        balance = (
+            InventoryMovement.objects.filter(batch=OuterRef('pk'), effective_date__lte=as_of)
+            .order_by().values('batch').annotate(total=Sum('quantity')).values('total')
+        )
+        batches = batches.alias(bags_as_of=Subquery(balance)).filter(bags_as_of__gt=0)
+        bags = F('bags_as_of')
+
+    rows = (
+        batches.order_by()
+        .values(
+            'item__item_code', 'size__size_label', 'supplier__supplier_name',
+            bucket=_bucket(as_of),
+        )
+        .annotate(
+            batches=Count('pk'),
+            bags=Sum(bags),
+            weight_mt=Sum(bags * F('item__standard_bag_weight'), output_field=WEIGHT_FIELD),
+            oldest_receipt=Min('receipt_date'),
+        )
+    )
+    order = {label: position for position, (label, _) in enumerate(AGING_BUCKETS)}
+    report = [
+        {
+            'item_code': row['item__item_code'],
+            'size_label': row['size__size_label'],
+            'supplier': row['supplier__supplier_name'],
+            'bucket': row['bucket'],
+            'batches': row['batches'],
+            'bags': row['bags'],
+            'weight_mt': _weight(row['weight_mt']),
+            'oldest_receipt': row['oldest_receipt'],
+            'max_age_days': (as_of - row['oldest_receipt']).days,
+        }
+        for row in rows
+    ]
+    report.sort(key=lambda row: (row['item_code'], row['size_label'], row['supplier'], order[row['bucket']]))
+    return report
+
+
+def compute_valuation(as_of):
+    """On-hand bags and MT grouped by item, size and supplier"""
+    if as_of >= timezone.localdate():
+        stock = {
+            (row['item_id'], row['size_id'], row['supplier_id']): row['bags']
+            for row in InventorySummary.objects.filter(bags__gt=0).values('item_id', 'size_id', 'supplier_id', 'bags')
+        }
+    else:
+        stock = InventorySnapshot.objects.stock_as_of(as_of)
+
+    items = Item.objects.in_bulk({item_id for item_id, _, _ in stock})
+    sizes = dict(Size.objects.filter(pk__in={size_id for _, size_id, _ in stock}).values_list('pk', 'size_label'))
+    suppliers = dict(
+        Supplier.objects.filter(pk__in={supplier_id for _, _, supplier_id in stock})
+        .values_list('pk', 'supplier_name')
+    )
+    report = []
+    for (item_id, size_id, supplier_id), bags in stock.items():
+        item = items[item_id]
+        report.append({
+            'item_code': item.item_code,
+            'size_label': sizes[size_id],
+            'supplier': suppliers[supplier_id],
+            'bags': bags,
+            'bag_weight': item.standard_bag_weight,
+            # Past weights use today's bag weight; the ledger records bags only
+            'weight_mt': _weight(bags * item.standard_bag_weight),
+        })
+    report.sort(key=lambda row: (row['item_code'], row['size_label'], row['supplier']))
+    return report
+
+
+REPORTS = {
+    'aging': compute_aging,
+    'valuation': compute_valuation,
+}
+
+
+def _newest(queryset, field):
+    return queryset.order_by().annotate(_group=Value(1)).values('_group').annotate(value=Max(field)).values('value')
+
+
+def _fingerprint():
+    """
+    Newest ledger movement, summary change and batch edit (receipt dates
+    move aging buckets) and the latest item, size and supplier edit (names
+    and bag weights are in the rows), in one round-trip
+    """
+    scalars = fetch_scalars({
+        'movement': _newest(InventoryMovement.objects.all(), 'id'),
+        'summary': _newest(InventorySummary.objects.all(), 'updated_at'),
+        'batch': _newest(Batch.objects.all(), 'updated_at'),
+        'item': _newest(Item.objects.all(), 'updated_at'),
+        'size': _newest(Size.objects.all(), 'updated_at'),
+        'supplier': _newest(Supplier.objects.all(), 'updated_at'),
+    })
+    fingerprint = '|'.join(str(value) for value in scalars.values())
+    return hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()
+
+
+def totals(name, rows):
+    """Grand totals (per bucket for aging) of a report's rows"""
+    if name == 'aging':
+        by_bucket = {label: {'bucket': label, 'batches': 0, 'bags': 0, 'weight_mt': Decimal('0.00')}
+                     for label, _ in AGING_BUCKETS}
+        for row in rows:
+            bucket = by_bucket[row['bucket']]
+            bucket['batches'] += row['batches']
+            bucket['bags'] += row['bags']
+            bucket['weight_mt'] += row['weight_mt']
+        return list(by_bucket.values())
+    return {
+        'bags': sum(row['bags'] for row in rows),
+        'weight_mt': sum((row['weight_mt'] for row in rows), Decimal('0.00')),
+    }
+
+
+def cache_key(name, as_of):
+    """Cache key of a report as of a date, for stock as it stands now"""
+    return f'{CACHE_PREFIX}:{name}:{as_of.isoformat()}:{_fingerprint()}'
+
+
+def get_report(name, as_of=None):
+    """
+    Return ``{'report', 'as_of', 'rows', 'totals'}`` for a report, from the
+    cache when stock has not changed since it was computed.
+    """
+    as_of = as_of or timezone.localdate()
+    key = cache_key(name, as_of)
+    report = cache.get(key)
+    metrics.record_cache('reports', report is not None)
+    if report is None:
+        rows = REPORTS[name](as_of)
+        report = {'report': name, 'as_of': as_of, 'rows': rows, 'totals': totals(name, rows)}
+        cache.set(key, report, getattr(settings, 'REPORT_CACHE_TIMEOUT', 86400))
+    return report
+
+
+def export(report, file_format):
+    """Render a report as ``(content, content_type, filename)``; ``file_format`` is csv or xlsx"""
+    columns = COLUMNS[report['report']]
+    filename = f"{report['report']}-{report['as_of'].isoformat()}.{file_format}"
+    if file_format == 'csv':
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow([title for _, title in columns])
+        for row in report['rows']:
+            writer.writerow([row[key] for key, _ in columns])
+        return output.getvalue(), 'text/csv', filename
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(report['report'].capitalize())
+    sheet.append([title for _, title in columns])
+    for row in report['rows']:
+        sheet.append([row[key] for key, _ in columns])
+    output = io.BytesIO()
+    workbook.save(output)
+    return (
+        output.getvalue(),
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        filename,
+    )
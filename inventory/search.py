@@ -0,0 +1,269 @@
+"""
+Batch search, filtering and sorting shared by the batch list page and API.
+
+``BatchSearch`` parses the query string (``barcode`` prefix, ``lot``,
+``barge`` and free-text ``q`` substrings, ``item``/``size``/``supplier``
+ids, ``status`` and the ``received_from``/``received_to`` range) and
+applies it to a queryset. Every lookup is index-backed:
+
+* the barcode prefix is a range scan on the unique barcode index (its
+  ``varchar_pattern_ops`` twin on PostgreSQL);
+* substring searches use the trigram GIN indexes on PostgreSQL (migration
+  0004) and the ``inventory_batch_fts`` FTS5 trigram table on SQLite
+  (``ensure_fts_index``, run after every migrate). Terms shorter than
+  three characters cannot use a trigram index and fall back to a plain
+  ``icontains`` scan.
+
+``EstimatedCountPaginator`` keeps the list page from running an exact
+``COUNT(*)`` over millions of rows.
+"""
+
+import uuid
+from datetime import date
+
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+
+FTS_TABLE = 'inventory_batch_fts'
+# Batch columns in the FTS / trigram indexes, by query parameter
+TEXT_COLUMNS = {'barcode': 'barcode', 'lot': 'lot_number', 'barge': 'barge'}
+# Trigram indexes cannot help with shorter terms
+MIN_TRIGRAM_LENGTH = 3
+
+SORT_FIELDS = {
+    'received': 'receipt_date',
+    'barcode': 'barcode',
+    'lot': 'lot_number',
+    'barge': 'barge',
+    'quantity': 'current_quantity',
+    'status': 'status',
+}
+DEFAULT_SORT = '-received'
+
+_fts_tables = {}
+
+
+def has_fts_table(using='default'):
+    """Whether the SQLite FTS5 index exists (it needs an FTS5-enabled SQLite)"""
+    connection = connections[using]
+    key = (using, str(connection.settings_dict['NAME']))
+    if key not in _fts_tables:
+        with connection.cursor() as cursor:
+            _fts_tables[key] = FTS_TABLE in connection.introspection.table_names(cursor)
+    return _fts_tables[key]
+
+
+FTS_TRIGGERS = {
+    'inventory_batch_fts_insert': f"""
+        CREATE TRIGGER inventory_batch_fts_insert AFTER INSERT ON inventory_batch BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, barcode, lot_number, barge)
+            VALUES (new.rowid, new.barcode, new.lot_number, new.barge);
+        END""",
+    'inventory_batch_fts_delete': f"""
+        CREATE TRIGGER inventory_batch_fts_delete AFTER DELETE ON inventory_batch BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, barcode, lot_number, barge)
+            VALUES ('delete', old.rowid, old.barcode, old.lot_number, old.barge);
+        END""",
+    'inventory_batch_fts_update': f"""
+        CREATE TRIGGER inventory_batch_fts_update AFTER UPDATE OF barcode, lot_number, barge
+        ON inventory_batch BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, barcode, lot_number, barge)
+            VALUES ('delete', old.rowid, old.barcode, old.lot_number, old.barge);
+            INSERT INTO {FTS_TABLE} (rowid, barcode, lot_number, barge)
+            VALUES (new.rowid, new.barcode, new.lot_number, new.barge);
+        END""",
+}
+
+
+def ensure_fts_index(using='default', create=True):
+    """
+    Create the SQLite FTS5 trigram index of batch barcodes, lots and barges
+    and the triggers that keep it in step, rebuilding it when any of them
+    was missing. SQLite drops triggers whenever a migration remakes the
+    batch table, so this also runs (with ``create=False``, only repairing an
+    existing index) after every ``migrate``. Does nothing on other databases
+    or when SQLite lacks FTS5 trigram support.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    _fts_tables.pop((using, str(connection.settings_dict['NAME'])), None)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'inventory_batch'")
+        triggers = {row[0] for row in cursor.fetchall()}
+        tables = connection.introspection.table_names(cursor)
+        if FTS_TABLE in tables and triggers >= set(FTS_TRIGGERS):
+            return True
+        if FTS_TABLE not in tables and not create:
+            return False
+        try:
+            with transaction.atomic(using=using):
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"barcode, lot_number, barge, content='inventory_batch', "
+                    f"content_rowid='rowid', tokenize='trigram')"
+                )
+        except OperationalError:
+            # No FTS5, or a SQLite older than 3.34 without the trigram tokenizer
+            return False
+        for name, sql in FTS_TRIGGERS.items():
+            if name not in triggers:
+                cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+class BatchSearch:
+    """Parsed batch filters; raises ValueError on malformed values"""
+
+    def __init__(self, params):
+        self.barcode = params.get('barcode', '').strip()
+        self.text = {
+            'lot': params.get('lot', '').strip(),
+            'barge': params.get('barge', '').strip(),
+            'q': params.get('q', '').strip(),
+        }
+        self.ids = {}
+        for param in ('item', 'size', 'supplier'):
+            if params.get(param):
+                self.ids[param] = uuid.UUID(params[param])
+        self.statuses = []
+        if params.get('status'):
+            self.statuses = params['status'].upper().split(',')
+        self.received_from = None
+        if params.get('received_from'):
+            self.received_from = date.fromisoformat(params['received_from'])
+        self.received_to = None
+        if params.get('received_to'):
+            self.received_to = date.fromisoformat(params['received_to'])
+
+        sort = params.get('sort') or DEFAULT_SORT
+        if sort.lstrip('-') not in SORT_FIELDS:
+            raise ValueError(f'Unknown sort {sort}')
+        self.sort = sort
+
+    @property
+    def is_filtered(self):
+        return bool(
+            self.barcode or any(self.text.values()) or self.ids or self.statuses
+            or self.received_from or self.received_to
+        )
+
+    def ordering(self):
+        """ORDER BY for ``sort``, made unique with barcode as the tie-breaker"""
+        descending = self.sort.startswith('-')
+        field = SORT_FIELDS[self.sort.lstrip('-')]
+        ordering = [f"{'-' if descending else ''}{field}"]
+        if field != 'barcode':
+            ordering.append('barcode')
+        return ordering
+
+    def apply(self, queryset):
+        """Filter ``queryset``; ordering is left to the caller"""
+        if self.barcode:
+            queryset = queryset.filter(self._prefix_q(queryset.db))
+        queryset = self._apply_text(queryset)
+        for param, value in self.ids.items():
+            queryset = queryset.filter(**{f'{param}_id': value})
+        if self.statuses:
+            queryset = queryset.filter(status__in=self.statuses)
+        if self.received_from:
+            queryset = queryset.filter(receipt_date__gte=self.received_from)
+        if self.received_to:
+            queryset = queryset.filter(receipt_date__lte=self.received_to)
+        return queryset
+
+    def _prefix_q(self, using):
+        if connections[using].vendor == 'postgresql':
+            # LIKE 'prefix%' uses the varchar_pattern_ops index Django adds for unique CharFields
+            return Q(barcode__startswith=self.barcode)
+        # SQLite's LIKE is case-insensitive and skips the index; a range over the
+        # binary-collated barcode index is the same prefix match
+        upper = self.barcode[:-1] + chr(ord(self.barcode[-1]) + 1)
+        return Q(barcode__gte=self.barcode, barcode__lt=upper)
+
+    def _apply_text(self, queryset):
+        if not any(self.text.values()):
+            return queryset
+        connection = connections[queryset.db]
+        use_fts = connection.vendor == 'sqlite' and has_fts_table(queryset.db)
+        matches = []
+        for param, term in self.text.items():
+            if not term:
+                continue
+            if use_fts and len(term) >= MIN_TRIGRAM_LENGTH:
+                column = TEXT_COLUMNS.get(param)
+                matches.append(f'{column} : {_fts_phrase(term)}' if column else _fts_phrase(term))
+            elif param == 'q':
+                # On PostgreSQL UPPER(col) LIKE UPPER('%term%') uses the trigram GIN indexes
+                queryset = queryset.filter(
+                    Q(barcode__icontains=term) | Q(lot_number__icontains=term) | Q(barge__icontains=term)
+                )
+            else:
+                queryset = queryset.filter(**{f'{TEXT_COLUMNS[param]}__icontains': term})
+        if matches:
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT id FROM inventory_batch WHERE rowid IN '
+                f'(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+                [' AND '.join(matches)],
+            ))
+        return queryset
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    The planner's row estimate for ``model``'s table, or None when there is
+    none (PostgreSQL before its first ANALYZE, SQLite without sqlite_stat1).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            if 'sqlite_stat1' not in connection.introspection.table_names(cursor):
+                return None
+            # stat is "<rows> <rows per key>..." for every index of the table
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts more than it needs to.
+
+    Unfiltered lists take the row count from the table statistics; filtered
+    lists count at most ``count_limit`` rows (``SELECT COUNT(*) FROM (...
+    LIMIT n)``). ``count_is_estimate`` tells the template to show "about"
+    or "n+" rather than an exact total.
+    """
+    count_limit = 10000
+
+    def __init__(self, *args, filtered=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.filtered = filtered
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not self.filtered:
+            estimate = estimate_table_rows(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate > self.count_limit:
+                self.count_is_estimate = True
+                return estimate
+        count = self.object_list.order_by()[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            self.count_is_estimate = True
+            return self.count_limit
+        return count
@@ -0,0 +1,156 @@
+"""
+BOL shipping engine.
+
+``ship_bol`` creates a BOL with its line items, decrements the shipped
+batches and appends their ledger movements in a single transaction,
+using a constant number of queries no matter how many lines the BOL has.
+"""
+
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from . import barcodes, metrics
+from .bol_numbers import allocate_bol_numbers
+from .models import BOL, BOLItem, Batch, InventoryMovement, InventorySummary, Supplier
+from .totals import refresh_bol_totals
+
+
+def _normalize_lines(lines):
+    """Merge line items into an ordered {batch_id: quantity} mapping"""
+    quantities = OrderedDict()
+    for line in lines:
+        if isinstance(line, dict):
+            batch = line.get('batch', line.get('batch_id'))
+            quantity = line.get('quantity_shipped', line.get('quantity'))
+        else:
+            batch, quantity = line
+        batch_id = getattr(batch, 'pk', batch)
+        try:
+            # Dashless or uppercase UUIDs must key the same as the locked rows
+            batch_id = str(Batch._meta.pk.to_python(batch_id))
+        except ValidationError:
+            raise ValidationError(f"Batch {batch_id} does not exist")
+        try:
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Invalid quantity for batch {batch_id}")
+        if quantity < 1:
+            raise ValidationError(f"Quantity for batch {batch_id} must be at least 1")
+        quantities[batch_id] = quantities.get(batch_id, 0) + quantity
+    if not quantities:
+        raise ValidationError("A BOL needs at least one line item")
+    return quantities
+
+
+def _lock_batches(batch_ids):
+    """Lock the batches in primary-key order so concurrent shipments cannot deadlock"""
+    rows = (
+        Batch.objects.select_for_update()
+        .filter(pk__in=batch_ids)
+        .order_by('pk')
+        .values('pk', 'barcode', *Batch.SUMMARY_FIELDS)
+    )
+    return {str(row['pk']): row for row in rows}
+
+
+def _apply_decrements(quantities, locked):
+    """
+    Decrement every batch (and flag emptied ones as DEPLETED) in one UPDATE,
+    then move the on-hand summary by the same amounts
+    """
+    quantity_whens = []
+    status_whens = []
+    changes = []
+    for batch_id, quantity in quantities.items():
+        before = locked[batch_id]
+        after = dict(before, current_quantity=before['current_quantity'] - quantity)
+        quantity_whens.append(When(pk=batch_id, then=F('current_quantity') - quantity))
+        if after['current_quantity'] == 0:
+            status_whens.append(When(pk=batch_id, then=Value('DEPLETED')))
+            after['status'] = 'DEPLETED'
+        changes.append((before, after))
+
+    Batch.objects.filter(pk__in=list(quantities)).update(
+        current_quantity=Case(
+            *quantity_whens, default=F('current_quantity'), output_field=PositiveIntegerField()
+        ),
+        status=Case(*status_whens, default=F('status')) if status_whens else F('status'),
+        updated_at=timezone.now(),
+    )
+    InventorySummary.objects.apply_deltas(InventorySummary.objects.batch_deltas(changes))
+    batch_ids = list(quantities)
+    transaction.on_commit(lambda: barcodes.discard(batch_ids))
+
+
+def _record_shipment(bags):
+    metrics.inc('bol_bols_shipped_total')
+    metrics.inc('bol_bags_shipped_total', bags)
+
+
+def ship_bol(header, lines):
+    """
+    Create a BOL and ship its line items.
+
+    ``header`` holds BOL field values (``supplier``, ``customer``,
+    ``location``, ``truck``, ``ship_date``, ``notes`` and optionally
+    ``bol_number``; a number is allocated from the supplier when omitted).
+    ``lines`` is an iterable of ``(batch, quantity)`` pairs or dicts with
+    ``batch``/``quantity_shipped`` keys. Raises ``ValidationError`` and
+    rolls back if any batch is missing, not active or short on stock.
+    """
+    quantities = _normalize_lines(lines)
+    header = dict(header)
+
+    with transaction.atomic():
+        locked = _lock_batches(list(quantities))
+
+        errors = []
+        for batch_id, quantity in quantities.items():
+            if batch_id not in locked:
+                errors.append(f"Batch {batch_id} does not exist")
+                continue
+            batch = locked[batch_id]
+            if batch['status'] != 'ACTIVE':
+                errors.append(f"Batch {batch['barcode']} is not active")
+            elif quantity > batch['current_quantity']:
+                errors.append(
+                    f"Batch {batch['barcode']} has only {batch['current_quantity']} bags, "
+                    f"{quantity} requested"
+                )
+        if errors:
+            raise ValidationError(errors)
+
+        _apply_decrements(quantities, locked)
+
+        if not header.get('bol_number'):
+            supplier = header.get('supplier')
+            supplier_id = header.get('supplier_id') or getattr(supplier, 'pk', supplier)
+            if isinstance(supplier, Supplier):
+                prefix = supplier.bol_prefix
+            else:
+                prefix = Supplier.objects.values_list('bol_prefix', flat=True).get(pk=supplier_id)
+            number = allocate_bol_numbers(supplier_id, 1).start
+            header['bol_number'] = f"{prefix}{number}"
+
+        bol = BOL.objects.create(**header)
+        BOLItem.objects.bulk_create([
+            BOLItem(bol=bol, batch_id=batch_id, quantity_shipped=quantity)
+            for batch_id, quantity in quantities.items()
+        ])
+        InventoryMovement.objects.record([
+            InventoryMovement(
+                batch_id=batch_id, item_id=locked[batch_id]['item_id'], size_id=locked[batch_id]['size_id'],
+                supplier_id=locked[batch_id]['supplier_id'], kind=InventoryMovement.SHIPMENT, bol=bol,
+                quantity=-quantity, effective_date=bol.ship_date,
+            )
+            for batch_id, quantity in quantities.items()
+        ])
+        refresh_bol_totals(bol)
+        shipped_bags = sum(quantities.values())
+        transaction.on_commit(lambda: _record_shipment(shipped_bags))
+
+    return bol
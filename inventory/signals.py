@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import barcodes, cache, search, totals
+from .models import BOL, BOLItem, Batch, InventoryMovement, InventorySummary, Item, Size, Supplier
+
+
+def invalidate_reference_cache(sender, **kwargs):
+    """Drop cached reference data once the change is committed"""
+    transaction.on_commit(lambda: cache.invalidate(sender))
+
+
+# Connected per model rather than to every sender: a catch-all post_delete
+# receiver would stop Django from fast-deleting any table in bulk
+for model in cache.REFERENCE_MODELS:
+    post_save.connect(invalidate_reference_cache, sender=model)
+    post_delete.connect(invalidate_reference_cache, sender=model)
+
+
+@receiver(post_delete, sender=Batch)
+def remove_batch_from_summary(sender, instance, origin=None, **kwargs):
+    """Take a deleted batch's bags out of the on-hand summary and write them off in the ledger"""
+    InventorySummary.objects.record_batch_change(instance.summary_state(), None)
+    # Deleting its item, size or supplier takes their movements and snapshots with it
+    if isinstance(origin, (Item, Size, Supplier)) or (
+        isinstance(origin, QuerySet) and origin.model in (Item, Size, Supplier)
+    ):
+        return
+    # The history stays, so existing snapshots still add up; the write-off is dated today
+    InventoryMovement.objects.record_batch_delete(instance)
+
+
+@receiver(post_save, sender=Batch)
+@receiver(post_delete, sender=Batch)
+def forget_scanned_batch(sender, instance, **kwargs):
+    """Drop the batch from this process's barcode index once the change is committed"""
+    batch_id = instance.pk
+    transaction.on_commit(lambda: barcodes.discard([batch_id]))
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_save, sender=Size)
+@receiver(post_save, sender=Supplier)
+def forget_scanned_related(sender, instance, **kwargs):
+    """Drop the batches of a saved item, size or supplier from the barcode index: its name may have changed"""
+    pk = instance.pk
+    transaction.on_commit(lambda: barcodes.discard_related(sender, [pk]))
+
+
+@receiver(post_save, sender=Item)
+def reweigh_inventory_summary(sender, instance, **kwargs):
+    """Recompute summary weights when an item's bag weight may have changed"""
+    InventorySummary.objects.reweigh([instance.pk])
+
+
+@receiver(post_save, sender=BOLItem)
+@receiver(post_delete, sender=BOLItem)
+def refresh_bol_totals(sender, instance, origin=None, **kwargs):
+    """Recompute the BOL's stored totals when one of its lines changes"""
+    # Lines deleted along with their BOL leave nothing to update
+    if isinstance(origin, BOL) or (isinstance(origin, QuerySet) and origin.model is BOL):
+        return
+    totals.update_bol_totals(BOL.objects.filter(pk=instance.bol_id))
+
+
+@receiver(post_migrate)
+def repair_batch_search_index(sender, using, **kwargs):
+    """Re-create FTS triggers dropped when a migration remade the SQLite batch table"""
+    if sender.name == 'inventory':
+        search.ensure_fts_index(using, create=False)
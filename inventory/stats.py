@@ -0,0 +1,151 @@
+"""
+Dashboard statistics.
+
+All counters and the per-item breakdown are fetched in a single round-trip:
+one scalar subquery per counter, left-joined to the grouped breakdown so
+the counters repeat on every breakdown row. On-hand totals and the
+breakdown read the pre-aggregated ``InventorySummary`` table.
+Results are cached for ``DASHBOARD_STATS_TIMEOUT`` seconds so busy landing
+pages stay cheap.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, DecimalField, F, Sum, Value
+
+from . import metrics
+from .models import Batch, Carrier, Customer, InventorySummary, Item, Size, Supplier
+
+STATS_CACHE_KEY = 'dashboard:stats'
+
+WEIGHT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _count(queryset):
+    """A one-row, one-column COUNT(*) queryset usable as a scalar subquery"""
+    return (
+        queryset.order_by()
+        .annotate(_group=Value(1))
+        .values('_group')
+        .annotate(value=Count('pk'))
+        .values('value')
+    )
+
+
+def _sum(queryset, expression):
+    """A one-row, one-column SUM(expression) queryset usable as a scalar subquery"""
+    return (
+        queryset.order_by()
+        .annotate(_group=Value(1))
+        .values('_group')
+        .annotate(value=Sum(expression, output_field=WEIGHT_FIELD))
+        .values('value')
+    )
+
+
+def _scalar_columns(querysets):
+    columns = []
+    params = []
+    for queryset in querysets.values():
+        sql, query_params = queryset.query.sql_with_params()
+        columns.append(f"({sql})")
+        params.extend(query_params)
+    return columns, params
+
+
+def fetch_scalars(querysets):
+    """Evaluate ``{name: scalar queryset}`` in one ``SELECT (...), (...)`` round-trip"""
+    columns, params = _scalar_columns(querysets)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        row = cursor.fetchone()
+    return dict(zip(querysets, row))
+
+
+def fetch_scalars_with_rows(querysets, rows):
+    """
+    Evaluate ``{name: scalar queryset}`` and the ``values()`` queryset
+    ``rows`` in one round-trip; return ``(scalars, [row dicts])``.
+
+    The rows are left-joined to a one-row table, so the scalars still come
+    back when ``rows`` is empty. Rows are unordered.
+    """
+    columns, params = _scalar_columns(querysets)
+    rows = rows.order_by()
+    rows_sql, rows_params = rows.query.sql_with_params()
+    fields = [*rows.query.values_select, *rows.query.annotation_select]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {', '.join(columns)}, breakdown.* FROM (SELECT 1) AS one "
+            f"LEFT JOIN ({rows_sql}) AS breakdown ON 1 = 1",
+            params + list(rows_params),
+        )
+        result = cursor.fetchall()
+    scalars = dict(zip(querysets, result[0]))
+    return scalars, [
+        dict(zip(fields, row[len(columns):])) for row in result if row[len(columns)] is not None
+    ]
+
+
+def compute_dashboard_stats():
+    """Compute the dashboard counters and the on-hand totals per item"""
+    on_hand = InventorySummary.objects.filter(bags__gt=0)
+    counters, by_item = fetch_scalars_with_rows(
+        {
+            'total_batches': _count(Batch.objects.all()),
+            'active_batches': _count(Batch.objects.filter(status='ACTIVE')),
+            'total_items': _count(Item.objects.filter(is_active=True)),
+            'total_suppliers': _count(Supplier.objects.filter(is_active=True)),
+            'on_hand_bags': _sum(on_hand, F('bags')),
+            'on_hand_mt': _sum(on_hand, F('weight_mt')),
+        },
+        on_hand.values('item_id').annotate(
+            item_code=F('item__item_code'),
+            item_name=F('item__item_name'),
+            batch_count=Sum('batches'),
+            bag_count=Sum('bags'),
+            weight=Sum('weight_mt'),
+        ),
+    )
+    counters['on_hand_bags'] = int(counters['on_hand_bags'] or 0)
+    counters['on_hand_mt'] = Decimal(counters['on_hand_mt'] or 0).quantize(Decimal('0.01'))
+
+    counters['on_hand_by_item'] = [
+        {
+            'item_id': Item._meta.pk.to_python(row['item_id']),
+            'item_code': row['item_code'],
+            'item_name': row['item_name'],
+            'batches': row['batch_count'],
+            'bags': row['bag_count'],
+            'weight_mt': Decimal(row['weight']).quantize(Decimal('0.01')),
+        }
+        for row in sorted(by_item, key=lambda row: row['item_code'])
+    ]
+    return counters
+
+
+def get_dashboard_stats():
+    """Dashboard statistics, cached for ``DASHBOARD_STATS_TIMEOUT`` seconds"""
+    timeout = getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 30)
+    if not timeout:
+        return compute_dashboard_stats()
+    stats = cache.get(STATS_CACHE_KEY)
+    metrics.record_cache('dashboard_stats', stats is not None)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(STATS_CACHE_KEY, stats, timeout)
+    return stats
+
+
+def get_table_counts():
+    """Row counts of the master tables in one round-trip (uncached, for health checks)"""
+    return fetch_scalars({
+        'items': _count(Item.objects.all()),
+        'sizes': _count(Size.objects.all()),
+        'suppliers': _count(Supplier.objects.all()),
+        'customers': _count(Customer.objects.all()),
+        'carriers': _count(Carrier.objects.all()),
+    })
@@ -0,0 +1,97 @@
+"""
+Stored BOL totals.
+
+``BOL.total_bags`` and ``BOL.total_weight_mt`` are kept on the BOL so lists
+and documents need no aggregation. They are recomputed in the database
+from the line items, ``Sum(quantity_shipped)`` and
+``Sum(quantity_shipped * batch__item__standard_bag_weight)`` rounded to two
+places, in Decimal throughout:
+
+* ``ship_bol`` refreshes a new BOL once its lines are inserted;
+* ``inventory.signals`` refreshes a BOL whenever one of its lines is saved
+  or deleted outside ``ship_bol`` (admin, shell);
+* the ``recompute_bol_totals`` command backfills and repairs drift in bulk.
+
+Totals use the item's current bag weight, so recomputing a BOL after its
+item's bag weight changed moves its stored weight too.
+"""
+
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from .models import BOL, BOLItem, weight_expression
+
+WEIGHT_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def computed_totals():
+    """``(bags, weight)`` expressions recomputing a BOL's totals from its line items"""
+    items = BOLItem.objects.filter(bol=OuterRef('pk')).order_by().values('bol')
+    bags = Coalesce(
+        Subquery(items.annotate(total=Sum('quantity_shipped')).values('total')),
+        Value(0),
+        output_field=IntegerField(),
+    )
+    weight = Coalesce(
+        Subquery(items.annotate(
+            total=Round(
+                Sum(weight_expression('quantity_shipped', 'batch__item__standard_bag_weight')),
+                2,
+                output_field=WEIGHT_FIELD,
+            )
+        ).values('total')),
+        Value(Decimal('0.00')),
+        output_field=WEIGHT_FIELD,
+    )
+    return bags, weight
+
+
+def update_bol_totals(bols):
+    """Recompute ``total_bags``/``total_weight_mt`` for a BOL queryset in one UPDATE"""
+    bags, weight = computed_totals()
+    return bols.update(total_bags=bags, total_weight_mt=weight, updated_at=timezone.now())
+
+
+def refresh_bol_totals(bol):
+    """Recompute one BOL's totals and load them onto the instance"""
+    update_bol_totals(BOL.objects.filter(pk=bol.pk))
+    bol.total_bags, bol.total_weight_mt, bol.updated_at = BOL.objects.values_list(
+        'total_bags', 'total_weight_mt', 'updated_at'
+    ).get(pk=bol.pk)
+
+
+def drifted(bols):
+    """The BOLs of a queryset whose stored totals differ from their line items"""
+    bags, weight = computed_totals()
+    return (
+        bols.annotate(expected_bags=bags, expected_weight_mt=weight)
+        .filter(~Q(total_bags=F('expected_bags')) | ~Q(total_weight_mt=F('expected_weight_mt')))
+    )
+
+
+def recompute(bols=None, batch_size=1000, dry_run=False):
+    """
+    Find and fix drifted BOL totals, checking ``batch_size`` BOLs per query
+    and updating only those that drifted (so unchanged BOLs keep their
+    ``updated_at``).
+
+    Returns ``(bol_number, stored, expected)`` for every drifted BOL, where
+    stored and expected are ``(bags, weight)`` pairs.
+    """
+    bols = BOL.objects.all() if bols is None else bols
+    pks = list(bols.order_by('pk').values_list('pk', flat=True))
+    drift = []
+    for start in range(0, len(pks), batch_size):
+        chunk = BOL.objects.filter(pk__in=pks[start:start + batch_size])
+        rows = list(drifted(chunk).values_list(
+            'pk', 'bol_number', 'total_bags', 'total_weight_mt', 'expected_bags', 'expected_weight_mt'
+        ))
+        for _, bol_number, bags, weight, expected_bags, expected_weight in rows:
+            expected_weight = Decimal(expected_weight).quantize(Decimal('0.01'))
+            drift.append((bol_number, (bags, weight), (expected_bags, expected_weight)))
+        if rows and not dry_run:
+            update_bol_totals(BOL.objects.filter(pk__in=[row[0] for row in rows]))
+    return drift
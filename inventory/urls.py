@@ -70,10 +70,22 @@ urlpatterns = [
     path('api/trucks/', views.TruckAPIView.as_view(), name='api_trucks'),
     path('api/locations/', views.LocationAPIView.as_view(), name='api_locations'),
     path('api/batches/', views.BatchAPIView.as_view(), name='api_batches'),
+    path('api/batches/import/', views.BatchImportAPIView.as_view(), name='api_batches_import'),
+    path('api/batches/scan/', views.BatchScanAPIView.as_view(), name='api_batches_scan'),
+    path('api/batches/scan/<str:barcode>/', views.BatchScanAPIView.as_view(), name='api_batch_scan'),
+    path('api/bols/pdf/', views.BOLPDFAPIView.as_view(), name='api_bols_pdf'),
+    path('api/bols/<uuid:pk>/pdf/', views.BOLPDFAPIView.as_view(), name='api_bol_pdf'),
+    path('api/<str:resource>/bulk/', views.BulkAPIView.as_view(), name='api_bulk'),
+    path('api/reports/<str:report>/', views.InventoryReportAPIView.as_view(), name='api_report'),
+    path('api/export/<str:dataset>/', views.ExportAPIView.as_view(), name='api_export'),
     
     # Reports
     path('reports/', views.ReportsView.as_view(), name='reports'),
     
     # Health check
     path('health/', views.health_check, name='health_check'),
+    path('health/live/', views.liveness, name='liveness'),
+
+    # Prometheus scrape target (no trailing slash, the scraper default)
+    path('metrics', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
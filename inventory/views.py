@@ -1,25 +1,39 @@
+import base64
+import binascii
+import hashlib
+import hmac
 import json
 import logging
-from datetime import datetime
+from datetime import date, datetime
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import (
     TemplateView, ListView, DetailView, CreateView, 
     UpdateView, DeleteView, View
 )
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.urls import reverse_lazy, reverse
-from django.db.models import Q, Sum, Count
+from django.db.models import Q, Sum, Count, Max
+from django.db.models.query import QuerySet
+from django.core.handlers.asgi import ASGIRequest
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.conf import settings
+from django.views.decorators.cache import never_cache
 
 from .models import (
     Item, Size, Supplier, Customer, Carrier, Truck,
     Location, Batch, BOL, BOLItem
 )
+from . import barcodes, bulk, cache, documents, exports, metrics, reports, search
+from .importers import import_batches
+from .stats import get_dashboard_stats, get_table_counts
 from .forms import (
     ItemForm, SizeForm, SupplierForm, CustomerForm,
     CarrierForm, TruckForm, LocationForm, BatchForm
@@ -38,10 +52,7 @@ class MainMenuView(TemplateView):
         
         # Add basic stats (with error handling)
         try:
-            context['total_batches'] = Batch.objects.count()
-            context['active_batches'] = Batch.objects.filter(status='ACTIVE').count()
-            context['total_items'] = Item.objects.filter(is_active=True).count()
-            context['total_suppliers'] = Supplier.objects.filter(is_active=True).count()
+            context.update(get_dashboard_stats())
         except Exception as e:
             # If database isn't ready, provide default values
             logger.warning(f"Database not ready for stats: {e}")
@@ -354,11 +365,48 @@ class LocationDeleteView(DeleteView):
 
 # ==== BATCH VIEWS ====
 class BatchListView(ListView):
+    """
+    Batch list with server-side filters and sorting (see ``search.BatchSearch``
+    for the query parameters). Totals come from ``EstimatedCountPaginator``,
+    so ``count_is_estimate`` tells the template when to show "about n".
+    """
     model = Batch
     template_name = 'inventory/batch_list.html'
     context_object_name = 'batches'
-    queryset = Batch.objects.select_related('item', 'size', 'supplier')
     paginate_by = 50
+    paginator_class = search.EstimatedCountPaginator
+
+    def get_search(self):
+        try:
+            return search.BatchSearch(self.request.GET)
+        except ValueError:
+            messages.error(self.request, 'Invalid search filter; showing all batches.')
+            return search.BatchSearch({})
+
+    def get_queryset(self):
+        self.search = self.get_search()
+        queryset = Batch.objects.select_related('item', 'size', 'supplier')
+        return self.search.apply(queryset).order_by(*self.search.ordering())
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(queryset, per_page, filtered=self.search.is_filtered, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context.update({
+            'search': self.search,
+            'count_is_estimate': context['paginator'].count_is_estimate,
+            # Query string to carry the filters over to the other pages
+            'search_query': params.urlencode(),
+            'status_choices': Batch.STATUS_CHOICES,
+            'sort_choices': search.SORT_FIELDS,
+            'items': cache.get_active(Item),
+            'sizes': cache.get_active(Size),
+            'suppliers': cache.get_active(Supplier),
+        })
+        return context
 
 
 class BatchDetailView(DetailView):
@@ -400,9 +448,190 @@ class BatchDeleteView(DeleteView):
 
 # ==== API VIEWS (for AJAX calls matching your existing system) ====
 
+async def _aiter(objects):
+    for obj in objects:
+        yield obj
+
+
 class BaseAPIView(View):
-    """Base class for API views"""
-    
+    """
+    Base class for API views.
+
+    Subclasses whose handlers are all ``async def`` run as async views:
+    validators, list payloads and streams then come from the async ORM
+    (``aaggregate``, ``async for``, ``aiterator``), so under ASGI a slow
+    client or a slow query holds a coroutine rather than a worker thread.
+    """
+    stream_chunk_size = 500
+    stream_formats = ('ndjson', 'json')
+    # Conditional GET: the active rows of ``model`` validate the response,
+    # fingerprinted by row count plus the newest of ``validator_fields``.
+    # Only an ETag is sent: deactivating or deleting a row lowers the count
+    # but never advances (and can even move back) the newest timestamp, so a
+    # Last-Modified date would let If-Modified-Since miss those changes.
+    model = None
+    validator_fields = ('updated_at',)
+
+    def get_validator_queryset(self, request):
+        """Queryset whose freshness validates a GET response (None disables it)"""
+        if self.model is None:
+            return None
+        return self.model.objects.filter(is_active=True)
+
+    def get_validator_aggregates(self):
+        """Count/Max expressions behind the validators"""
+        return {
+            'row_count': Count('pk'),
+            **{f'modified_{i}': Max(field) for i, field in enumerate(self.validator_fields)},
+        }
+
+    def get_validators(self, request):
+        """Return the response's ETag from one Count/Max query, or None"""
+        queryset = self.get_validator_queryset(request)
+        if queryset is None:
+            return None
+        aggregates = queryset.order_by().aggregate(**self.get_validator_aggregates())
+        return self.make_validators(request, aggregates)
+
+    async def aget_validators(self, request):
+        """Async ``get_validators``"""
+        # Building the queryset may introspect the database (batch search)
+        queryset = await sync_to_async(self.get_validator_queryset)(request)
+        if queryset is None:
+            return None
+        aggregates = await queryset.order_by().aaggregate(**self.get_validator_aggregates())
+        return self.make_validators(request, aggregates)
+
+    def make_validators(self, request, aggregates):
+        """The ETag for a row count and the newest timestamps"""
+        row_count = aggregates.pop('row_count')
+        timestamps = [value for value in aggregates.values() if value is not None]
+        last_modified = max(timestamps) if timestamps else None
+        self.validated_rows = (row_count, last_modified)
+        return self.make_etag(request, row_count, last_modified.isoformat() if last_modified else '')
+
+    def make_etag(self, request, *parts):
+        """A strong ETag over the request URL, stream format and ``parts``"""
+        fingerprint = '|'.join([request.get_full_path(), self.get_stream_format(request) or '', *map(str, parts)])
+        return quote_etag(hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest())
+
+    def get_cached_rows(self, model):
+        """Active reference rows from the cache, checked against this request's validators"""
+        row_count, last_modified = getattr(self, 'validated_rows', (None, None))
+        return cache.get_active(model, row_count=row_count, last_modified=last_modified)
+
+    async def aget_cached_rows(self, model):
+        """Async ``get_cached_rows`` (the cache backends are synchronous)"""
+        return await sync_to_async(self.get_cached_rows)(model)
+
+    def dispatch(self, request, *args, **kwargs):
+        """Answer unchanged GETs with 304 Not Modified before building the payload"""
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = self.get_validators(request)
+        if etag is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.finish_conditional(response, etag)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """``dispatch`` for async views"""
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        etag = await self.aget_validators(request)
+        if etag is None:
+            return await super().dispatch(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self.finish_conditional(response, etag)
+
+    def finish_conditional(self, response, etag):
+        """Put the ETag on a fresh 200 and make clients revalidate every response"""
+        if response.status_code == 200:
+            response.headers.setdefault('ETag', etag)
+        # Let browsers keep the body but revalidate it on every poll
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def get_stream_format(self, request):
+        """Return 'ndjson'/'json' when the client opted into streaming, else None"""
+        stream_format = request.GET.get('stream', '').lower()
+        if not stream_format and 'application/x-ndjson' in request.headers.get('Accept', ''):
+            stream_format = 'ndjson'
+        return stream_format if stream_format in self.stream_formats else None
+
+    def get_list_response(self, request, queryset, serialize):
+        """
+        Return a list endpoint payload.
+
+        By default this is a single JSON array. With ``?stream=ndjson`` (or
+        ``Accept: application/x-ndjson``) rows are emitted one per line as
+        they are fetched, and ``?stream=json`` streams the same array in
+        chunks, so memory stays flat regardless of table size.
+        """
+        stream_format = self.get_stream_format(request)
+        if stream_format is None:
+            return JsonResponse([serialize(obj) for obj in queryset], safe=False)
+
+        if hasattr(queryset, 'iterator'):
+            queryset = queryset.iterator(chunk_size=self.stream_chunk_size)
+        rows = (json.dumps(serialize(obj), cls=DjangoJSONEncoder) for obj in queryset)
+        if stream_format == 'ndjson':
+            return StreamingHttpResponse(
+                (row + '\n' for row in rows),
+                content_type='application/x-ndjson'
+            )
+        return StreamingHttpResponse(self._stream_json_array(rows), content_type='application/json')
+
+    async def aget_list_response(self, request, queryset, serialize):
+        """``get_list_response`` for async views, reading querysets with ``async for``"""
+        stream_format = self.get_stream_format(request)
+        if stream_format is not None and not isinstance(request, ASGIRequest):
+            # A WSGI server reads the body synchronously, so stream it synchronously
+            return self.get_list_response(request, queryset, serialize)
+
+        if not isinstance(queryset, QuerySet):
+            objects = _aiter(queryset)
+        elif stream_format is not None:
+            objects = queryset.aiterator(chunk_size=self.stream_chunk_size)
+        else:
+            objects = queryset
+        if stream_format is None:
+            return JsonResponse([serialize(obj) async for obj in objects], safe=False)
+
+        rows = (json.dumps(serialize(obj), cls=DjangoJSONEncoder) async for obj in objects)
+        if stream_format == 'ndjson':
+            return StreamingHttpResponse(
+                (row + '\n' async for row in rows),
+                content_type='application/x-ndjson'
+            )
+        return StreamingHttpResponse(self._astream_json_array(rows), content_type='application/json')
+
+    @staticmethod
+    def _stream_json_array(rows):
+        yield '['
+        for index, row in enumerate(rows):
+            yield row if index == 0 else ',' + row
+        yield ']'
+
+    @staticmethod
+    async def _astream_json_array(rows):
+        yield '['
+        index = 0
+        async for row in rows:
+            yield row if index == 0 else ',' + row
+            index += 1
+        yield ']'
+
     def get_success_response(self, data=None, message="Success"):
         return JsonResponse({
             'success': True,
@@ -410,29 +639,33 @@ class BaseAPIView(View):
             'data': data
         }, encoder=DjangoJSONEncoder)
     
-    def get_error_response(self, message="Error occurred", status=400):
-        return JsonResponse({
+    def get_error_response(self, message="Error occurred", status=400, data=None):
+        payload = {
             'success': False,
             'message': message
-        }, status=status)
+        }
+        if data is not None:
+            payload['data'] = data
+        return JsonResponse(payload, status=status, encoder=DjangoJSONEncoder)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class ItemAPIView(BaseAPIView):
     """API View for Items - matches your Google Scripts functions"""
+    model = Item
     
+    def serialize(self, item):
+        return {
+            'itemId': str(item.id),
+            'itemCode': item.item_code,
+            'itemName': item.item_name,
+            'standardBagWeight': float(item.standard_bag_weight)
+        }
+
     def get(self, request):
         """Get all items - matches getItems()"""
         try:
-            items = []
-            for item in Item.objects.filter(is_active=True):
-                items.append({
-                    'itemId': str(item.id),
-                    'itemCode': item.item_code,
-                    'itemName': item.item_name,
-                    'standardBagWeight': float(item.standard_bag_weight)
-                })
-            return JsonResponse(items, safe=False)
+            return self.get_list_response(request, self.get_cached_rows(Item), self.serialize)
         except Exception as e:
             logger.error(f"Error getting items: {e}")
             return self.get_error_response("Error loading items")
@@ -486,17 +719,18 @@ class ItemAPIView(BaseAPIView):
 @method_decorator(csrf_exempt, name='dispatch')
 class SizeAPIView(BaseAPIView):
     """API View for Sizes - matches your Google Scripts functions"""
+    model = Size
     
+    def serialize(self, size):
+        return {
+            'sizeId': str(size.id),
+            'sizeLabel': size.size_label
+        }
+
     def get(self, request):
         """Get all sizes - matches getSizes()"""
         try:
-            sizes = []
-            for size in Size.objects.filter(is_active=True):
-                sizes.append({
-                    'sizeId': str(size.id),
-                    'sizeLabel': size.size_label
-                })
-            return JsonResponse(sizes, safe=False)
+            return self.get_list_response(request, self.get_cached_rows(Size), self.serialize)
         except Exception as e:
             logger.error(f"Error getting sizes: {e}")
             return self.get_error_response("Error loading sizes")
@@ -530,100 +764,430 @@ class SizeAPIView(BaseAPIView):
 # Similar API views for other models...
 @method_decorator(csrf_exempt, name='dispatch')
 class SupplierAPIView(BaseAPIView):
-    def get(self, request):
-        suppliers = []
-        for supplier in Supplier.objects.filter(is_active=True):
-            suppliers.append({
-                'supplierId': str(supplier.id),
-                'supplierName': supplier.supplier_name,
-                'bolPrefix': supplier.bol_prefix,
-                'nextBolNo': supplier.next_bol_no,
-                'active': supplier.is_active
-            })
-        return JsonResponse(suppliers, safe=False)
+    model = Supplier
+
+    def serialize(self, supplier):
+        return {
+            'supplierId': str(supplier.id),
+            'supplierName': supplier.supplier_name,
+            'bolPrefix': supplier.bol_prefix,
+            'nextBolNo': supplier.next_bol_no,
+            'active': supplier.is_active
+        }
+
+    async def get(self, request):
+        return await self.aget_list_response(request, await self.aget_cached_rows(Supplier), self.serialize)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class CustomerAPIView(BaseAPIView):
-    def get(self, request):
-        customers = []
-        for customer in Customer.objects.filter(is_active=True):
-            customers.append({
-                'customerId': str(customer.id),
-                'customerName': customer.customer_name,
-                'customerCode': customer.customer_code
-            })
-        return JsonResponse(customers, safe=False)
+    model = Customer
+
+    def serialize(self, customer):
+        return {
+            'customerId': str(customer.id),
+            'customerName': customer.customer_name,
+            'customerCode': customer.customer_code
+        }
+
+    async def get(self, request):
+        return await self.aget_list_response(request, await self.aget_cached_rows(Customer), self.serialize)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class CarrierAPIView(BaseAPIView):
-    def get(self, request):
-        carriers = []
-        for carrier in Carrier.objects.filter(is_active=True):
-            carriers.append({
-                'carrierId': str(carrier.id),
-                'carrierName': carrier.carrier_name,
-                'carrierCode': carrier.carrier_code,
-                'contactName': carrier.contact_name or '',
-                'contactPhone': carrier.contact_phone or ''
-            })
-        return JsonResponse(carriers, safe=False)
+    model = Carrier
+
+    def serialize(self, carrier):
+        return {
+            'carrierId': str(carrier.id),
+            'carrierName': carrier.carrier_name,
+            'carrierCode': carrier.carrier_code,
+            'contactName': carrier.contact_name or '',
+            'contactPhone': carrier.contact_phone or ''
+        }
+
+    async def get(self, request):
+        return await self.aget_list_response(request, await self.aget_cached_rows(Carrier), self.serialize)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class TruckAPIView(BaseAPIView):
-    def get(self, request):
-        trucks = []
-        for truck in Truck.objects.filter(is_active=True).select_related('carrier'):
-            trucks.append({
-                'truckId': str(truck.id),
-                'carrierId': str(truck.carrier.id),
-                'truckNo': truck.truck_number,
-                'trailerNo': truck.trailer_number or '',
-                'carrierName': truck.carrier.carrier_name,
-                'carrierCode': truck.carrier.carrier_code
-            })
-        return JsonResponse(trucks, safe=False)
+    model = Truck
+    validator_fields = ('updated_at', 'carrier__updated_at')
+
+    def serialize(self, truck):
+        return {
+            'truckId': str(truck.id),
+            'carrierId': str(truck.carrier.id),
+            'truckNo': truck.truck_number,
+            'trailerNo': truck.trailer_number or '',
+            'carrierName': truck.carrier.carrier_name,
+            'carrierCode': truck.carrier.carrier_code
+        }
+
+    async def get(self, request):
+        queryset = Truck.objects.filter(is_active=True).select_related('carrier')
+        return await self.aget_list_response(request, queryset, self.serialize)
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class LocationAPIView(BaseAPIView):
-    def get(self, request):
-        locations = []
-        for location in Location.objects.filter(is_active=True).select_related('customer'):
-            locations.append({
-                'locationId': str(location.id),
-                'customerId': str(location.customer.id),
-                'locationName': location.location_name,
-                'locationAddress': location.location_address or '',
-                'locationCity': location.location_city or '',
-                'locationState': location.location_state or '',
-                'locationZip': location.location_zip or ''
-            })
-        return JsonResponse(locations, safe=False)
+    model = Location
+
+    def serialize(self, location):
+        return {
+            'locationId': str(location.id),
+            'customerId': str(location.customer.id),
+            'locationName': location.location_name,
+            'locationAddress': location.location_address or '',
+            'locationCity': location.location_city or '',
+            'locationState': location.location_state or '',
+            'locationZip': location.location_zip or ''
+        }
+
+    async def get(self, request):
+        queryset = Location.objects.filter(is_active=True).select_related('customer')
+        return await self.aget_list_response(request, queryset, self.serialize)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BulkAPIView(BaseAPIView):
+    """
+    Batch create/update/delete for master data.
+
+    ``POST`` creates, ``PUT``/``PATCH`` updates and ``DELETE`` deletes the
+    records in a JSON array (or ``{"records": [...]}``) for the resource in
+    the URL. Records use the same keys as the list endpoint; updates and
+    deletes identify rows by their id key (``itemId``, ``truckId``...).
+    Everything is validated first and applied in one transaction, so either
+    every record succeeds or nothing is saved; ``data.results`` always has
+    one entry per record.
+    """
+    max_records = 1000
+    operations = {'POST': 'create', 'PUT': 'update', 'PATCH': 'update', 'DELETE': 'delete'}
+    http_method_names = ['post', 'put', 'patch', 'delete', 'options']
+
+    def dispatch(self, request, resource, *args, **kwargs):
+        if resource not in bulk.RESOURCES:
+            return self.get_error_response(f"Unknown resource '{resource}'", 404)
+        return super().dispatch(request, resource, *args, **kwargs)
+
+    def post(self, request, resource):
+        operation = self.operations[request.method]
+        try:
+            records = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return self.get_error_response("Request body must be JSON")
+        if isinstance(records, dict):
+            records = records.get('records')
+        if not isinstance(records, list) or not records:
+            return self.get_error_response("Send a non-empty array of records")
+        if len(records) > self.max_records:
+            return self.get_error_response(f"At most {self.max_records} records per request")
+
+        try:
+            result = bulk.apply(resource, operation, records)
+        except Exception as e:
+            logger.error(f"Error in bulk {operation} of {resource}: {e}")
+            return self.get_error_response(f"Error in bulk {operation} of {resource}", 500)
+
+        data = {'results': result.results}
+        if not result.ok:
+            return self.get_error_response(
+                f"{len(result.errors)} of {len(records)} record(s) failed validation; nothing was saved",
+                data=data,
+            )
+        return self.get_success_response(data, f"{len(records)} {resource} {operation}d")
+
+    put = patch = delete = post
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class BatchAPIView(BaseAPIView):
-    def get(self, request):
-        batches = []
-        for batch in Batch.objects.select_related('item', 'size', 'supplier'):
-            batches.append({
-                'batchId': str(batch.id),
-                'barcode': batch.barcode,
-                'itemId': str(batch.item.id),
-                'sizeId': str(batch.size.id),
-                'itemCode': batch.item.item_code,
-                'sizeLabel': batch.size.size_label,
-                'supplier': batch.supplier.supplier_name,
-                'lotNo': batch.lot_number or '',
-                'barge': batch.barge or '',
-                'startingQuantity': batch.starting_quantity,
-                'receiptDate': batch.receipt_date.strftime('%Y-%m-%d'),
-                'status': batch.get_status_display()
-            })
-        return JsonResponse(batches, safe=False)
+    """
+    Keyset-paginated batch listing.
+
+    Pages are ordered by ``(-receipt_date, barcode)`` and continue from an
+    opaque ``cursor`` instead of an OFFSET, so deep pages cost the same as
+    the first one. Rows are projected with ``.values()`` so no model
+    instances are built.
+
+    The ETag is built from the rows of the page itself (their ids and the
+    ``validator_fields`` timestamps of each batch, item, size and supplier),
+    so revalidating a page costs the same single bounded query as serving
+    it rather than an aggregate over every matching batch.
+    """
+    page_size = 100
+    max_page_size = 500
+    fields = (
+        'id', 'barcode', 'item_id', 'size_id', 'item__item_code',
+        'size__size_label', 'supplier__supplier_name', 'lot_number', 'barge',
+        'starting_quantity', 'receipt_date', 'status',
+    )
+    status_labels = dict(Batch.STATUS_CHOICES)
+    validator_fields = (
+        'updated_at', 'item__updated_at', 'size__updated_at', 'supplier__updated_at',
+    )
+
+    @staticmethod
+    def encode_cursor(receipt_date, barcode):
+        raw = f"{receipt_date.isoformat()}|{barcode}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        receipt_date, barcode = raw.split('|', 1)
+        return date.fromisoformat(receipt_date), barcode
+
+    def get_queryset(self, params):
+        """Apply the query-string filters (the cursor fixes the order, so ``sort`` is ignored)"""
+        params = params.copy()
+        params.pop('sort', None)
+        return search.BatchSearch(params).apply(Batch.objects.order_by('-receipt_date', 'barcode'))
+
+    def serialize(self, row):
+        return {
+            'batchId': str(row['id']),
+            'barcode': row['barcode'],
+            'itemId': str(row['item_id']),
+            'sizeId': str(row['size_id']),
+            'itemCode': row['item__item_code'],
+            'sizeLabel': row['size__size_label'],
+            'supplier': row['supplier__supplier_name'],
+            'lotNo': row['lot_number'] or '',
+            'barge': row['barge'] or '',
+            'startingQuantity': row['starting_quantity'],
+            'receiptDate': row['receipt_date'].strftime('%Y-%m-%d'),
+            'status': self.status_labels.get(row['status'], row['status'])
+        }
+
+    async def get(self, request):
+        """
+        Get one page of batches -
+        ?cursor=&limit=&barcode=&lot=&barge=&q=&status=&item=&size=&supplier=&received_from=&received_to=
+        """
+        try:
+            queryset = await sync_to_async(self.get_queryset)(request.GET)
+            limit = min(max(int(request.GET.get('limit', self.page_size)), 1), self.max_page_size)
+            if request.GET.get('cursor'):
+                receipt_date, barcode = self.decode_cursor(request.GET['cursor'])
+                queryset = queryset.filter(
+                    Q(receipt_date__lt=receipt_date) |
+                    Q(receipt_date=receipt_date, barcode__gt=barcode)
+                )
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            return self.get_error_response("Invalid filter or cursor")
+
+        if self.get_stream_format(request):
+            # Streaming ignores the page size and emits every matching row
+            return await self.aget_list_response(request, queryset.values(*self.fields), self.serialize)
+
+        rows = [row async for row in queryset.values(*self.fields, *self.validator_fields)[:limit + 1]]
+        etag = self.make_etag(request, *(
+            ','.join(str(row[field]) for field in ('id', *self.validator_fields)) for row in rows
+        ))
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return self.finish_conditional(response, etag)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1]['receipt_date'], rows[-1]['barcode'])
+
+        return self.finish_conditional(JsonResponse({
+            'results': [self.serialize(row) for row in rows],
+            'next': next_cursor
+        }), etag)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchScanAPIView(BaseAPIView):
+    """
+    Barcode scan lookups served from the in-memory ``barcodes`` index.
+
+    ``GET /api/batches/scan/<barcode>/`` resolves one scan; add ``?prefix=1``
+    to get the batches starting with a partly readable barcode instead of a
+    404. ``POST /api/batches/scan/`` with ``{"barcodes": [...]}`` resolves up
+    to ``max_barcodes`` scans at once and lists the unknown ones.
+    """
+    max_barcodes = 100
+
+    def get(self, request, barcode=None):
+        if not barcode or not barcode.strip():
+            return self.get_error_response("No barcode scanned")
+        barcode = barcode.strip()
+        prefix = request.GET.get('prefix', '').lower() in ('1', 'true', 'yes')
+        try:
+            batch = barcodes.lookup([barcode]).get(barcode)
+            if batch is None and prefix:
+                return self.get_success_response({'matches': barcodes.lookup_prefix(barcode)})
+        except Exception as e:
+            logger.error(f"Error scanning barcode {barcode}: {e}")
+            return self.get_error_response("Error looking up barcode", 500)
+        if batch is None:
+            return self.get_error_response(f"Barcode {barcode} not found", 404)
+        return self.get_success_response({'batch': batch})
+
+    def post(self, request):
+        try:
+            scanned = json.loads(request.body).get('barcodes')
+        except (ValueError, UnicodeDecodeError, AttributeError):
+            return self.get_error_response("Request body must be a JSON object")
+        if not isinstance(scanned, list) or not all(isinstance(barcode, str) for barcode in scanned):
+            return self.get_error_response("barcodes must be a list of strings")
+        if len(scanned) > self.max_barcodes:
+            return self.get_error_response(f"At most {self.max_barcodes} barcodes per request")
+
+        scanned = [barcode.strip() for barcode in scanned]
+        try:
+            found = barcodes.lookup(scanned)
+        except Exception as e:
+            logger.error(f"Error scanning barcodes: {e}")
+            return self.get_error_response("Error looking up barcodes", 500)
+        return self.get_success_response({
+            'batches': [found[barcode] for barcode in scanned if barcode in found],
+            'notFound': [barcode for barcode in scanned if barcode not in found],
+        })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchImportAPIView(BaseAPIView):
+    """Bulk barge receipt upload (multipart ``file`` field, CSV or .xlsx)"""
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return self.get_error_response("No file uploaded")
+        try:
+            batch_size = int(request.POST.get('batch_size', 500))
+        except ValueError:
+            return self.get_error_response("Invalid batch size")
+        dry_run = request.POST.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            result = import_batches(upload, upload.name, batch_size=max(batch_size, 1), dry_run=dry_run)
+        except ValueError as e:
+            return self.get_error_response(str(e))
+        except Exception as e:
+            logger.error(f"Error importing batches: {e}")
+            return self.get_error_response("Error importing batches")
+
+        verb = 'validated' if dry_run else 'imported'
+        return self.get_success_response(
+            result.as_dict(),
+            f"{result.created} of {result.rows} batches {verb}"
+        )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class InventoryReportAPIView(BaseAPIView):
+    """
+    Aging and valuation reports - ?as_of=YYYY-MM-DD&format=json|csv|xlsx
+
+    Rows are aggregated in the database and cached per day (see
+    ``inventory.reports``); csv/xlsx download the same rows.
+    """
+    export_formats = ('csv', 'xlsx')
+
+    def get(self, request, report):
+        if report not in reports.REPORTS:
+            return self.get_error_response(f"Unknown report '{report}'", 404)
+        file_format = request.GET.get('format', 'json').lower()
+        if file_format != 'json' and file_format not in self.export_formats:
+            return self.get_error_response(f"Unknown format '{file_format}'")
+        try:
+            as_of = date.fromisoformat(request.GET['as_of']) if request.GET.get('as_of') else None
+        except ValueError:
+            return self.get_error_response("as_of must be a date (YYYY-MM-DD)")
+
+        try:
+            result = reports.get_report(report, as_of)
+            if file_format == 'json':
+                return self.get_success_response(result)
+            content, content_type, filename = reports.export(result, file_format)
+        except Exception as e:
+            logger.error(f"Error building {report} report: {e}")
+            return self.get_error_response(f"Error building {report} report", 500)
+        response = HttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ExportAPIView(BaseAPIView):
+    """
+    Full-table exports - /api/export/<batches|bols|bol_items>/?format=csv|xlsx
+
+    Batches take the batch list filters; BOLs and BOL items take
+    shipped_from, shipped_to, customer and supplier (BOL items also item).
+    CSV streams as rows are read; XLSX is built in a temporary file first.
+    """
+    export_formats = ('csv', 'xlsx')
+
+    def get(self, request, dataset):
+        if dataset not in exports.DATASETS:
+            return self.get_error_response(f"Unknown export '{dataset}'", 404)
+        file_format = request.GET.get('format', 'csv').lower()
+        if file_format not in self.export_formats:
+            return self.get_error_response(f"Unknown format '{file_format}'")
+
+        filename = f"{dataset}-{timezone.localdate().isoformat()}.{file_format}"
+        try:
+            if file_format == 'csv':
+                response = StreamingHttpResponse(
+                    exports.stream_csv(exports.DATASETS[dataset], request.GET), content_type='text/csv'
+                )
+                response['Content-Disposition'] = f'attachment; filename="{filename}"'
+                return response
+            fileobj = exports.xlsx_file(exports.DATASETS[dataset], request.GET, dataset.capitalize())
+        except ValueError as e:
+            return self.get_error_response(f"Invalid filter: {e}")
+        except Exception as e:
+            logger.error(f"Error exporting {dataset}: {e}")
+            return self.get_error_response(f"Error exporting {dataset}", 500)
+        return FileResponse(
+            fileobj,
+            as_attachment=True,
+            filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BOLPDFAPIView(BaseAPIView):
+    """
+    BOL documents as PDF - /api/bols/<id>/pdf/ for one BOL, or
+    /api/bols/pdf/?ship_date=YYYY-MM-DD for every BOL shipped that day
+    merged into one file for printing. See ``inventory.documents``.
+    """
+
+    def get(self, request, pk=None):
+        try:
+            if pk is not None:
+                bol, content = documents.bol_pdf(pk)
+                filename = f'BOL-{bol.bol_number}.pdf'
+            else:
+                if not request.GET.get('ship_date'):
+                    return self.get_error_response("ship_date is required")
+                try:
+                    ship_date = date.fromisoformat(request.GET['ship_date'])
+                except ValueError:
+                    return self.get_error_response("ship_date must be a date (YYYY-MM-DD)")
+                count, content = documents.ship_date_pdf(ship_date)
+                if not count:
+                    return self.get_error_response(f"No BOLs shipped on {ship_date.isoformat()}", 404)
+                filename = f'BOLs-{ship_date.isoformat()}.pdf'
+        except BOL.DoesNotExist:
+            return self.get_error_response("BOL not found", 404)
+        except Exception as e:
+            logger.error(f"Error rendering BOL PDF: {e}")
+            return self.get_error_response("Error rendering BOL PDF", 500)
+        response = HttpResponse(content, content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+        return response
 
 
 class ReportsView(TemplateView):
@@ -634,10 +1198,8 @@ class ReportsView(TemplateView):
         context = super().get_context_data(**kwargs)
         
         # Add summary statistics
-        context['total_batches'] = Batch.objects.count()
-        context['active_batches'] = Batch.objects.filter(status='ACTIVE').count()
-        context['total_items'] = Item.objects.filter(is_active=True).count()
-        context['total_suppliers'] = Supplier.objects.filter(is_active=True).count()
+        context.update(get_dashboard_stats())
+        context['aging'] = reports.get_report('aging')
         
         # Recent activity
         context['recent_batches'] = Batch.objects.select_related(
@@ -670,17 +1232,36 @@ def health_check(request):
     
     # Check if tables exist
     try:
-        # Try a simple count query on each model
-        health_data['checks']['tables'] = {
-            'items': Item.objects.count(),
-            'sizes': Size.objects.count(),
-            'suppliers': Supplier.objects.count(),
-            'customers': Customer.objects.count(),
-            'carriers': Carrier.objects.count(),
-        }
+        # Count every master table in one query
+        health_data['checks']['tables'] = get_table_counts()
     except Exception as e:
         health_data['status'] = 'error'
         health_data['checks']['tables'] = f'error: {str(e)}'
         health_data['traceback'] = traceback.format_exc()
     
     return JsonResponse(health_data, status=200 if health_data['status'] == 'ok' else 500)
+
+
+@never_cache
+def liveness(request):
+    """Liveness probe: answers without touching the database or the session"""
+    return HttpResponse('ok', content_type='text/plain')
+
+
+@never_cache
+def metrics_view(request):
+    """
+    Prometheus metrics (text format); requires ``METRICS_TOKEN`` as a bearer
+    token, and is not served at all without one unless DEBUG is on
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse('Not Found', status=404, content_type='text/plain')
+    else:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(provided, token):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(
+        metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )